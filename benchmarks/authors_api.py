@@ -0,0 +1,191 @@
+"""
+Load tests the authors list endpoint through the Django test client with
+concurrent clients, mixing plain listing, deep pages and name searches,
+for several sizes of the authors table.
+
+For each table size and scenario it reports throughput, p50/p95/p99
+latencies and the mean number of SQL queries per request.
+
+    python -m benchmarks.authors_api --sizes 10000,1000000 \\
+        --concurrency 8 --requests 400 --mix list=5,deep=2,filter=3
+
+The list cache is disabled unless --list-cache-timeout is given, so the
+database path is measured by default.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from benchmarks.datasets import FIRST_NAMES, LAST_NAMES
+from benchmarks.utils import (
+    benchmark_database,
+    emit,
+    seed_authors,
+    setup_django,
+    summarize,
+)
+
+SEARCH_TERMS = [name.lower() for name in FIRST_NAMES + LAST_NAMES] + [
+    "ab.",
+    "silva",
+    "an m",
+]
+
+
+def scenario_params(
+    scenario: str, rng: random.Random, pages: int, pagination: str
+) -> Dict[str, str]:
+    """Query parameters of a request of the given scenario"""
+    params = {"pagination": pagination}
+    if scenario == "deep":
+        params.update(pagination="page", page=str(rng.randint(1, pages)))
+    elif scenario == "filter":
+        params["name"] = rng.choice(SEARCH_TERMS)
+    return params
+
+
+class QueryCounter(threading.local):
+    """Database execute wrapper counting queries per thread"""
+
+    count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def client_worker(
+    requests: int, seed: int, mix: List[Tuple[str, int]], pages: int, args
+) -> List[Tuple[str, float, int]]:
+    """Sends requests from one client, returning their measurements"""
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client()
+    url = reverse("authors-list")
+    rng = random.Random(seed)
+    scenarios, weights = zip(*mix)
+    counter = QueryCounter()
+    measurements = []
+
+    try:
+        with connection.execute_wrapper(counter):
+            for _ in range(requests):
+                scenario = rng.choices(scenarios, weights)[0]
+                params = scenario_params(scenario, rng, pages, args.pagination)
+                counter.count = 0
+                start = time.perf_counter()
+                response = client.get(url, params)
+                elapsed = time.perf_counter() - start
+                assert response.status_code == 200, response.content
+                measurements.append((scenario, elapsed, counter.count))
+    finally:
+        connection.close()
+    return measurements
+
+
+def run_size(size: int, mix: List[Tuple[str, int]], args) -> Dict:
+    from django.conf import settings
+
+    seed_authors(size, unicode_ratio=args.unicode_ratio)
+    pages = max(1, size // settings.REST_FRAMEWORK["PAGE_SIZE"])
+    per_client = args.requests // args.concurrency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(client_worker, per_client, seed, mix, pages, args)
+            for seed in range(args.concurrency)
+        ]
+        measurements = [
+            measurement
+            for future in futures
+            for measurement in future.result()
+        ]
+    elapsed = time.perf_counter() - start
+
+    by_scenario = defaultdict(list)
+    for scenario, latency, queries in measurements:
+        by_scenario[scenario].append((latency, queries))
+
+    scenarios = {}
+    for scenario, values in by_scenario.items():
+        latencies = [latency for latency, _ in values]
+        scenarios[scenario] = {
+            "requests": len(values),
+            "mean_queries": sum(queries for _, queries in values)
+            / len(values),
+            **summarize(latencies),
+        }
+
+    return {
+        "authors": size,
+        "requests": len(measurements),
+        "seconds": elapsed,
+        "requests_per_second": len(measurements) / elapsed,
+        "overall": summarize([latency for _, latency, _ in measurements]),
+        "scenarios": scenarios,
+    }
+
+
+def parse_mix(mix: str) -> List[Tuple[str, int]]:
+    scenarios = []
+    for item in mix.split(","):
+        scenario, weight = item.split("=")
+        scenarios.append((scenario, int(weight)))
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", default="10000", help="Comma separated numbers of authors"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--mix",
+        default="list=5,deep=2,filter=3",
+        help="Comma separated weights of the list, deep and filter scenarios",
+    )
+    parser.add_argument(
+        "--pagination", choices=("page", "cursor"), default="page"
+    )
+    parser.add_argument("--list-cache-timeout", type=int, default=0)
+    parser.add_argument("--unicode-ratio", type=float, default=0.1)
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import override_settings
+
+    mix = parse_mix(args.mix)
+    with benchmark_database(), override_settings(
+        AUTHORS_LIST_CACHE_TIMEOUT=args.list_cache_timeout
+    ):
+        runs = [
+            run_size(int(size), mix, args) for size in args.sizes.split(",")
+        ]
+
+    emit(
+        {
+            "concurrency": args.concurrency,
+            "pagination": args.pagination,
+            "list_cache_timeout": args.list_cache_timeout,
+            "mix": dict(mix),
+            "runs": runs,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
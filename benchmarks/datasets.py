@@ -0,0 +1,141 @@
+"""Synthetic authors CSV files for the benchmarks"""
+import random
+import string
+from typing import Iterator, List, Tuple
+
+FIRST_NAMES = (
+    "Ana Brian Chetan David Elena Fatima George Hiro Isabel James "
+    "Karen Luciano Maria Nadia Osvaldo Paulo Rosa Sarah Thomas "
+    "Yuki"
+).split()
+LAST_NAMES = (
+    "Alexander Beazley Carter Flowers Giridhar Jones Martins "
+    "Morgan Myers Neto Ramalho Rowling Santana Silva Souza Tanaka "
+    "Vargas Walker Young Zhang"
+).split()
+UNICODE_FIRST_NAMES = (
+    "José Zoë Łukasz Søren François Dmitrïy Ærin Андрей Ελένη "
+    "Giovanni 明 سارا Đorđe Ngọc Ünal Jürgen"
+).split()
+UNICODE_LAST_NAMES = (
+    "Gonçalves Müller Ñúñez Dvořák Øster Björk Şahin Иванов "
+    "Παπαδόπουλος 山田 الحسن Nguyễn"
+).split()
+
+
+def _code(number: int) -> str:
+    """Short letters code making every generated name distinct"""
+    letters = []
+    while True:
+        number, remainder = divmod(number, 26)
+        letters.append(string.ascii_uppercase[remainder])
+        if not number:
+            break
+    return "".join(reversed(letters))
+
+
+def author_name(index: int, unicode_ratio: float = 0.0) -> str:
+    """Deterministic, distinct author name for the given index"""
+    rng = random.Random(index)
+    if rng.random() < unicode_ratio:
+        first, last = UNICODE_FIRST_NAMES, UNICODE_LAST_NAMES
+    else:
+        first, last = FIRST_NAMES, LAST_NAMES
+    return f"{rng.choice(first)} {_code(index)}. {rng.choice(last)}"
+
+
+def author_names(
+    count: int,
+    duplicate_ratio: float = 0.0,
+    unicode_ratio: float = 0.0,
+    seed: int = 0,
+) -> Iterator[str]:
+    """
+    Stream of 'count' author names where about 'duplicate_ratio' of them
+    repeat a previous name and about 'unicode_ratio' of them hold non
+    ASCII characters
+    """
+    rng = random.Random(seed)
+    distinct = 0
+    for _ in range(count):
+        if distinct and rng.random() < duplicate_ratio:
+            yield author_name(rng.randrange(distinct), unicode_ratio)
+        else:
+            yield author_name(distinct, unicode_ratio)
+            distinct += 1
+
+
+SYLLABLES = (
+    "ba be bi bo bu da de di do du fa fe fi ka ke ki ko la le li lo lu "
+    "ma me mi mo mu na ne ni no nu pa pe pi ra re ri ro ru sa se si so "
+    "ta te ti to tu va ve vi vo za ze zo an el in or us ar en"
+).split()
+
+
+def _varied_word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).title()
+
+
+def varied_author_name(rng: random.Random) -> str:
+    """
+    Random author name unlike the rest, built from syllables, as opposed to
+    the names of author_name which only differ by their short codes
+    """
+    first = _varied_word(rng, rng.randint(2, 3))
+    last = _varied_word(rng, rng.randint(2, 4))
+    if rng.random() < 0.3:
+        return f"{first} {_varied_word(rng, 1)}. {last}"
+    return f"{first} {last}"
+
+
+def author_name_variant(name: str, rng: random.Random) -> str:
+    """
+    Near-duplicate of an author name: reordered, differently punctuated or
+    cased, or with a typo
+    """
+    words = name.split()
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"{words[-1]}, {' '.join(words[:-1])}"
+    if kind == 1:
+        return " ".join(word.rstrip(".") for word in words).upper()
+    if kind == 2:
+        return ".".join(word.rstrip(".") for word in words)
+
+    position = rng.randrange(1, len(name) - 1)
+    if name[position] == " " or name[position + 1] == " ":
+        return f"{name[:position]}{name[position]}{name[position:]}"
+    return (
+        f"{name[:position]}{name[position + 1]}{name[position]}"
+        f"{name[position + 2 :]}"
+    )
+
+
+def names_with_variants(
+    count: int, existing: List[str], variant_ratio: float, seed: int = 1
+) -> Iterator[Tuple[str, bool]]:
+    """
+    Stream of 'count' author names, about 'variant_ratio' of them being
+    near-duplicates of the 'existing' names or of previous ones, along
+    with whether they are
+    """
+    rng = random.Random(seed)
+    previous = []
+    for _ in range(count):
+        if rng.random() < variant_ratio and (existing or previous):
+            source = (
+                existing if not previous or rng.random() < 0.5 else previous
+            )
+            yield author_name_variant(rng.choice(source), rng), True
+        else:
+            name = varied_author_name(rng)
+            previous.append(name)
+            yield name, False
+
+
+def write_authors_csv(path: str, count: int, **kwargs) -> None:
+    """Writes an authors CSV file in the format expected by the importer"""
+    with open(path, "w", encoding="utf-8") as csv_file:
+        csv_file.write("name\n")
+        for name in author_names(count, **kwargs):
+            csv_file.write(f"{name}\n")
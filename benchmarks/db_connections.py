@@ -0,0 +1,157 @@
+"""
+Measures the per-request latency of the authors list endpoint for each
+way of managing database connections:
+
+    new: a connection is opened and closed by every request
+    persistent: connections are kept open across requests (CONN_MAX_AGE)
+    pool: connections are shared from an in-process pool (POOL_SIZE)
+
+Requests go through the WSGI handler, so connections are managed by the
+same request signals as in production, and connection health checks are
+enabled as by default.
+
+    python -m benchmarks.db_connections --authors 1000 --requests 500 \\
+        --concurrency 4
+
+The list cache is disabled and small pages are requested, so connection
+handling is a relevant share of each request. Connections taken from the
+pool are counted as opened too, though they skip the postgres handshake.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks.utils import (
+    benchmark_database,
+    emit,
+    seed_authors,
+    setup_django,
+    summarize,
+)
+
+MODES = {
+    "new": {"CONN_MAX_AGE": 0, "POOL_SIZE": 0},
+    "persistent": {"CONN_MAX_AGE": 600, "POOL_SIZE": 0},
+    "pool": {"CONN_MAX_AGE": 60, "POOL_SIZE": None},
+}
+
+
+def client_worker(handler, environ: Dict, requests: int) -> List[float]:
+    """Sends requests from one thread, returning their latencies"""
+    from django.db import connection
+
+    latencies = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            statuses = []
+            response = handler(
+                dict(environ), lambda status, headers: statuses.append(status)
+            )
+            b"".join(response)
+            response.close()
+            latencies.append(time.perf_counter() - start)
+            assert statuses[0].startswith("200"), statuses
+    finally:
+        connection.close()
+    return latencies
+
+
+def run_mode(mode: str, args) -> Dict:
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test import RequestFactory
+    from django.urls import reverse
+
+    from bookstore.db.pool import close_pools
+
+    settings = {
+        name: args.concurrency if value is None else value
+        for name, value in MODES[mode].items()
+    }
+    connection.close()
+    connection.settings_dict.update(settings, CONN_HEALTH_CHECKS=True)
+
+    opened = []
+
+    def count_connection(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(
+        PATH_INFO=reverse("authors-list"), QUERY_STRING="page=2"
+    )
+    per_client = args.requests // args.concurrency
+
+    connection_created.connect(count_connection)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            futures = [
+                executor.submit(client_worker, handler, environ, per_client)
+                for _ in range(args.concurrency)
+            ]
+            latencies = [
+                latency for future in futures for latency in future.result()
+            ]
+        elapsed = time.perf_counter() - start
+    finally:
+        connection_created.disconnect(count_connection)
+        close_pools(connection.settings_dict["NAME"])
+
+    return {
+        "mode": mode,
+        **settings,
+        "requests": len(latencies),
+        "connections_opened": len(opened),
+        "requests_per_second": len(latencies) / elapsed,
+        **summarize(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument(
+        "--modes", default=",".join(MODES), help="Comma separated modes"
+    )
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import override_settings
+    from rest_framework.pagination import PageNumberPagination
+
+    # every request is served from the database, not from the list cache
+    PageNumberPagination.page_size = args.page_size
+    with benchmark_database(), override_settings(
+        AUTHORS_LIST_CACHE_TIMEOUT=0, ALLOWED_HOSTS=["testserver"]
+    ):
+        seed_authors(args.authors)
+        runs = [run_mode(mode, args) for mode in args.modes.split(",")]
+
+    baseline = runs[0]["mean_ms"]
+    for run in runs:
+        run["saved_per_request_ms"] = baseline - run["mean_ms"]
+
+    emit(
+        {
+            "authors": args.authors,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+            "runs": runs,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
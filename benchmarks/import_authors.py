@@ -0,0 +1,231 @@
+"""
+Benchmarks the import_authors command across its import modes and input
+sizes, using synthetic CSV files.
+
+Every mode runs in its own process against the same throwaway database,
+so peak memory usage is measured independently. Results hold wall time,
+rows per second, peak RSS and the number of SQL statements executed
+(COPY statements issued through 'copy_from' are not counted).
+
+    python -m benchmarks.import_authors --sizes 10000,1000000 \\
+        --duplicate-ratio 0.1 --unicode-ratio 0.2 --output results.json
+
+Passing a previous results file with --baseline reports the runs whose
+throughput dropped by more than --tolerance, exiting with an error.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from io import StringIO
+from threading import Lock
+from typing import Dict, List
+
+from benchmarks.datasets import write_authors_csv
+from benchmarks.utils import ROOT_DIR, benchmark_database, emit, setup_django
+
+MODES = {
+    "bulk_create": [],
+    "faster": ["--faster"],
+    "stream": ["--stream"],
+    "stream_faster": ["--stream", "--faster"],
+    "parallel": ["--workers", "{workers}"],
+}
+
+
+class StatementCounter:
+    """Database execute wrapper counting the executed statements"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_single(mode: str, filepath: str, workers: int) -> Dict:
+    """Runs one import in the current process, measuring it"""
+    setup_django()
+
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+
+    from authors.models import Author
+
+    with connection.cursor() as cursor:
+        cursor.execute("TRUNCATE authors_author RESTART IDENTITY")
+
+    counter = StatementCounter()
+    connection.execute_wrappers.append(counter)
+    connection_created.connect(
+        lambda connection, **kwargs: connection.execute_wrappers.append(
+            counter
+        ),
+        weak=False,
+    )
+
+    args = [arg.format(workers=workers) for arg in MODES[mode]]
+    output = StringIO()
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    call_command("import_authors", filepath, *args, stdout=output)
+    elapsed = time.perf_counter() - start
+    peak_rss = peak_rss_mb()
+    statements = counter.count
+
+    return {
+        "succeeded": "Successfully imported" in output.getvalue(),
+        "seconds": elapsed,
+        "statements": statements,
+        "inserted": Author.objects.count(),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def run_mode(mode: str, filepath: str, workers: int, db_name: str) -> Dict:
+    """Runs one import in a child process against the benchmark database"""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.import_authors",
+            "--single",
+            mode,
+            filepath,
+            "--workers",
+            str(workers),
+        ],
+        cwd=ROOT_DIR,
+        env={**os.environ, "DB_NAME": db_name},
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+def find_regressions(
+    results: List[Dict], baseline: List[Dict], tolerance: float
+) -> List[Dict]:
+    """Runs whose throughput dropped by more than 'tolerance'"""
+    previous = {(run["mode"], run["rows"]): run for run in baseline}
+    regressions = []
+    for run in results:
+        reference = previous.get((run["mode"], run["rows"]))
+        if reference and run["rows_per_second"] < reference[
+            "rows_per_second"
+        ] * (1 - tolerance):
+            regressions.append(
+                {
+                    "mode": run["mode"],
+                    "rows": run["rows"],
+                    "rows_per_second": run["rows_per_second"],
+                    "baseline_rows_per_second": reference["rows_per_second"],
+                }
+            )
+    return regressions
+
+
+def run(args) -> Dict:
+    from django.db import connection
+
+    modes = args.modes.split(",")
+    results = []
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    for size in (int(size) for size in args.sizes.split(",")):
+        filepath = os.path.join(
+            args.data_dir,
+            f"authors_{size}_{args.duplicate_ratio}_{args.unicode_ratio}.csv",
+        )
+        if not os.path.exists(filepath):
+            write_authors_csv(
+                filepath,
+                size,
+                duplicate_ratio=args.duplicate_ratio,
+                unicode_ratio=args.unicode_ratio,
+            )
+
+        for mode in modes:
+            run_result = run_mode(
+                mode, filepath, args.workers, connection.settings_dict["NAME"]
+            )
+            run_result.update(
+                {
+                    "mode": mode,
+                    "rows": size,
+                    "rows_per_second": size / run_result["seconds"],
+                }
+            )
+            results.append(run_result)
+
+    return {
+        "duplicate_ratio": args.duplicate_ratio,
+        "unicode_ratio": args.unicode_ratio,
+        "workers": args.workers,
+        "runs": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes", default="10000", help="Comma separated numbers of rows"
+    )
+    parser.add_argument(
+        "--modes", default=",".join(MODES), help="Comma separated modes"
+    )
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--unicode-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(ROOT_DIR, ".benchmarks"),
+        help="Directory holding the generated CSV files",
+    )
+    parser.add_argument("--output", help="JSON results file")
+    parser.add_argument("--baseline", help="Previous JSON results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--single",
+        nargs=2,
+        metavar=("MODE", "FILEPATH"),
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(*args.single, args.workers)))
+        return
+
+    setup_django()
+    with benchmark_database():
+        results = run(args)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["runs"]
+        results["regressions"] = find_regressions(
+            results["runs"], baseline, args.tolerance
+        )
+
+    emit(results, args.output)
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
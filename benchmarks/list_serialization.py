@@ -0,0 +1,62 @@
+"""
+Benchmarks the authors list endpoint with and without the model
+serializer, reporting the per-request speedup of the fast list path.
+
+    python -m benchmarks.list_serialization --authors 100000 --repeat 50
+"""
+import argparse
+
+from benchmarks.utils import (
+    benchmark_database,
+    emit,
+    measure,
+    seed_authors,
+    setup_django,
+    summarize,
+)
+
+
+def run(authors: int, repeat: int) -> dict:
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from authors.api import renderers
+
+    seed_authors(authors)
+    client = Client()
+    url = reverse("authors-list")
+    results = {
+        "authors": authors,
+        "repeat": repeat,
+        "orjson": renderers.orjson is not None,
+        "modes": {},
+    }
+
+    for mode, fast in (("serializer", False), ("fast", True)):
+        with override_settings(
+            AUTHORS_FAST_LIST=fast, AUTHORS_LIST_CACHE_TIMEOUT=0
+        ):
+            timings = measure(lambda: client.get(url, {"page": 2}), repeat)
+        results["modes"][mode] = summarize(timings)
+
+    results["speedup"] = (
+        results["modes"]["serializer"]["mean_ms"]
+        / results["modes"]["fast"]["mean_ms"]
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--authors", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        emit(run(args.authors, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
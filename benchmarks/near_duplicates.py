@@ -0,0 +1,119 @@
+"""
+Benchmarks the near-duplicates detection of the authors import across
+input sizes, showing its time per name stays flat as sizes grow.
+
+Half as many authors as names imported are seeded first, and about
+--variant-ratio of the imported names are near-duplicates of them or of
+other imported names, reordered, punctuated, cased or misspelled. Results
+hold the time to index the existing authors and to filter the names,
+the recall of the near-duplicates and the share of the other names
+flagged, plus the growth of the process RSS while indexing and filtering,
+mostly taken by the index, and its peak RSS so far.
+
+    python -m benchmarks.near_duplicates --sizes 10000,100000,1000000
+"""
+import argparse
+import os
+import random
+import resource
+import time
+from typing import Dict
+
+from benchmarks.utils import benchmark_database, emit, setup_django
+
+
+def current_rss_mb() -> float:
+    """Resident memory of the process, from /proc on Linux"""
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def run_size(size: int, variant_ratio: float, threshold: float) -> Dict:
+    from django.db import connection
+
+    from authors.dedup import NearDuplicatesFilter, build_dedup_index
+    from authors.utils import NamesReader, import_authors_faster
+    from benchmarks.datasets import names_with_variants, varied_author_name
+
+    rng = random.Random(size)
+    existing = [varied_author_name(rng) for _ in range(size // 2)]
+    with connection.cursor() as cursor:
+        cursor.execute("TRUNCATE authors_author RESTART IDENTITY")
+    import_authors_faster(NamesReader(existing, with_keys=True))
+
+    incoming = list(names_with_variants(size, existing, variant_ratio))
+    variants = {name for name, is_variant in incoming if is_variant}
+    originals = {name for name, _ in incoming} - variants
+
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    index = build_dedup_index(threshold)
+    index_seconds = time.perf_counter() - start
+
+    found = []
+    near_duplicates = NearDuplicatesFilter(
+        index, skip=True, on_duplicate=found.append
+    )
+    start = time.perf_counter()
+    for _ in near_duplicates.filter(name for name, _ in incoming):
+        pass
+    filter_seconds = time.perf_counter() - start
+    index_rss_mb = current_rss_mb() - rss_before
+
+    flagged = {duplicate.name for duplicate in found}
+    return {
+        "names": size,
+        "existing": len(existing),
+        "index_seconds": index_seconds,
+        "filter_seconds": filter_seconds,
+        "us_per_name": (index_seconds + filter_seconds)
+        / (size + len(existing))
+        * 1e6,
+        "near_duplicates": len(variants),
+        "found": len(flagged),
+        "recall": len(flagged & variants) / max(1, len(variants)),
+        "flagged_other_ratio": len(flagged & originals)
+        / max(1, len(originals)),
+        "index_rss_mb": index_rss_mb,
+        "index_bytes_per_name": index_rss_mb * 2 ** 20 / (len(index) or 1),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000",
+        help="Comma separated numbers of names imported",
+    )
+    parser.add_argument("--variant-ratio", type=float, default=0.1)
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--output", help="JSON results file")
+    args = parser.parse_args()
+
+    setup_django()
+    from authors.dedup import DEFAULT_DEDUP_THRESHOLD
+
+    threshold = args.threshold or DEFAULT_DEDUP_THRESHOLD
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    with benchmark_database():
+        runs = [
+            run_size(size, args.variant_ratio, threshold) for size in sizes
+        ]
+    emit(
+        {
+            "variant_ratio": args.variant_ratio,
+            "threshold": threshold,
+            "runs": runs,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Common helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway test database created on the postgres
+server configured by the usual DB_* environment variables, so existing
+data is never touched.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_DIR = os.path.join(ROOT_DIR, "bookstore")
+
+
+def setup_django() -> None:
+    """Makes the project importable and configures Django"""
+    if PROJECT_DIR not in sys.path:
+        sys.path.append(PROJECT_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookstore.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def benchmark_database(keepdb: bool = False) -> Iterator[None]:
+    """Creates the test database for the duration of the benchmark"""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        if not keepdb:
+            teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def seed_authors(count: int, unicode_ratio: float = 0.0) -> None:
+    """Replaces the authors table contents with 'count' synthetic names"""
+    from django.db import connection
+
+    from authors.utils import NamesReader, import_authors_faster
+    from benchmarks.datasets import author_names
+
+    with connection.cursor() as cursor:
+        cursor.execute("TRUNCATE authors_author RESTART IDENTITY")
+    import_authors_faster(
+        NamesReader(
+            author_names(count, unicode_ratio=unicode_ratio), with_keys=True
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE authors_author")
+
+
+def measure(func: Callable, repeat: int, warmup: int = 1) -> List[float]:
+    """Wall time in seconds of 'repeat' calls to 'func'"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(timings: List[float], percent: float) -> float:
+    ordered = sorted(timings)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Latency statistics in milliseconds"""
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+    }
+
+
+def emit(results: Dict, output: Optional[str] = None) -> None:
+    """Writes the results as JSON to the given file or to stdout"""
+    content = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as output_file:
+            output_file.write(content)
+    else:
+        print(content)
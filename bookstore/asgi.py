@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from bookstore.handlers import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "bookstore.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up, serves the authors list endpoint
+# natively on the event loop
+from authors.api.asgi import AsyncAuthorsList  # noqa: E402
+
+application = AsyncAuthorsList(django_application)
@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from authors.models import Author, ImportCheckpoint
+
+
+@admin.register(Author)
+class AuthorAdmin(admin.ModelAdmin):
+    list_display = ["id", "name"]
+    search_fields = ["name"]
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    list_display = ["path", "rows", "offset", "completed", "updated_at"]
+    search_fields = ["path"]
@@ -0,0 +1,497 @@
+"""
+ASGI-native implementation of the authors list endpoint.
+
+Django 3.0 runs every view, and every ORM query, in a worker thread when
+served over ASGI. The list endpoint is instead served straight from the
+event loop, querying postgres through psycopg2 asynchronous connections,
+so a single process can keep many requests waiting on the database
+without holding a thread for each one.
+
+The Django ORM is still used to build the filtered queries, which are
+only compiled to SQL here. Blocking calls, like cache reads and database
+routing, run in worker threads, as do the middleware the responses go
+through. Responses have the same content, headers and caching behavior
+as the ones of AuthorViewSet. Requests this path does
+not support, like keyset pagination, HTML, invalid pages or credentials,
+are handed over to the wrapped Django application, as is every request
+when the view requires authentication, permissions or throttling.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+from asgiref.sync import sync_to_async
+from psycopg2.extensions import POLL_OK, POLL_READ, POLL_WRITE
+
+from django.conf import settings
+from django.core import signals
+from django.core.cache import cache
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.base import BaseHandler
+from django.db import connections
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
+
+from authors.api.filters import AuthorFilter
+from authors.api.pagination import (
+    ESTIMATE_COUNT_SQL,
+    PAGE_NUMBER,
+    AuthorPageNumberPagination,
+    CachedCountPaginator,
+    normalize_filters,
+)
+from authors.api.renderers import FastJSONRenderer
+from authors.api.serializers import AuthorSerializer
+from authors.api.views import LIST_CACHE_PREFIX, AuthorViewSet, list_digest
+from authors.cache import get_authors_last_modified
+from authors.models import Author
+from bookstore.handlers import send_response
+from bookstore.timing import (
+    RequestTimings,
+    get_current_timings,
+    measure,
+    record_timings,
+)
+from rest_framework.authentication import (
+    BasicAuthentication,
+    SessionAuthentication,
+)
+from rest_framework.permissions import AllowAny
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+SUPPORTED_PARAMS = {"page", "pagination", "format", *AuthorFilter.base_filters}
+JSON_MEDIA_TYPES = {"*/*", "application/*", "application/json"}
+# authentication classes letting anonymous GET requests through as long as
+# they send no credentials, session ones needing a CSRF token for writes
+PERMISSIVE_AUTHENTICATION = {BasicAuthentication, SessionAuthentication}
+
+
+async def wait_ready(conn) -> None:
+    """Waits on the event loop until an asynchronous connection is ready"""
+    loop = asyncio.get_event_loop()
+    while True:
+        state = conn.poll()
+        if state == POLL_OK:
+            return
+
+        ready = loop.create_future()
+
+        def set_ready():
+            if not ready.done():
+                ready.set_result(None)
+
+        fileno = conn.fileno()
+        if state == POLL_READ:
+            loop.add_reader(fileno, set_ready)
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fileno)
+        elif state == POLL_WRITE:
+            loop.add_writer(fileno, set_ready)
+            try:
+                await ready
+            finally:
+                loop.remove_writer(fileno)
+        else:
+            raise psycopg2.OperationalError(f"Bad poll state {state}")
+
+
+class AsyncConnectionPool:
+    """
+    Pool of psycopg2 asynchronous connections to the given database alias,
+    holding up to 'max_size' of them
+    """
+
+    def __init__(self, alias: str, max_size: int):
+        self.alias = alias
+        self.max_size = max_size
+        self._idle = []
+        self._loop = None
+        self._slots = None
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self.close()
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_size)
+
+    async def _connect(self):
+        params = connections[self.alias].get_connection_params()
+        conn = psycopg2.connect(async_=1, **params)
+        await wait_ready(conn)
+        return conn
+
+    async def acquire(self):
+        self._bind_loop()
+        await self._slots.acquire()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn, discard: bool = False) -> None:
+        if discard or conn.closed:
+            conn.close()
+        else:
+            self._idle.append(conn)
+        self._slots.release()
+
+    async def fetch(self, sql: str, params: Sequence) -> List[Tuple]:
+        """
+        Runs a query returning all of its rows, recorded in the current
+        request timings if any
+        """
+        timings = get_current_timings()
+        start = time.perf_counter()
+        conn = await self.acquire()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            await wait_ready(conn)
+            rows = cursor.fetchall()
+        except BaseException:
+            # the connection may be left in the middle of a query
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+        if timings is not None:
+            timings.add_query(sql, time.perf_counter() - start)
+        return rows
+
+    def close(self) -> None:
+        """Closes the idle connections"""
+        while self._idle:
+            self._idle.pop().close()
+
+
+def in_thread(func):
+    """
+    Coroutine function running a blocking one, like cache reads or
+    database routing, in a worker thread instead of the event loop
+    """
+    return sync_to_async(func, thread_sensitive=False)
+
+
+def compile_queryset(queryset: QuerySet) -> Tuple[str, str, Sequence]:
+    """
+    Database alias a queryset is routed to, which may read the cache, with
+    its SQL and parameters, without executing it
+    """
+    alias = queryset.db
+    sql, params = queryset.query.get_compiler(using=alias).as_sql()
+    return alias, sql, params
+
+
+class PreparedResponseHandler(BaseHandler):
+    """
+    Handler running requests through the middleware of the project, with
+    the response prepared on the event loop standing for the view one.
+    The timings recorded while preparing it are added to the ones of the
+    sampled requests
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.load_middleware()
+
+    def _get_response(self, request):
+        timings = get_current_timings()
+        if timings is not None:
+            timings.merge(request.prepared_timings)
+        return request.prepared_response
+
+
+class AsyncAuthorsList:
+    """
+    ASGI application serving GET requests to the authors list endpoint on
+    the event loop, passing every other request to the given application
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self.pools: Dict[str, AsyncConnectionPool] = {}
+
+    def get_pool(self, alias: str) -> AsyncConnectionPool:
+        """Pool of the database a query is routed to, primary or replica"""
+        pool = self.pools.get(alias)
+        if pool is None:
+            pool = self.pools[alias] = AsyncConnectionPool(
+                alias, settings.AUTHORS_ASYNC_POOL_SIZE
+            )
+        return pool
+
+    def close(self) -> None:
+        """Closes the idle connections of every pool"""
+        for pool in self.pools.values():
+            pool.close()
+
+    @cached_property
+    def path(self) -> str:
+        return reverse("authors-list")
+
+    @cached_property
+    def handler(self) -> PreparedResponseHandler:
+        return PreparedResponseHandler()
+
+    async def fetch(self, queryset: QuerySet) -> List[Tuple]:
+        """Rows of the queryset, from the database it is routed to"""
+        alias, sql, params = await in_thread(compile_queryset)(queryset)
+        return await self.get_pool(alias).fetch(sql, params)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            settings.AUTHORS_ASYNC_LIST
+            and scope["type"] == "http"
+            and scope["method"] == "GET"
+            and scope["path"] == self.path
+        ):
+            try:
+                request = ASGIRequest(scope, BytesIO())
+            except UnicodeDecodeError:
+                request = None
+            response = request and await self.get_response(request)
+            if response is not None:
+                await send_response(response, send)
+                return
+        await self.application(scope, receive, send)
+
+    @staticmethod
+    def allows(request: ASGIRequest) -> bool:
+        """
+        Whether AuthorViewSet lets the request through whoever sends it,
+        as its authentication, permission and throttle classes are not
+        run here
+        """
+        return (
+            set(AuthorViewSet.authentication_classes)
+            <= PERMISSIVE_AUTHENTICATION
+            and all(
+                permission is AllowAny
+                for permission in AuthorViewSet.permission_classes
+            )
+            and not AuthorViewSet.throttle_classes
+            and "HTTP_AUTHORIZATION" not in request.META
+        )
+
+    def accepts(self, request: ASGIRequest) -> bool:
+        """
+        Whether the request asks for the JSON representation and needs no
+        authentication, permission or throttling checks
+        """
+        if not self.allows(request):
+            return False
+        params = request.GET
+        if not set(params).issubset(SUPPORTED_PARAMS):
+            return False
+        if params.get("format", "json") != "json":
+            return False
+        if params.get("pagination", settings.AUTHORS_PAGINATION) != (
+            PAGE_NUMBER
+        ):
+            return False
+
+        accept = request.META.get("HTTP_ACCEPT", "*/*")
+        media_types = {
+            media_type.split(";")[0].strip()
+            for media_type in accept.split(",")
+        }
+        return "text/html" not in media_types and bool(
+            media_types & JSON_MEDIA_TYPES
+        )
+
+    async def get_response(
+        self, request: ASGIRequest
+    ) -> Optional[HttpResponse]:
+        """
+        Response to the request, or None when it must be served by the
+        Django application
+        """
+        if not self.accepts(request):
+            return None
+        try:
+            request.get_host()
+        except DisallowedHost:
+            return None
+
+        filterset = AuthorFilter(request.GET, queryset=Author.objects.all())
+        if not filterset.is_valid():
+            return None
+
+        page_size = AuthorPageNumberPagination.page_size
+        with record_timings(RequestTimings()) as timings:
+            start = time.perf_counter()
+            response = await self.prepare_response(
+                request, filterset, page_size
+            )
+            timings.add("total", time.perf_counter() - start)
+        if response is None:
+            return None
+
+        # the middleware, which is not async capable, add their headers in
+        # the thread the response is closed in, as for the Django views,
+        # so the connections they use are released by request_finished
+        request.prepared_response = response
+        request.prepared_timings = timings
+        await sync_to_async(
+            signals.request_started.send, thread_sensitive=True
+        )(sender=self.__class__, scope=request.scope)
+        return await sync_to_async(
+            self.handler.get_response, thread_sensitive=True
+        )(request)
+
+    @staticmethod
+    def get_validators(
+        request: ASGIRequest, page_size: int
+    ) -> Tuple[str, int]:
+        """Digest of the list response and its modification time"""
+        return (
+            list_digest(request, page_size),
+            int(get_authors_last_modified()),
+        )
+
+    async def prepare_response(
+        self, request: ASGIRequest, filterset, page_size: int
+    ) -> Optional[HttpResponse]:
+        """
+        Response of the list endpoint, before going through the middleware
+        """
+        digest, last_modified = await in_thread(self.get_validators)(
+            request, page_size
+        )
+        etag = quote_etag(digest)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            data = await self.get_data(request, filterset, page_size, digest)
+            if data is None:
+                return None
+            with measure("render"):
+                content = FastJSONRenderer().render(data)
+            response = HttpResponse(
+                content, content_type=FastJSONRenderer.media_type
+            )
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        # set by the Django REST framework views, whose session
+        # authentication makes them vary on cookies
+        response["Vary"] = "Accept, Cookie"
+        response["Allow"] = "GET, HEAD, OPTIONS"
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    async def get_data(
+        self, request: ASGIRequest, filterset, page_size: int, digest: str
+    ) -> Optional[Dict]:
+        """Page of authors, from the cache when available"""
+        key = f"{LIST_CACHE_PREFIX}:{digest}"
+        timeout = settings.AUTHORS_LIST_CACHE_TIMEOUT
+        if timeout:
+            data = await in_thread(cache.get)(key)
+            if data is not None:
+                return data
+
+        filters = normalize_filters(request.GET, AuthorFilter)
+        page_number = request.GET.get("page", 1)
+        if page_number in AuthorPageNumberPagination.last_page_strings:
+            count = await self.count(
+                filterset.qs, filters, page_size, estimate=False
+            )
+            page_number = max(1, -(-count // page_size))
+        try:
+            page_number = int(page_number)
+        except ValueError:
+            return None
+        if page_number < 1:
+            return None
+
+        # bounded by an extra row, as CachedCountPaginator does
+        fields = AuthorSerializer.Meta.fields
+        bottom = (page_number - 1) * page_size
+        queryset = filterset.qs.values_list(*fields)[
+            bottom : bottom + page_size + 1
+        ]
+        rows = await self.fetch(queryset)
+        if not rows and page_number > 1:
+            return None
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        count = await self.count(filterset.qs, filters, page_size)
+
+        url = request.build_absolute_uri()
+        page_param = AuthorPageNumberPagination.page_query_param
+        if has_next:
+            next_url = replace_query_param(url, page_param, page_number + 1)
+        else:
+            next_url = None
+        if page_number == 1:
+            previous_url = None
+        elif page_number == 2:
+            previous_url = remove_query_param(url, page_param)
+        else:
+            previous_url = replace_query_param(
+                url, page_param, page_number - 1
+            )
+
+        data = OrderedDict(
+            [
+                ("count", count),
+                ("next", next_url),
+                ("previous", previous_url),
+                ("results", [dict(zip(fields, row)) for row in rows]),
+            ]
+        )
+        if timeout:
+            await in_thread(cache.set)(key, data, timeout)
+        return data
+
+    async def count(
+        self,
+        queryset: QuerySet,
+        filters: Dict[str, str],
+        page_size: int,
+        estimate: bool = True,
+    ) -> int:
+        """
+        Count of authors estimated or cached the same way as done by
+        CachedCountPaginator, always exact unless 'estimate' is set
+        """
+        if estimate and not filters:
+            alias = await in_thread(lambda: queryset.db)()
+            rows = await self.get_pool(alias).fetch(
+                ESTIMATE_COUNT_SQL, [Author._meta.db_table]
+            )
+            estimate = rows[0][0] if rows else -1
+            if estimate >= settings.AUTHORS_COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+
+        paginator = CachedCountPaginator(queryset, page_size, filters=filters)
+        cache_key = await in_thread(lambda: paginator.cache_key)()
+        count = await in_thread(cache.get)(cache_key)
+        if count is None:
+            alias, sql, params = await in_thread(compile_queryset)(
+                queryset.order_by().values("id")
+            )
+            rows = await self.get_pool(alias).fetch(
+                f"SELECT COUNT(*) FROM ({sql}) AS authors", params
+            )
+            count = rows[0][0]
+            await in_thread(cache.set)(
+                cache_key, count, settings.AUTHORS_COUNT_CACHE_TIMEOUT
+            )
+        return count
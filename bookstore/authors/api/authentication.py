@@ -0,0 +1,57 @@
+import hmac
+from typing import Optional, Tuple
+
+from django.conf import settings
+
+from rest_framework.authentication import (
+    BaseAuthentication,
+    get_authorization_header,
+)
+from rest_framework.exceptions import AuthenticationFailed
+
+API_KEY_KEYWORD = "Api-Key"
+# what the services holding an API key are allowed to do
+API_KEY_PERMISSIONS = {"authors.add_author"}
+
+
+class APIKeyUser:
+    """Service authenticated by an API key, standing for the request user"""
+
+    is_active = True
+    is_anonymous = False
+    is_authenticated = True
+    is_staff = False
+    is_superuser = False
+
+    def has_perm(self, perm: str, obj=None) -> bool:
+        return perm in API_KEY_PERMISSIONS
+
+    def has_perms(self, perm_list, obj=None) -> bool:
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+
+class APIKeyAuthentication(BaseAuthentication):
+    """
+    Authenticates services sending one of the AUTHORS_API_KEYS in the
+    'Authorization: Api-Key <key>' header
+    """
+
+    def authenticate(self, request) -> Optional[Tuple[APIKeyUser, str]]:
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != API_KEY_KEYWORD.lower().encode():
+            return None
+        if len(header) != 2:
+            raise AuthenticationFailed("Invalid API key header")
+
+        key = header[1].decode("latin1")
+        # every key is compared in constant time, not leaking which matched
+        matches = [
+            hmac.compare_digest(key.encode(), api_key.encode())
+            for api_key in settings.AUTHORS_API_KEYS
+        ]
+        if not any(matches):
+            raise AuthenticationFailed("Invalid API key")
+        return APIKeyUser(), key
+
+    def authenticate_header(self, request) -> str:
+        return API_KEY_KEYWORD
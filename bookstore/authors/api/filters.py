@@ -1,15 +1,66 @@
-from authors.models import Author
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from authors.models import Author, normalize_name
 from django_filters import CharFilter, FilterSet
 
+# Matches the 'authors_author_name_tsvector' expression index
+FULL_TEXT_SEARCH_SQL = (
+    "to_tsvector('simple'::regconfig, authors_author.name::text) "
+    "@@ plainto_tsquery('simple'::regconfig, %s)"
+)
+
 
 class AuthorFilter(FilterSet):
     name = CharFilter(method="name_filter")
+    search = CharFilter(method="search_filter")
+    # accent and case insensitive lookups on the normalized name key,
+    # served by the 'authors_author_name_key_pattern' btree index, which
+    # handles prefixes too, and the 'authors_author_name_key_trgm' index
+    name_exact = CharFilter(method="name_key_filter", lookup_expr="exact")
+    name_prefix = CharFilter(
+        method="name_key_filter", lookup_expr="startswith"
+    )
+    name_contains = CharFilter(
+        method="name_key_filter", lookup_expr="contains"
+    )
 
     class Meta:
         model = Author
-        fields = ["name"]
+        fields = [
+            "name",
+            "search",
+            "name_exact",
+            "name_prefix",
+            "name_contains",
+        ]
+
+    @classmethod
+    def normalize_value(cls, name: str, value: str) -> str:
+        """Value of a filter normalized the way the database compares it"""
+        if cls.base_filters[name].method == "name_key_filter":
+            return normalize_name(value)
+        return value.upper()
 
     def name_filter(self, queryset, name, value):
+        # 'icontains' compiles to UPPER(name::text) LIKE UPPER(%s), which is
+        # served by the 'authors_author_name_upper_trgm' trigram index
         if value:
             return queryset.filter(name__icontains=value)
         return queryset
+
+    def name_key_filter(self, queryset, name, value):
+        if value:
+            lookup = self.filters[name].lookup_expr
+            return queryset.filter(
+                **{f"name_key__{lookup}": normalize_name(value)}
+            )
+        return queryset
+
+    def search_filter(self, queryset, name, value):
+        """Full text search matching whole words of authors' names"""
+        if value:
+            return queryset.filter(
+                RawSQL(FULL_TEXT_SEARCH_SQL, (value,), BooleanField())
+            )
+        return queryset
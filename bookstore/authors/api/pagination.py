@@ -0,0 +1,203 @@
+from functools import partial
+from hashlib import md5
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from authors.cache import get_authors_version
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+PAGE_NUMBER = "page"
+CURSOR = "cursor"
+
+COUNT_CACHE_PREFIX = "authors:count"
+ESTIMATE_COUNT_SQL = (
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+)
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Estimated number of rows of the queryset model table according to the
+    postgres planner statistics, or -1 when they are not available yet
+    """
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(ESTIMATE_COUNT_SQL, [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+def normalize_filters(params, filter_class) -> Dict[str, str]:
+    """
+    Filter parameters given in the request, normalized the same way the
+    database compares them so equivalent searches share counts
+    """
+    return {
+        name: filter_class.normalize_value(name, value)
+        for name, value in params.items()
+        if name in filter_class.base_filters and value
+    }
+
+
+class UncountedPage(Page):
+    """Page that knows whether a next one exists without a total count"""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+
+class UncountedPaginator(Paginator):
+    """
+    Paginator that never counts the rows, fetching one extra row instead
+    to find out whether there is a next page
+    """
+
+    count = None
+
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.current_page: Optional[UncountedPage] = None
+
+    @property
+    def num_pages(self) -> int:
+        """Pages known to exist, up to the one following the current page"""
+        if self.current_page is None:
+            return 1
+        number = self.current_page.number
+        return number + 1 if self.current_page.has_next() else number
+
+    def validate_number(self, number) -> int:
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number) -> UncountedPage:
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+
+        has_next = len(rows) > self.per_page
+        self.current_page = UncountedPage(
+            rows[: self.per_page], number, self, has_next
+        )
+        return self.current_page
+
+
+class CachedCountPaginator(UncountedPaginator):
+    """
+    Paginator estimating the count of big unfiltered tables from postgres
+    statistics and caching the exact counts of filtered ones.
+    Counts are only reported, pages being bounded by an extra row like
+    UncountedPaginator does, as an estimate may be off in either direction.
+    Only the last page is located with the exact count
+    """
+
+    def __init__(self, object_list, per_page, filters=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.filters = filters or {}
+
+    @property
+    def cache_key(self) -> str:
+        filters = "&".join(
+            f"{name}={value}" for name, value in sorted(self.filters.items())
+        )
+        digest = md5(filters.encode()).hexdigest()
+        return f"{COUNT_CACHE_PREFIX}:{get_authors_version()}:{digest}"
+
+    @cached_property
+    def exact_count(self) -> int:
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(
+                self.cache_key, count, settings.AUTHORS_COUNT_CACHE_TIMEOUT
+            )
+        return count
+
+    @cached_property
+    def count(self) -> int:
+        if not self.filters:
+            estimate = estimate_count(self.object_list)
+            if estimate >= settings.AUTHORS_COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+        return self.exact_count
+
+    @property
+    def num_pages(self) -> int:
+        if self.current_page is None:
+            return max(1, -(-self.exact_count // self.per_page))
+        return super().num_pages
+
+
+class AuthorPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination serving estimated or cached counts, which can
+    be omitted altogether with the 'count' query parameter set to false,
+    along with the ability to ask for the last page
+    """
+
+    count_query_param = "count"
+
+    def get_filters(self, request, view=None) -> Dict[str, str]:
+        filter_class = getattr(view, "filter_class", None)
+        if filter_class is None:
+            return {}
+        return normalize_filters(request.query_params, filter_class)
+
+    def omit_count(self, request) -> bool:
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() in ("false", "0", "no")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.omit_count(request):
+            page_number = request.query_params.get(self.page_query_param)
+            if page_number in self.last_page_strings:
+                raise NotFound(
+                    self.invalid_page_message.format(
+                        page_number=page_number,
+                        message="The last page is unknown without a count",
+                    )
+                )
+            self.django_paginator_class = UncountedPaginator
+        else:
+            self.django_paginator_class = partial(
+                CachedCountPaginator, filters=self.get_filters(request, view)
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class AuthorCursorPagination(CursorPagination):
+    """
+    Keyset pagination for authors seeking on their names, so fetching a
+    page costs the same regardless of its depth and no count is performed.
+    Names are unique, which makes them a total ordering on their own.
+    """
+
+    ordering = "name"
+
+
+PAGINATION_CLASSES = {
+    PAGE_NUMBER: AuthorPageNumberPagination,
+    CURSOR: AuthorCursorPagination,
+}
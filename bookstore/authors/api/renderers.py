@@ -0,0 +1,110 @@
+import csv
+import json
+from io import StringIO
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer using 'orjson' when it is installed, producing the very
+    same bytes as the default one for compact, non ASCII escaped output
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            orjson is None
+            or data is None
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            # types only known by the default encoder, like lazy strings
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # same strict javascript subset escaping as the default renderer
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class StreamRenderer(BaseRenderer):
+    """
+    Base class for renderers streaming rows of values, which also render
+    regular response data, like errors, for the sake of completeness
+    """
+
+    charset = "utf-8"
+
+    def stream(
+        self, fields: Sequence[str], rows: Iterable[Tuple], batch_size: int
+    ) -> Iterator[bytes]:
+        """Renders the rows in pieces holding up to 'batch_size' rows"""
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if isinstance(data, dict):
+            data = [data]
+        fields = list(data[0]) if data else []
+        rows = ([item.get(field) for field in fields] for item in data)
+        return b"".join(self.stream(fields, rows, len(data) or 1))
+
+
+class NDJSONRenderer(StreamRenderer):
+    """Renders one JSON object per line"""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def stream(self, fields, rows, batch_size):
+        lines = []
+        for row in rows:
+            lines.append(
+                json.dumps(
+                    dict(zip(fields, row)),
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+            )
+            if len(lines) >= batch_size:
+                yield ("\n".join(lines) + "\n").encode()
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+
+
+class CSVRenderer(StreamRenderer):
+    """Renders a CSV file with a header line"""
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, fields, rows, batch_size):
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        pending = 1
+        for row in rows:
+            writer.writerow(row)
+            pending += 1
+            if pending >= batch_size:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if pending:
+            yield buffer.getvalue().encode()
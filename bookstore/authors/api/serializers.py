@@ -1,8 +1,37 @@
+from django.conf import settings
+
 from authors.models import Author
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import (
+    CharField,
+    IntegerField,
+    ListField,
+    ModelSerializer,
+    Serializer,
+    ValidationError,
+)
 
 
 class AuthorSerializer(ModelSerializer):
     class Meta:
         model = Author
         fields = ["id", "name"]
+
+
+class AuthorLookupSerializer(Serializer):
+    """
+    Ids and exact names of the authors to look up at once, up to
+    AUTHORS_LOOKUP_MAX_ITEMS of them altogether
+    """
+
+    ids = ListField(child=IntegerField(min_value=1), default=list)
+    names = ListField(
+        child=CharField(max_length=200, trim_whitespace=False), default=list
+    )
+
+    def validate(self, attrs):
+        max_items = settings.AUTHORS_LOOKUP_MAX_ITEMS
+        if len(attrs["ids"]) + len(attrs["names"]) > max_items:
+            raise ValidationError(
+                f"Ensure there are no more than {max_items} ids and names."
+            )
+        return attrs
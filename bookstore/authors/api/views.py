@@ -1,18 +1,399 @@
+import csv
+from hashlib import md5
+from typing import Iterable, Iterator
+
+import psycopg2
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from authors.api.authentication import APIKeyAuthentication
 from authors.api.filters import AuthorFilter
-from authors.api.serializers import AuthorSerializer
+from authors.api.pagination import CURSOR, PAGINATION_CLASSES
+from authors.api.renderers import (
+    CSVRenderer,
+    FastJSONRenderer,
+    NDJSONRenderer,
+)
+from authors.api.serializers import AuthorLookupSerializer, AuthorSerializer
+from authors.autocomplete import get_names_index
+from authors.cache import get_authors_last_modified, get_authors_version
+from authors.changes import get_changes
 from authors.models import Author
+from authors.readers import (
+    CSVFormat,
+    iter_lines,
+    iter_text,
+    read_json_names,
+    read_names,
+)
+from authors.utils import NamesReader, import_authors_faster
+from bookstore.timing import measure
 from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import (
+    APIException,
+    ParseError,
+    UnsupportedMediaType,
+    ValidationError,
+)
 from rest_framework.mixins import ListModelMixin
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import DjangoModelPermissions
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+PAGINATION_PARAM = "pagination"
+LIST_CACHE_PREFIX = "authors:list"
+AUTOCOMPLETE_PARAM = "q"
+AUTOCOMPLETE_LIMIT_PARAM = "limit"
+MAX_AUTOCOMPLETE_LIMIT = 100
+JSON_CONTENT_TYPE = "application/json"
+CSV_CONTENT_TYPE = "text/csv"
+BULK_COLUMN_PARAM = "column"
+CHANGES_SINCE_PARAM = "since"
+CHANGES_LIMIT_PARAM = "limit"
+MAX_CHANGES_LIMIT = 10000
+
+
+def integer_param(params, name: str, default: int) -> int:
+    """Non negative integer query parameter, or a ValidationError"""
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise ValidationError({name: "Must be a non negative integer"})
+    return value
+
+
+def list_digest(request, page_size: int) -> str:
+    """
+    Digest identifying a list response, which depends on the authors data
+    version, the requested URL and the page size in use
+    """
+    version = get_authors_version()
+    params = sorted(request.GET.lists())
+    url = request.build_absolute_uri(request.path)
+    content = f"{version}:{url}?{params}:{page_size}"
+    return md5(content.encode()).hexdigest()
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Request body too large."
+    default_code = "payload_too_large"
+
+
+class TooManyNames(ValueError):
+    pass
+
+
+class BulkNames:
+    """
+    Iterator over the names of a bulk creation request body, counting them
+    and keeping the error found when the body is malformed or holds more
+    than 'max_names', as the import reports it as a failed COPY instead
+    """
+
+    def __init__(self, names: Iterable[str], max_names: int):
+        self.names = names
+        self.max_names = max_names
+        self.received = 0
+        self.error = None
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for name in self.names:
+                self.received += 1
+                if self.received > self.max_names:
+                    raise TooManyNames(
+                        f"More than {self.max_names} names received"
+                    )
+                yield name
+        except (ValueError, csv.Error) as exc:
+            self.error = exc
+            raise
+
 
 class AuthorViewSet(ListModelMixin, GenericViewSet):
     """ViewSet for Authors' list endpoint"""
 
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
-    pagination_class = PageNumberPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
     filter_backends = [DjangoFilterBackend]
     filter_class = AuthorFilter
-    filterset_fields = ["name"]
+    filterset_fields = [
+        "name",
+        "search",
+        "name_exact",
+        "name_prefix",
+        "name_contains",
+    ]
+
+    def get_pagination_mode(self) -> str:
+        """
+        Pagination mode picked by the 'pagination' query parameter,
+        falling back to keyset pagination when a cursor is given and to
+        the AUTHORS_PAGINATION setting otherwise
+        """
+        params = self.request.query_params
+        if CURSOR in params:
+            default = CURSOR
+        else:
+            default = settings.AUTHORS_PAGINATION
+        mode = params.get(PAGINATION_PARAM, default)
+
+        if mode not in PAGINATION_CLASSES:
+            raise ValidationError(
+                {
+                    PAGINATION_PARAM: (
+                        f"Must be one of {', '.join(PAGINATION_CLASSES)}"
+                    )
+                }
+            )
+        return mode
+
+    @property
+    def pagination_class(self):
+        """
+        Pagination class of the mode validated by list(), or of the
+        AUTHORS_PAGINATION setting, as error responses render the
+        paginator too
+        """
+        mode = getattr(self, "pagination_mode", settings.AUTHORS_PAGINATION)
+        return PAGINATION_CLASSES[mode]
+
+    def get_list_digest(self, request) -> str:
+        return list_digest(request, self.paginator.page_size)
+
+    def list_authors(self, request, *args, **kwargs):
+        """
+        Lists authors fetching only the serialized fields as dictionaries,
+        skipping model instances and serializer machinery altogether,
+        unless disabled by the AUTHORS_FAST_LIST setting
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if settings.AUTHORS_FAST_LIST:
+            queryset = queryset.values(
+                *self.get_serializer_class().Meta.fields
+            )
+
+        page = self.paginate_queryset(queryset)
+        with measure("serialize"):
+            if page is None:
+                page = list(queryset)
+            if not settings.AUTHORS_FAST_LIST:
+                page = self.get_serializer(page, many=True).data
+
+        if self.paginator is None:
+            return Response(page)
+        return self.get_paginated_response(page)
+
+    def get_list_response(self, request, digest: str, *args, **kwargs):
+        """
+        Lists authors serving whole serialized pages from the cache, until
+        authors are written or AUTHORS_LIST_CACHE_TIMEOUT seconds pass
+        """
+        timeout = settings.AUTHORS_LIST_CACHE_TIMEOUT
+        if not timeout:
+            return self.list_authors(request, *args, **kwargs)
+
+        key = f"{LIST_CACHE_PREFIX}:{digest}"
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = self.list_authors(request, *args, **kwargs)
+        cache.set(key, response.data, timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lists authors supporting conditional requests, answering with
+        '304 Not Modified' before querying the database when the client
+        copy is still up to date
+        """
+        self.pagination_mode = self.get_pagination_mode()
+        digest = self.get_list_digest(request)
+        etag = quote_etag(digest)
+        last_modified = int(get_authors_last_modified())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_list_response(request, digest, *args, **kwargs)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request, *args, **kwargs):
+        """
+        Streams every author matching the filters in a single response,
+        as NDJSON by default or as CSV when asked for with 'format=csv' or
+        the 'Accept' header, reading them through a server side cursor so
+        memory usage stays flat
+        """
+        fields = self.get_serializer_class().Meta.fields
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*fields)
+            .iterator(chunk_size=settings.AUTHORS_EXPORT_CHUNK_SIZE)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(fields, rows, settings.AUTHORS_EXPORT_CHUNK_SIZE),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="authors.{renderer.format}"'
+        return response
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request, *args, **kwargs):
+        """
+        Lists the top authors whose name, or a word of it, starts with the
+        'q' parameter, case insensitively, from the in-process names index
+        instead of the database
+        """
+        params = request.query_params
+        try:
+            limit = int(
+                params.get(
+                    AUTOCOMPLETE_LIMIT_PARAM,
+                    settings.AUTHORS_AUTOCOMPLETE_LIMIT,
+                )
+            )
+        except ValueError:
+            raise ValidationError(
+                {AUTOCOMPLETE_LIMIT_PARAM: "Must be an integer"}
+            )
+        limit = max(1, min(limit, MAX_AUTOCOMPLETE_LIMIT))
+
+        query = params.get(AUTOCOMPLETE_PARAM, "")
+        with measure("autocomplete"):
+            results = get_names_index().search(query, limit)
+        return Response(results)
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request, *args, **kwargs):
+        """
+        Lists the authors created or updated after the 'since' token, in
+        the order they were written, along with the token to pass on the
+        next request, so mirrors fetch only what changed. Tokens are
+        change sequence numbers, starting from 0, and 'more' tells whether
+        further changes are ready to be fetched right away
+        """
+        params = request.query_params
+        since = integer_param(params, CHANGES_SINCE_PARAM, 0)
+        limit = integer_param(
+            params, CHANGES_LIMIT_PARAM, settings.AUTHORS_CHANGES_LIMIT
+        )
+        limit = max(1, min(limit, MAX_CHANGES_LIMIT))
+
+        page = get_changes(since, limit)
+        return Response(page._asdict())
+
+    @action(detail=False, methods=["post"])
+    def lookup(self, request, *args, **kwargs):
+        """
+        Resolves the given 'ids' and exact 'names' of authors at once, with
+        a single query served by the primary key and unique name indexes,
+        mapping each one to its author name or id, or to null when there
+        is no such author
+        """
+        serializer = AuthorLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        names = serializer.validated_data["names"]
+
+        found_ids = {}
+        found_names = {}
+        if ids or names:
+            rows = (
+                Author.objects.filter(Q(id__in=ids) | Q(name__in=names))
+                .order_by()
+                .values_list("id", "name")
+            )
+            for author_id, name in rows:
+                found_ids[author_id] = name
+                found_names[name] = author_id
+
+        return Response(
+            {
+                "ids": {
+                    str(author_id): found_ids.get(author_id)
+                    for author_id in ids
+                },
+                "names": {name: found_names.get(name) for name in names},
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        authentication_classes=[APIKeyAuthentication, SessionAuthentication],
+        permission_classes=[DjangoModelPermissions],
+    )
+    def bulk(self, request, *args, **kwargs):
+        """
+        Creates the authors named by the request body, either a JSON array
+        of names, or of objects with a 'name', or a CSV file, whose names
+        column is picked by the 'column' parameter. The body is streamed
+        into postgres 'copy_from' and never held in memory as a whole.
+        Responds with the numbers of names received, of distinct ones and
+        of those inserted or already existing.
+        Only services holding an API key and users allowed to add authors
+        may call it, with up to AUTHORS_BULK_MAX_NAMES names
+        """
+        content_type = request.content_type.split(";")[0].strip().lower()
+        stream = request.stream
+        chunks = iter_text(stream) if stream is not None else iter(())
+        if content_type == JSON_CONTENT_TYPE:
+            names = read_json_names(chunks)
+        elif content_type == CSV_CONTENT_TYPE:
+            csv_format = CSVFormat(request.query_params.get(BULK_COLUMN_PARAM))
+            names = read_names(iter_lines(chunks), csv_format)
+        else:
+            raise UnsupportedMediaType(content_type)
+        names = BulkNames(names, settings.AUTHORS_BULK_MAX_NAMES)
+
+        try:
+            with measure("import"):
+                counts = import_authors_faster(
+                    NamesReader(names, with_keys=True)
+                )
+        # copy_from errors come straight from psycopg2, unwrapped by django
+        except psycopg2.Error as exc:
+            if isinstance(names.error, TooManyNames):
+                raise PayloadTooLarge(str(names.error))
+            if names.error is not None:
+                raise ParseError(str(names.error))
+            if isinstance(exc, psycopg2.DataError):
+                raise ValidationError(exc.diag.message_primary)
+            raise
+
+        return Response(
+            {
+                "received": names.received,
+                "distinct": counts.distinct,
+                "inserted": counts.inserted,
+                "existing": counts.distinct - counts.inserted,
+            }
+        )
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AuthorsConfig(AppConfig):
     name = "authors"
+
+    def ready(self):
+        import authors.checks  # noqa: F401
+        import authors.signals  # noqa: F401
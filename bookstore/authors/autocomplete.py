@@ -0,0 +1,194 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.core.cache import cache
+
+from authors.cache import get_authors_version
+from authors.models import Author
+from authors.utils import PRIMARY_DB
+
+REBUILD_KEY = "authors:names_index:rebuild"
+
+
+class IndexData(NamedTuple):
+    """
+    Immutable snapshot of the names index, swapped as a whole on refresh
+    so searches never see it half updated.
+
+    Entries are casefolded names followed by a NUL character and the
+    position of their author, sorted as plain strings, which is several
+    times faster than sorting keys and positions apart
+    """
+
+    ids: List[int]
+    names: List[str]
+    entries: List[str]
+    # entries of the names from each of their words after the first one,
+    # so 'tol' matches 'Leo Tolstoy'
+    word_entries: List[str]
+
+
+EMPTY_INDEX = IndexData([], [], [], [])
+
+
+def _index_data(
+    ids: List[int], names: List[str], data: IndexData = EMPTY_INDEX
+) -> IndexData:
+    """Index of the given authors added to the ones of 'data'"""
+    entries = list(data.entries)
+    word_entries = list(data.word_entries)
+    for ref, name in enumerate(names, len(data.ids)):
+        key = name.casefold()
+        entries.append(f"{key}\0{ref}")
+        position = key.find(" ")
+        while position != -1:
+            word_entries.append(f"{key[position + 1 :]}\0{ref}")
+            position = key.find(" ", position + 1)
+
+    # entries already indexed come first and sorted, which the sort merges
+    # in linear time with the new ones
+    entries.sort()
+    word_entries.sort()
+    return IndexData(data.ids + ids, data.names + names, entries, word_entries)
+
+
+def _search(entries: List[str], prefix: str) -> Iterable[int]:
+    position = bisect_left(entries, prefix)
+    while position < len(entries) and entries[position].startswith(prefix):
+        yield int(entries[position].rpartition("\0")[2])
+        position += 1
+
+
+def invalidate_names_index() -> None:
+    """
+    Makes every process rebuild its names index from scratch, which must
+    be called when authors are updated or deleted, as the index only
+    picks up newly inserted authors otherwise
+    """
+    cache.set(REBUILD_KEY, time.time(), timeout=None)
+
+
+class NamesIndex:
+    """
+    In-process index of the authors names answering autocomplete queries
+    without querying the database, matching names starting with the query
+    first and then names with a word starting with it, case insensitively.
+
+    It is built on the first search and refreshed when the authors data
+    version changes, only fetching the authors inserted since the last
+    refresh unless authors were updated or deleted meanwhile. Authors are
+    read from the primary, as a lagging replica would make the index miss
+    the authors written by the version it records.
+    Only the first build makes searches wait: afterwards, searches keep
+    being served from the current snapshot while a refresh is underway
+    """
+
+    def __init__(self):
+        self.data = EMPTY_INDEX
+        self.version = None
+        self.rebuild_marker = None
+        self.max_id = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.data.ids)
+
+    def refresh(self) -> None:
+        """Brings the index up to date with the authors data"""
+        version = get_authors_version()
+        if version == self.version:
+            return
+
+        if not self._lock.acquire(blocking=self.version is None):
+            return
+        try:
+            if version == self.version:
+                return
+
+            rebuild_marker = cache.get(REBUILD_KEY)
+            if self.version is None or rebuild_marker != self.rebuild_marker:
+                self.build()
+            else:
+                self._add_new()
+            self.version = version
+            self.rebuild_marker = rebuild_marker
+        finally:
+            self._lock.release()
+
+    def build(self) -> None:
+        """Builds the index from every author"""
+        rows = (
+            Author.objects.using(PRIMARY_DB)
+            .order_by("id")
+            .values_list("id", "name")
+        )
+        ids, names = self._unzip(rows.iterator())
+        self.data = _index_data(ids, names)
+        self.max_id = ids[-1] if ids else 0
+
+    def _add_new(self) -> None:
+        rows = list(
+            Author.objects.using(PRIMARY_DB)
+            .filter(id__gt=self.max_id)
+            .order_by("id")
+            .values_list("id", "name")
+        )
+        # authors committed out of id order, or deleted, are only found by
+        # comparing counts, falling back to a rebuild
+        count = Author.objects.using(PRIMARY_DB).count()
+        if count != len(self.data.ids) + len(rows):
+            self.build()
+            return
+
+        if rows:
+            ids, names = self._unzip(rows)
+            self.data = _index_data(ids, names, self.data)
+            self.max_id = ids[-1]
+
+    @staticmethod
+    def _unzip(rows: Iterable[Tuple[int, str]]) -> Tuple[List, List]:
+        ids = []
+        names = []
+        for author_id, name in rows:
+            ids.append(author_id)
+            names.append(name)
+        return ids, names
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """Top 'limit' authors matching the query, as serialized"""
+        data = self.data
+        prefix = query.strip().casefold().replace("\0", "")
+        if not prefix:
+            return []
+
+        results = []
+        found = set()
+        for refs in (
+            _search(data.entries, prefix),
+            _search(data.word_entries, prefix),
+        ):
+            for ref in refs:
+                if ref in found:
+                    continue
+                found.add(ref)
+                results.append({"id": data.ids[ref], "name": data.names[ref]})
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+_names_index: Optional[NamesIndex] = None
+_names_index_lock = Lock()
+
+
+def get_names_index() -> NamesIndex:
+    """Names index of the process, up to date with the authors data"""
+    global _names_index
+    if _names_index is None:
+        with _names_index_lock:
+            if _names_index is None:
+                _names_index = NamesIndex()
+    _names_index.refresh()
+    return _names_index
@@ -0,0 +1,51 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "authors:version"
+LAST_MODIFIED_KEY = "authors:last_modified"
+
+
+def get_authors_version() -> int:
+    """
+    Current version of the authors data, used to namespace every cached
+    entry derived from it. It starts from the current time in milliseconds
+    so a version lost by a cache eviction or restart is never reused
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_authors_last_modified() -> float:
+    """
+    Timestamp of the last write to the authors data known by the cache,
+    assuming it just happened when it is not known
+    """
+    last_modified = cache.get(LAST_MODIFIED_KEY)
+    if last_modified is None:
+        cache.add(LAST_MODIFIED_KEY, time.time(), timeout=None)
+        last_modified = cache.get(LAST_MODIFIED_KEY)
+    return last_modified
+
+
+def _increment_authors_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        get_authors_version()
+    cache.set(LAST_MODIFIED_KEY, time.time(), timeout=None)
+
+
+def bump_authors_version() -> None:
+    """
+    Invalidates every cached entry derived from the authors data, which
+    must be called whenever authors are written.
+    The version is bumped again once the current transaction commits, so
+    entries cached from a snapshot taken before the commit are discarded
+    """
+    _increment_authors_version()
+    transaction.on_commit(_increment_authors_version)
@@ -0,0 +1,70 @@
+from typing import Dict, List, NamedTuple
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from authors.models import Author
+from authors.utils import PRIMARY_DB
+
+# both created by migration 0005, which keeps its own copies of them
+CHANGE_SEQUENCE = "authors_author_change_seq"
+# key of the advisory lock held in shared mode by every transaction
+# writing authors
+CHANGES_LOCK = int.from_bytes(b"authors", "big")
+STABLE_CHANGE_SEQ_KEY = "authors:changes:stable"
+CHANGES_FIELDS = ["id", "name", "change_seq"]
+
+
+class ChangesPage(NamedTuple):
+    """
+    Authors written after a change sequence number, in the order they were
+    written, and the number to ask for the following ones with
+    """
+
+    results: List[Dict]
+    next_since: int
+    more: bool
+
+
+def get_stable_change_seq() -> int:
+    """
+    Change sequence number up to which every number drawn belongs to a
+    committed write, or to one that will never be, so later writes can
+    only get higher numbers.
+    Numbers are drawn in write order but committed in any order, so the
+    current one is only taken when no write is in progress, found out by
+    briefly trying to lock out the writers without waiting for them.
+    Otherwise the last number taken is used, or 0 when none is known
+    """
+    with transaction.atomic(using=PRIMARY_DB), connections[
+        PRIMARY_DB
+    ].cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [CHANGES_LOCK])
+        if cursor.fetchone()[0]:
+            cursor.execute(
+                f"SELECT last_value, is_called FROM {CHANGE_SEQUENCE}"
+            )
+            last_value, is_called = cursor.fetchone()
+            stable = last_value if is_called else 0
+            cache.set(STABLE_CHANGE_SEQ_KEY, stable, timeout=None)
+            return stable
+    return cache.get(STABLE_CHANGE_SEQ_KEY, 0)
+
+
+def get_changes(since: int, limit: int) -> ChangesPage:
+    """
+    Up to 'limit' authors created or updated after the 'since' change
+    sequence number, seeking on the change sequence index so the cost is
+    proportional to the number of changes rather than to the table size.
+    They are read from the primary, which replicas may lag behind
+    """
+    stable = get_stable_change_seq()
+    rows = list(
+        Author.objects.using(PRIMARY_DB)
+        .filter(change_seq__gt=since, change_seq__lte=stable)
+        .order_by("change_seq")
+        .values(*CHANGES_FIELDS)[: limit + 1]
+    )
+    if len(rows) > limit:
+        return ChangesPage(rows[:limit], rows[limit - 1]["change_seq"], True)
+    return ChangesPage(rows, max(since, stable), False)
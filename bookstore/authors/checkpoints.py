@@ -0,0 +1,143 @@
+import os
+from hashlib import sha256
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional
+
+from django.db import transaction
+
+from authors.models import ImportCheckpoint
+from authors.progress import ImportProgress
+from authors.readers import CSVFormat, read_column, read_header
+from authors.utils import (
+    DEFAULT_CHUNK_SIZE,
+    PRIMARY_DB,
+    NamesReader,
+    import_authors,
+    import_authors_faster,
+)
+
+
+def get_checkpoint(filepath: str) -> ImportCheckpoint:
+    """Checkpoint of the imports of the given file"""
+    checkpoint, _ = ImportCheckpoint.objects.using(PRIMARY_DB).get_or_create(
+        path=os.path.realpath(filepath)
+    )
+    return checkpoint
+
+
+def verify_checkpoint(
+    checkpoint: ImportCheckpoint, csv_file: BinaryIO
+) -> bool:
+    """
+    Whether the file still holds the last committed chunk where the
+    checkpoint says, meaning the import can resume right after it
+    """
+    csv_file.seek(checkpoint.chunk_start)
+    chunk = csv_file.read(checkpoint.offset - checkpoint.chunk_start)
+    return sha256(chunk).hexdigest() == checkpoint.chunk_hash
+
+
+class HashedLines:
+    """
+    Iterator over the decoded lines of a csv file opened in binary mode,
+    tracking the offset reached and the hash of the bytes read since the
+    last call to 'digest'
+    """
+
+    def __init__(self, csv_file: BinaryIO):
+        self.csv_file = csv_file
+        self.offset = csv_file.tell()
+        self.hash = sha256()
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        line = self.csv_file.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        self.hash.update(line)
+        return line.decode("utf-8")
+
+    def seek(self, offset: int) -> None:
+        self.csv_file.seek(offset)
+        self.offset = offset
+        self.hash = sha256()
+
+    def digest(self) -> str:
+        digest = self.hash.hexdigest()
+        self.hash = sha256()
+        return digest
+
+
+def import_authors_checkpointed(
+    csv_file: BinaryIO,
+    checkpoint: ImportCheckpoint,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    faster: bool = False,
+    restart: bool = False,
+    progress: Optional[ImportProgress] = None,
+    csv_format: CSVFormat = CSVFormat(),
+) -> int:
+    """
+    Helper function for importing authors from a csv file opened in
+    binary mode, in chunks of 'chunk_size' rows. Each chunk is committed
+    along with the checkpoint, so a later import of the same file resumes
+    after the last committed chunk, unless the file changed meanwhile or
+    'restart' is given. Returns the offset of the file it resumed from
+    """
+    progress = progress or ImportProgress()
+
+    if checkpoint.offset and (
+        restart or not verify_checkpoint(checkpoint, csv_file)
+    ):
+        checkpoint.chunk_start = checkpoint.offset = checkpoint.rows = 0
+        checkpoint.chunk_hash = ""
+
+    resumed_from = checkpoint.offset
+    csv_file.seek(0)
+    lines = HashedLines(csv_file)
+    header = read_header(lines, csv_format)
+    if header is None:
+        checkpoint.completed = True
+        checkpoint.save()
+        return resumed_from
+
+    if checkpoint.offset:
+        lines.seek(checkpoint.offset)
+    else:
+        checkpoint.offset = lines.offset
+        lines.digest()
+    names = progress.read(read_column(lines, header, csv_format))
+    checkpoint.completed = False
+
+    while not checkpoint.completed:
+        with progress.phase("dedup"):
+            rows = list(islice(names, chunk_size))
+            chunk = set(rows)
+        if not rows:
+            # nothing left, keeping the last chunk to verify the next run
+            checkpoint.completed = True
+            checkpoint.save()
+            break
+
+        with progress.phase("insert"), transaction.atomic(using=PRIMARY_DB):
+            if faster:
+                counts = import_authors_faster(
+                    NamesReader(chunk, with_keys=True)
+                )
+            else:
+                counts = import_authors(chunk)
+
+            checkpoint.chunk_start = checkpoint.offset
+            checkpoint.offset = lines.offset
+            checkpoint.chunk_hash = lines.digest()
+            checkpoint.rows += len(rows)
+            checkpoint.completed = len(rows) < chunk_size
+            checkpoint.save()
+
+        progress.add(counts)
+        progress.maybe_report()
+
+    return resumed_from
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, register
+
+# backends whose entries are only seen by the process storing them
+LOCAL_CACHE_BACKENDS = (DummyCache, LocMemCache)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The version of the authors data is held by the default cache, so
+    writes of any process, like the import command, change the ETags and
+    invalidate the cached pages and counts of the API, and replica routing
+    and the autocomplete index see them. It cannot work with a cache local
+    to each process, which would keep answering 'not modified' forever
+    """
+    if settings.AUTHORS_LOCAL_CACHE_ALLOWED:
+        return []
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LOCAL_CACHE_BACKENDS):
+        return []
+    return [
+        Error(
+            "The default cache is local to each process, so the writes of "
+            "the other processes never change the authors ETags nor "
+            "invalidate the cached authors data.",
+            hint=(
+                "Set CACHE_BACKEND to a shared backend, like a file based, "
+                "memcached or redis one."
+            ),
+            id="authors.E001",
+        )
+    ]
@@ -0,0 +1,273 @@
+"""
+Near-duplicate detection of author names, such as 'J. R. R. Tolkien' and
+'J.R.R. Tolkien' or 'Tolkien, JRR', in roughly linear time.
+
+Names are blocked on a key made of their normalized words, sorted and
+joined, so spacing, punctuation, case, accents and word order differences
+share the same key. Typos, like 'Tolkein', are found through symmetric
+deletion blocking: keys are also indexed by every variant missing one of
+their characters, so keys one insertion, deletion, substitution or
+transposition apart share a variant. Names sharing a variant become
+candidates, verified by the similarity of their keys, so every name is
+only compared with the handful of names it shares a variant with.
+
+The index holds every variant of the names, so its memory grows with the
+number of existing and imported names, by about 400 bytes per name
+"""
+import re
+from array import array
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from authors.models import Author, normalize_name
+from authors.utils import PRIMARY_DB
+
+DEDUP_REPORT = "report"
+DEDUP_SKIP = "skip"
+DEDUP_MODES = (DEDUP_REPORT, DEDUP_SKIP)
+DEFAULT_DEDUP_THRESHOLD = 0.85
+EXISTING_CHUNK_SIZE = 10000
+
+WORD = re.compile(r"\w+")
+# longer keys are only blocked on themselves, as their typos are diluted
+# below the similarity thresholds anyway and they would bloat the index
+MAX_VARIANTS_KEY_LENGTH = 32
+# names kept per variant, bounding the comparisons of every new name
+BUCKET_SIZE = 4
+# variants are indexed as 64 bits integers packing a hash of the variant
+# with the position of a name, so up to 2 ** 28 names can be indexed
+POSITION_BITS = 28
+HASH_BITS = 64 - POSITION_BITS
+MAX_POSITION = (1 << POSITION_BITS) - 1
+HASH_MASK = (1 << HASH_BITS) - 1
+PARTITION_BITS = 16
+PARTITION_SHIFT = HASH_BITS - PARTITION_BITS
+
+
+def dedup_key(name: str) -> str:
+    """
+    Blocking key of an author name, made of its normalized words sorted
+    and joined, so 'Tolkien, J. R. R.' and 'JRR Tolkien' share 'jrrtolkien'
+    """
+    return "".join(sorted(WORD.findall(normalize_name(name))))
+
+
+def variant_hashes(key: str) -> Set[int]:
+    """
+    Hashes of a key and of its variants missing one character, which are
+    shared by the keys one edit apart
+    """
+    if len(key) > MAX_VARIANTS_KEY_LENGTH:
+        return {hash(key) & HASH_MASK}
+    return {
+        hash(key) & HASH_MASK,
+        *(
+            hash(key[:index] + key[index + 1 :]) & HASH_MASK
+            for index in range(len(key))
+        ),
+    }
+
+
+# index in a partition where the packed hash and position of a new name go
+Slot = Tuple[int, int, array]
+
+
+class VariantTable:
+    """
+    Positions of up to BUCKET_SIZE names per variant hash, the first ones
+    added, held as sorted arrays of the packed hashes and positions. They
+    are partitioned by the leading bits of the hashes so an insertion only
+    moves a small array. It takes about 9 bytes per variant, where a dict
+    of hashes to positions takes about 70
+    """
+
+    def __init__(self):
+        self._partitions = [array("Q") for _ in range(1 << PARTITION_BITS)]
+
+    def find(self, hashes: Iterable[int]) -> Tuple[Set[int], List[Slot]]:
+        """
+        Positions held for any of the variant hashes, and the slots where
+        a new position goes in the buckets not full yet
+        """
+        positions = set()
+        slots = []
+        partitions = self._partitions
+        for variant_hash in hashes:
+            partition = partitions[variant_hash >> PARTITION_SHIFT]
+            low = variant_hash << POSITION_BITS
+            start = end = bisect_left(partition, low)
+            for value in partition[start : start + BUCKET_SIZE]:
+                if value >> POSITION_BITS != variant_hash:
+                    break
+                positions.add(value & MAX_POSITION)
+                end += 1
+            if end - start < BUCKET_SIZE:
+                slots.append((end, low, partition))
+        return positions, slots
+
+    @staticmethod
+    def insert(slots: List[Slot], position: int) -> None:
+        """
+        Inserts a position, greater than the ones held, in the slots found
+        for it, the last ones first so the others do not move
+        """
+        for end, low, partition in sorted(slots, reverse=True):
+            partition.insert(end, low | position)
+
+
+class NearDuplicate(NamedTuple):
+    """
+    Name found to be a near-duplicate of an already indexed one, which
+    may be an existing author
+    """
+
+    name: str
+    match: str
+    similarity: float
+    existing: bool
+
+
+class NearDuplicateIndex:
+    """
+    Index of author names finding the near-duplicates of new names among
+    them, the existing authors being loaded first
+    """
+
+    def __init__(self, threshold: float = DEFAULT_DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self.existing = 0
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._by_key: Dict[str, int] = {}
+        self._variants = VariantTable()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _insert(self, name: str, key: str, slots: List[Slot]) -> None:
+        position = len(self._names)
+        if position > MAX_POSITION:
+            raise OverflowError(f"Cannot index more than {MAX_POSITION} names")
+        self._names.append(name)
+        self._keys.append(key)
+        self._by_key[key] = position
+        self._variants.insert(slots, position)
+
+    def _near_duplicate(
+        self, name: str, position: int, ratio: float
+    ) -> NearDuplicate:
+        return NearDuplicate(
+            name, self._names[position], ratio, position < self.existing
+        )
+
+    def _best_candidate(
+        self, key: str, candidates: Set[int]
+    ) -> Tuple[Optional[int], float]:
+        best, best_ratio = None, self.threshold
+        # the new key is the second sequence, whose index is built once
+        matcher = SequenceMatcher(None, "", key, False)
+        for position in candidates:
+            matcher.set_seq1(self._keys[position])
+            if matcher.real_quick_ratio() < best_ratio:
+                continue
+            if matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = position, ratio
+        return best, best_ratio
+
+    def add(self, name: str) -> Optional[NearDuplicate]:
+        """
+        Indexes the name, unless it is a near-duplicate of an indexed one,
+        which is returned instead. Names equal to an indexed one are not
+        near-duplicates
+        """
+        key = dedup_key(name)
+        if not key:
+            return None
+
+        position = self._by_key.get(key)
+        if position is not None:
+            if self._names[position] == name:
+                return None
+            return self._near_duplicate(name, position, 1.0)
+
+        candidates, slots = self._variants.find(variant_hashes(key))
+        position, ratio = self._best_candidate(key, candidates)
+        if position is not None:
+            return self._near_duplicate(name, position, ratio)
+
+        self._insert(name, key, slots)
+        return None
+
+    def add_existing(self, names: Iterable[str]) -> None:
+        """Indexes names of existing authors, before any new one"""
+        for name in names:
+            key = dedup_key(name)
+            if key and key not in self._by_key:
+                _, slots = self._variants.find(variant_hashes(key))
+                self._insert(name, key, slots)
+        self.existing = len(self._names)
+
+
+def build_dedup_index(
+    threshold: float = DEFAULT_DEDUP_THRESHOLD,
+    chunk_size: int = EXISTING_CHUNK_SIZE,
+) -> NearDuplicateIndex:
+    """Near-duplicates index holding the names of every existing author"""
+    index = NearDuplicateIndex(threshold)
+    names = (
+        Author.objects.using(PRIMARY_DB)
+        .order_by()
+        .values_list("name", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+    index.add_existing(names)
+    return index
+
+
+class NearDuplicatesFilter:
+    """
+    Import stage reporting the near-duplicates of a stream of names to
+    'on_duplicate', once per name, and dropping them from the stream when
+    'skip' is set
+    """
+
+    def __init__(
+        self,
+        index: NearDuplicateIndex,
+        skip: bool = False,
+        on_duplicate: Optional[Callable[[NearDuplicate], None]] = None,
+    ):
+        self.index = index
+        self.skip = skip
+        self.on_duplicate = on_duplicate
+        self.found = 0
+        self._reported = set()
+
+    def filter(self, names: Iterable[str]) -> Iterator[str]:
+        for name in names:
+            duplicate = self.index.add(name)
+            if duplicate is None:
+                yield name
+                continue
+
+            if name not in self._reported:
+                self._reported.add(name)
+                self.found += 1
+                if self.on_duplicate is not None:
+                    self.on_duplicate(duplicate)
+            if not self.skip:
+                yield name
@@ -1,11 +1,42 @@
+import csv
+import json
 import os
+from contextlib import ExitStack
 from enum import Enum
 from io import StringIO
-from typing import IO, Set, Union
+from itertools import chain
+from typing import IO, Callable, Dict, Iterator, Optional, Set, Union
 
 from django.core.management.base import BaseCommand
 
-from authors.utils import import_authors, import_authors_faster
+from authors.checkpoints import get_checkpoint, import_authors_checkpointed
+from authors.dedup import (
+    DEDUP_MODES,
+    DEDUP_SKIP,
+    DEFAULT_DEDUP_THRESHOLD,
+    NearDuplicate,
+    NearDuplicatesFilter,
+    build_dedup_index,
+)
+from authors.progress import DEFAULT_PROGRESS_INTERVAL, ImportProgress
+from authors.readers import (
+    CSVFormat,
+    is_csv_path,
+    open_csv,
+    open_csv_binary,
+    read_names,
+)
+from authors.utils import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_WORKERS,
+    NamesReader,
+    copy_escape,
+    import_authors,
+    import_authors_faster,
+    import_authors_parallel,
+    iter_chunks,
+)
 
 
 class MessageType(Enum):
@@ -14,11 +45,134 @@ class MessageType(Enum):
 
 
 class Command(BaseCommand):
-    help = "Imports authors names from a given csv file into the database"
+    help = (
+        "Imports authors names from a given csv file, optionally gzipped, "
+        "into the database"
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("filepath", type=str)
+        parser.add_argument(
+            "--column",
+            type=str,
+            default=None,
+            help=(
+                "Header of the column holding the authors names. Defaults "
+                "to the first column"
+            ),
+        )
+        parser.add_argument(
+            "--delimiter",
+            type=str,
+            default=",",
+            help="Character separating the columns of the file",
+        )
+        parser.add_argument(
+            "--quotechar",
+            type=str,
+            default='"',
+            help=(
+                "Character quoting values holding delimiters or line "
+                "breaks. An empty one disables quoting"
+            ),
+        )
         parser.add_argument("--faster", action="store_true")
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help=(
+                "Read and import the file in chunks, keeping memory usage "
+                "flat regardless of the file size. Duplicated names are "
+                "only removed within each chunk"
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Maximum number of names held in memory when streaming",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help=(
+                "Number of authors inserted per INSERT statement. Defaults "
+                f"to {DEFAULT_BATCH_SIZE} when using more than one worker. "
+                "Ignored with --faster"
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=DEFAULT_WORKERS,
+            help=(
+                "Number of worker threads inserting batches concurrently, "
+                "each one with its own database connection. Ignored with "
+                "--faster"
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=(
+                "Import the file in chunks of --chunk-size lines, committing "
+                "each one along with a checkpoint, so running the command "
+                "again on the same file resumes after the last committed "
+                "chunk. --stream and --workers are ignored"
+            ),
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint of a previous --resume import",
+        )
+        parser.add_argument(
+            "--dedup",
+            choices=DEDUP_MODES,
+            default=None,
+            help=(
+                "Look for near-duplicates of the names, like 'J.R.R. "
+                "Tolkien' for 'J. R. R. Tolkien', among the file and the "
+                "existing authors, and either report or skip them. "
+                "Its index is held in memory, growing by about 400 bytes "
+                "per existing author and per name of the file, even with "
+                "--stream. Ignored with --resume"
+            ),
+        )
+        parser.add_argument(
+            "--dedup-threshold",
+            type=float,
+            default=DEFAULT_DEDUP_THRESHOLD,
+            help=(
+                "Similarity, from 0 to 1, from which names are considered "
+                "near-duplicates"
+            ),
+        )
+        parser.add_argument(
+            "--dedup-report",
+            type=str,
+            default="-",
+            help=(
+                "Path of a CSV file to write the near-duplicates found to, "
+                "or '-' to write them to stdout"
+            ),
+        )
+        parser.add_argument(
+            "--progress-interval",
+            type=float,
+            default=DEFAULT_PROGRESS_INTERVAL,
+            help="Seconds between progress reports",
+        )
+        parser.add_argument(
+            "--summary",
+            type=str,
+            default=None,
+            help=(
+                "Path of a file to write the final import summary to as "
+                "JSON, or '-' to write it to stdout"
+            ),
+        )
 
     def _write_message(
         self, message: str, message_type: MessageType = MessageType.SUCCESS,
@@ -28,17 +182,85 @@ class Command(BaseCommand):
         elif message_type == MessageType.ERROR:
             self.stdout.write(self.style.ERROR(message))
 
+    def _write_progress(self, message: str) -> None:
+        self.stdout.write(message)
+
+    def _write_summary(self, summary: Dict, destination: str) -> None:
+        content = json.dumps(summary, indent=2)
+        if destination == "-":
+            self.stdout.write(content)
+            return
+
+        try:
+            with open(destination, "w", encoding="utf-8") as summary_file:
+                summary_file.write(content)
+        except Exception as exc:
+            self._write_message(
+                f"Error trying to write the summary to {destination}. "
+                f"Got {str(exc)}",
+                MessageType.ERROR,
+            )
+
+    def _open_dedup_report(
+        self, destination: str, stack: ExitStack
+    ) -> Callable[[NearDuplicate], None]:
+        if destination == "-":
+            report_file = self.stdout
+        else:
+            report_file = stack.enter_context(
+                open(destination, "w", encoding="utf-8", newline="")
+            )
+        writer = csv.writer(report_file, lineterminator="\n")
+        writer.writerow(["name", "match", "similarity", "existing"])
+
+        def write_near_duplicate(duplicate: NearDuplicate) -> None:
+            writer.writerow(
+                [
+                    duplicate.name,
+                    duplicate.match,
+                    f"{duplicate.similarity:.2f}",
+                    duplicate.existing,
+                ]
+            )
+
+        return write_near_duplicate
+
+    def _near_duplicates_filter(
+        self,
+        dedup: str,
+        threshold: float,
+        report: str,
+        progress: ImportProgress,
+        stack: ExitStack,
+    ) -> NearDuplicatesFilter:
+        with progress.phase("dedup"):
+            index = build_dedup_index(threshold)
+        return NearDuplicatesFilter(
+            index,
+            skip=dedup == DEDUP_SKIP,
+            on_duplicate=self._open_dedup_report(report, stack),
+        )
+
     def _collect_data(
-        self, filepath: str, faster: bool = False,
+        self,
+        filepath: str,
+        faster: bool = False,
+        progress: Optional[ImportProgress] = None,
+        csv_format: CSVFormat = CSVFormat(),
+        near_duplicates: Optional[NearDuplicatesFilter] = None,
     ) -> Union[IO, Set]:
+        progress = progress or ImportProgress()
         data = set()
         try:
-            with open(filepath, "r", encoding="utf-8") as csv_file:
-                next(csv_file, None)
-                for line in csv_file:
-                    data.add(line.rstrip())
+            with open_csv(filepath) as csv_file:
+                with progress.phase("dedup"):
+                    names = progress.read(read_names(csv_file, csv_format))
+                    if near_duplicates is not None:
+                        names = near_duplicates.filter(names)
+                    for name in names:
+                        data.add(name)
                 if faster:
-                    content = "\n".join(data)
+                    content = "\n".join(copy_escape(name) for name in data)
                     data = StringIO(content)
         except Exception as exc:
             self._write_message(
@@ -47,52 +269,220 @@ class Command(BaseCommand):
             )
         return data
 
+    def _read_names(
+        self, csv_file: IO, csv_format: CSVFormat = CSVFormat()
+    ) -> Iterator[str]:
+        with csv_file:
+            yield from read_names(csv_file, csv_format)
+
+    def _stream_data(
+        self,
+        filepath: str,
+        faster: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[ImportProgress] = None,
+        csv_format: CSVFormat = CSVFormat(),
+        near_duplicates: Optional[NearDuplicatesFilter] = None,
+    ) -> Optional[Union[IO, Iterator[Set]]]:
+        progress = progress or ImportProgress()
+        try:
+            csv_file = open_csv(filepath)
+            names = progress.read(self._read_names(csv_file, csv_format))
+            first_name = next(names, None)
+        except Exception as exc:
+            self._write_message(
+                f"Error trying to read {filepath}. Got {str(exc)}",
+                MessageType.ERROR,
+            )
+            return None
+
+        if first_name is None:
+            return None
+
+        names = chain([first_name], names)
+        if near_duplicates is not None:
+            names = progress.timed(near_duplicates.filter(names), "dedup")
+        if faster:
+            return NamesReader(names, with_keys=True)
+        return progress.timed(iter_chunks(names, chunk_size), "dedup")
+
     def _perform_insertion(
-        self, data: Union[IO, Set], filepath: str, faster: bool = False
-    ) -> None:
+        self,
+        data: Union[IO, Set, Iterator[Set]],
+        filepath: str,
+        faster: bool = False,
+        stream: bool = False,
+        batch_size: Optional[int] = None,
+        workers: int = DEFAULT_WORKERS,
+        progress: Optional[ImportProgress] = None,
+    ) -> bool:
         error_msg = f"Error trying to import authors names from {filepath}. "
         success_message = f"Successfully imported authors from {filepath}"
+        progress = progress or ImportProgress()
 
-        if faster:
-            try:
-                import_authors_faster(data)
-            except Exception as exc:
-                self._write_message(
-                    f"{error_msg} Got {str(exc)}", MessageType.ERROR
-                )
-            else:
-                self._write_message(success_message, MessageType.SUCCESS)
-        else:
-            try:
-                import_authors(data)
-            except Exception as exc:
-                self._write_message(
-                    f"{error_msg} Got {str(exc)}", MessageType.ERROR
+        try:
+            with progress.phase("insert"):
+                if faster:
+                    progress.add(import_authors_faster(data))
+                elif workers > 1:
+                    import_authors_parallel(
+                        chain.from_iterable(data) if stream else data,
+                        batch_size or DEFAULT_BATCH_SIZE,
+                        workers,
+                        on_batch=progress.add,
+                    )
+                elif stream:
+                    for chunk in data:
+                        progress.add(import_authors(chunk, batch_size))
+                        progress.maybe_report()
+                else:
+                    progress.add(import_authors(data, batch_size))
+        except Exception as exc:
+            self._write_message(
+                f"{error_msg} Got {str(exc)}", MessageType.ERROR
+            )
+            return False
+
+        self._write_message(success_message, MessageType.SUCCESS)
+        return True
+
+    def _perform_checkpointed_insertion(
+        self,
+        filepath: str,
+        faster: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        restart: bool = False,
+        progress: Optional[ImportProgress] = None,
+        csv_format: CSVFormat = CSVFormat(),
+    ) -> bool:
+        error_msg = f"Error trying to import authors names from {filepath}. "
+        success_message = f"Successfully imported authors from {filepath}"
+        progress = progress or ImportProgress()
+
+        try:
+            checkpoint = get_checkpoint(filepath)
+            with open_csv_binary(filepath) as csv_file:
+                resumed_from = import_authors_checkpointed(
+                    csv_file,
+                    checkpoint,
+                    chunk_size,
+                    faster,
+                    restart,
+                    progress,
+                    csv_format,
                 )
-            else:
-                self._write_message(success_message, MessageType.SUCCESS)
+        except Exception as exc:
+            self._write_message(
+                f"{error_msg} Got {str(exc)}. Run it again to resume after "
+                f"the last committed chunk",
+                MessageType.ERROR,
+            )
+            return False
+
+        if resumed_from:
+            self._write_progress(
+                f"Resumed {filepath} from byte {resumed_from}"
+            )
+        self._write_message(success_message, MessageType.SUCCESS)
+        return True
 
     def handle(self, *args, **options):
         filepath = options.get("filepath", "")
         faster = options.get("faster")
+        stream = options.get("stream")
+        chunk_size = options.get("chunk_size") or DEFAULT_CHUNK_SIZE
+        batch_size = options.get("batch_size")
+        workers = options.get("workers") or DEFAULT_WORKERS
+        progress_interval = options.get("progress_interval")
+        summary = options.get("summary")
+        if progress_interval is None:
+            progress_interval = DEFAULT_PROGRESS_INTERVAL
+
+        resume = options.get("resume")
+        restart = options.get("restart")
+        dedup = options.get("dedup")
+        csv_format = CSVFormat(
+            options.get("column"),
+            options.get("delimiter") or ",",
+            options.get("quotechar", '"'),
+        )
 
         path_exists = os.path.exists(filepath)
         is_file = os.path.isfile(filepath)
-        is_csv = filepath.endswith(".csv")
-
-        if path_exists and is_file and is_csv:
-            data = self._collect_data(filepath, faster)
+        is_csv = is_csv_path(filepath)
 
-            if data:
-                self._perform_insertion(data, filepath, faster)
-            else:
-                self._write_message(
-                    f"Could not collect data from {filepath} properly or the "
-                    f"file is empty",
-                    MessageType.ERROR,
-                )
-        else:
+        if not (path_exists and is_file and is_csv):
             self._write_message(
                 f"Provided filepath {filepath} does not exist or is not a file",
                 MessageType.ERROR,
             )
+            return
+
+        progress = ImportProgress(self._write_progress, progress_interval)
+        near_duplicates = None
+        with ExitStack() as stack:
+            if resume:
+                success = self._perform_checkpointed_insertion(
+                    filepath, faster, chunk_size, restart, progress, csv_format
+                )
+            else:
+                if dedup:
+                    near_duplicates = self._near_duplicates_filter(
+                        dedup,
+                        options.get("dedup_threshold")
+                        or DEFAULT_DEDUP_THRESHOLD,
+                        options.get("dedup_report") or "-",
+                        progress,
+                        stack,
+                    )
+                if stream:
+                    data = self._stream_data(
+                        filepath,
+                        faster,
+                        chunk_size,
+                        progress,
+                        csv_format,
+                        near_duplicates,
+                    )
+                else:
+                    data = self._collect_data(
+                        filepath, faster, progress, csv_format, near_duplicates
+                    )
+
+                if not data:
+                    self._write_message(
+                        f"Could not collect data from {filepath} properly or "
+                        f"the file is empty",
+                        MessageType.ERROR,
+                    )
+                    return
+
+                success = self._perform_insertion(
+                    data,
+                    filepath,
+                    faster,
+                    stream,
+                    batch_size,
+                    workers,
+                    progress,
+                )
+
+        progress.finish()
+        self._write_progress(progress.describe())
+        if summary:
+            self._write_summary(
+                {
+                    "filepath": filepath,
+                    "faster": faster,
+                    "stream": stream,
+                    "resume": resume,
+                    "workers": workers,
+                    "success": success,
+                    "dedup": dedup,
+                    "near_duplicates": (
+                        near_duplicates.found if near_duplicates else None
+                    ),
+                    **progress.summary(),
+                },
+                summary,
+            )
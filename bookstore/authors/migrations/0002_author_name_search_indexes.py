@@ -0,0 +1,43 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Indexes are built concurrently so that the migration does not block
+# writes on an already populated authors table, which is not possible
+# inside a transaction.
+# Both are expression indexes, matching the SQL generated by the lookups
+# used in AuthorFilter, hence they are declared as raw SQL.
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("authors", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "authors_author_name_upper_trgm ON authors_author "
+                "USING gin (UPPER(name::text) gin_trgm_ops)"
+            ),
+            reverse_sql=(
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                "authors_author_name_upper_trgm"
+            ),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "authors_author_name_tsvector ON authors_author "
+                "USING gin (to_tsvector('simple'::regconfig, name::text))"
+            ),
+            reverse_sql=(
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                "authors_author_name_tsvector"
+            ),
+        ),
+    ]
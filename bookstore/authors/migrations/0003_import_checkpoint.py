@@ -0,0 +1,46 @@
+# Generated by Django 3.0.7 on 2026-10-18 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authors", "0002_author_name_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.CharField(max_length=1024, unique=True)),
+                ("chunk_start", models.BigIntegerField(default=0)),
+                ("offset", models.BigIntegerField(default=0)),
+                ("chunk_hash", models.CharField(blank=True, max_length=64)),
+                ("rows", models.BigIntegerField(default=0)),
+                ("completed", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Import checkpoint",
+                "verbose_name_plural": "Import checkpoints",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="author",
+            options={
+                "ordering": ["name"],
+                "verbose_name": "Author",
+                "verbose_name_plural": "Authors",
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+import unicodedata
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 5000
+
+# Like 0002 this migration is not atomic: existing authors are given their
+# name keys in batches committed one at a time, and the indexes are built
+# concurrently, so an already populated authors table is never locked for
+# the whole migration.
+# The btree index uses 'text_pattern_ops' so it serves prefix searches,
+# compiled to LIKE 'prefix%', besides exact ones, while contains searches
+# are served by the trigram index.
+
+
+def normalize_name(name: str) -> str:
+    """
+    Copy of authors.models.normalize_name at the time of this migration,
+    which must keep running the same whatever that function becomes
+    """
+    if name.isascii():
+        return name.lower()
+
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return unicodedata.normalize("NFC", stripped.casefold())
+
+
+def populate_name_keys(apps, schema_editor):
+    Author = apps.get_model("authors", "Author")
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            authors = list(
+                Author.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "name")[:BATCH_SIZE]
+            )
+            if not authors:
+                break
+            for author in authors:
+                author.name_key = normalize_name(author.name)
+            Author.objects.bulk_update(authors, ["name_key"])
+        last_id = authors[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("authors", "0003_import_checkpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="name_key",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.RunPython(
+            populate_name_keys, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "authors_author_name_key_pattern ON authors_author "
+                "USING btree (name_key text_pattern_ops)"
+            ),
+            reverse_sql=(
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                "authors_author_name_key_pattern"
+            ),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "authors_author_name_key_trgm ON authors_author "
+                "USING gin (name_key gin_trgm_ops)"
+            ),
+            reverse_sql=(
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                "authors_author_name_key_trgm"
+            ),
+        ),
+    ]
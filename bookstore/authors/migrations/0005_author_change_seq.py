@@ -0,0 +1,99 @@
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 5000
+# copies of the values in authors.changes at the time of this migration,
+# which must keep running the same whatever that module becomes
+CHANGE_SEQUENCE = "authors_author_change_seq"
+CHANGES_LOCK = int.from_bytes(b"authors", "big")
+
+# Like 0004 this migration is not atomic, so existing authors are given
+# their change sequence numbers in batches and the index is built
+# concurrently.
+# Sequence numbers are drawn by a trigger, so every write gets one no
+# matter whether it comes from the ORM, bulk_create or a COPY import.
+# Writing statements take a shared advisory lock released at commit,
+# which lets the change feed wait for the numbers already drawn to be
+# committed, see authors.changes.get_stable_change_seq.
+
+CREATE_TRIGGERS = f"""
+CREATE SEQUENCE IF NOT EXISTS {CHANGE_SEQUENCE};
+
+CREATE OR REPLACE FUNCTION authors_author_lock_changes() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock_shared({CHANGES_LOCK});
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION authors_author_set_change_seq() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.change_seq := nextval('{CHANGE_SEQUENCE}');
+    RETURN NEW;
+END $$;
+
+CREATE TRIGGER authors_author_lock_changes
+BEFORE INSERT OR UPDATE ON authors_author
+FOR EACH STATEMENT EXECUTE FUNCTION authors_author_lock_changes();
+
+CREATE TRIGGER authors_author_set_change_seq
+BEFORE INSERT OR UPDATE ON authors_author
+FOR EACH ROW EXECUTE FUNCTION authors_author_set_change_seq();
+"""
+
+DROP_TRIGGERS = f"""
+DROP TRIGGER IF EXISTS authors_author_set_change_seq ON authors_author;
+DROP TRIGGER IF EXISTS authors_author_lock_changes ON authors_author;
+DROP FUNCTION IF EXISTS authors_author_set_change_seq();
+DROP FUNCTION IF EXISTS authors_author_lock_changes();
+DROP SEQUENCE IF EXISTS {CHANGE_SEQUENCE};
+"""
+
+
+def populate_change_seqs(apps, schema_editor):
+    Author = apps.get_model("authors", "Author")
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Author.objects.filter(id__gt=last_id, change_seq=0)
+                .order_by("id")
+                .values_list("id", flat=True)[:BATCH_SIZE]
+            )
+            if not ids:
+                break
+            # the value set is replaced by the trigger
+            Author.objects.filter(id__in=ids).update(change_seq=0)
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("authors", "0004_author_name_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="change_seq",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(sql=CREATE_TRIGGERS, reverse_sql=DROP_TRIGGERS),
+        migrations.RunPython(
+            populate_change_seqs, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "authors_author_change_seq_idx ON authors_author "
+                "USING btree (change_seq)"
+            ),
+            reverse_sql=(
+                "DROP INDEX CONCURRENTLY IF EXISTS "
+                "authors_author_change_seq_idx"
+            ),
+        ),
+    ]
@@ -1,12 +1,34 @@
+import unicodedata
+
 from django.db import models
 
 
+def normalize_name(name: str) -> str:
+    """
+    Search key of an author name, without accents and casefolded, so
+    'Émile' and 'EMILE' share the key 'emile'
+    """
+    if name.isascii():
+        return name.lower()
+
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    return unicodedata.normalize("NFC", stripped.casefold())
+
+
 class Author(models.Model):
     """Model definition for Author"""
 
     name = models.CharField(
         max_length=200, null=False, blank=False, unique=True
     )
+    # maintained on save and by the import helpers, which bypass it
+    name_key = models.TextField(default="", editable=False)
+    # drawn by a database trigger on every insert and update, so it is
+    # outdated on instances right after they are saved
+    change_seq = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         """Meta definition for Author"""
@@ -18,3 +40,36 @@ class Author(models.Model):
     def __str__(self):
         """Unicode representation of Author"""
         return self.name
+
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_name(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "name_key"}
+        super().save(*args, **kwargs)
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Model definition for the progress of a checkpointed authors import,
+    recording where the last committed chunk of a file ends and the hash
+    of its content, which must still match for the import to resume
+    """
+
+    path = models.CharField(max_length=1024, unique=True)
+    chunk_start = models.BigIntegerField(default=0)
+    offset = models.BigIntegerField(default=0)
+    chunk_hash = models.CharField(max_length=64, blank=True)
+    rows = models.BigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta definition for ImportCheckpoint"""
+
+        verbose_name = "Import checkpoint"
+        verbose_name_plural = "Import checkpoints"
+
+    def __str__(self):
+        """Unicode representation of ImportCheckpoint"""
+        return f"{self.path} ({self.offset})"
@@ -0,0 +1,138 @@
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from authors.utils import ImportCounts
+
+DEFAULT_PROGRESS_INTERVAL = 10.0
+PHASES = ("read", "dedup", "insert")
+REPORT_CHECK_ROWS = 1000
+
+T = TypeVar("T")
+
+
+class ImportProgress:
+    """
+    Counters and timings of an authors import, reported through 'report'
+    at most once every 'interval' seconds.
+
+    Time is accounted to the read, dedup and insert phases exclusively:
+    when a phase runs within another one, like names read while chunks are
+    deduplicated, its time is not counted for the outer phase
+    """
+
+    def __init__(
+        self,
+        report: Optional[Callable[[str], None]] = None,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+    ):
+        self.report = report
+        self.interval = interval
+        self.rows_read = 0
+        self.distinct = 0
+        self.inserted = 0
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.started = time.perf_counter()
+        self.finished = None
+        self._nested: List[float] = []
+        self._lock = Lock()
+        self._next_report = self.started + interval
+
+    @property
+    def skipped(self) -> int:
+        """Rows not inserted, being repeated or already existing"""
+        return self.rows_read - self.inserted
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Accounts the time spent in the context to the given phase"""
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.durations[name] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def timed(self, items: Iterable[T], name: str) -> Iterator[T]:
+        """Iterates over 'items' accounting their production to a phase"""
+        items = iter(items)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            yield item
+
+    def read(self, names: Iterable[str]) -> Iterator[str]:
+        """
+        Iterates over 'names' counting them and accounting their reading
+        to the read phase, kept lean as it runs once per row
+        """
+        durations = self.durations
+        nested = self._nested
+        names = iter(names)
+        while True:
+            start = time.perf_counter()
+            name = next(names, None)
+            elapsed = time.perf_counter() - start
+            durations["read"] += elapsed
+            if nested:
+                nested[-1] += elapsed
+            if name is None:
+                return
+
+            self.rows_read += 1
+            if not self.rows_read % REPORT_CHECK_ROWS:
+                self.maybe_report()
+            yield name
+
+    def add(self, counts: ImportCounts) -> None:
+        """Adds the counts of an imported batch, from any thread"""
+        with self._lock:
+            self.distinct += counts.distinct
+            self.inserted += counts.inserted
+
+    def maybe_report(self) -> None:
+        """Reports the progress when 'interval' seconds have passed"""
+        now = time.perf_counter()
+        if self.report is not None and now >= self._next_report:
+            self._next_report = now + self.interval
+            self.report(self.describe())
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    def describe(self) -> str:
+        elapsed = self.elapsed
+        rate = self.rows_read / elapsed if elapsed else 0.0
+        return (
+            f"Read {self.rows_read} rows, {self.distinct} distinct, "
+            f"{self.inserted} inserted, {self.skipped} skipped in "
+            f"{elapsed:.1f}s ({rate:.0f} rows/s)"
+        )
+
+    def summary(self) -> Dict:
+        elapsed = self.elapsed
+        return {
+            "rows_read": self.rows_read,
+            "distinct": self.distinct,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_read / elapsed, 1)
+            if elapsed
+            else 0.0,
+            "phases_seconds": {
+                name: round(duration, 3)
+                for name, duration in self.durations.items()
+            },
+        }
@@ -0,0 +1,268 @@
+import codecs
+import csv
+import gzip
+import json
+import re
+from itertools import chain
+from typing import (
+    IO,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+CSV_SUFFIXES = (".csv", ".csv.gz")
+GZIP_SUFFIX = ".gz"
+DEFAULT_TEXT_CHUNK_SIZE = 64 * 1024
+# size of the JSON text buffered while waiting for an element to complete
+MAX_JSON_ELEMENT_SIZE = 1024 * 1024
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class CSVFormat(NamedTuple):
+    """
+    Dialect of an authors csv file and the header of the column holding
+    the names, the first column when not given. An empty 'quotechar'
+    disables quoting
+    """
+
+    column: Optional[str] = None
+    delimiter: str = ","
+    quotechar: str = '"'
+
+    @property
+    def reader_options(self) -> Dict:
+        if not self.quotechar:
+            return {"delimiter": self.delimiter, "quoting": csv.QUOTE_NONE}
+        return {"delimiter": self.delimiter, "quotechar": self.quotechar}
+
+
+def is_csv_path(filepath: str) -> bool:
+    return filepath.endswith(CSV_SUFFIXES)
+
+
+def open_csv(filepath: str) -> IO[str]:
+    """Opens a csv file as text, decompressing it when gzipped"""
+    if filepath.endswith(GZIP_SUFFIX):
+        return gzip.open(filepath, "rt", encoding="utf-8", newline="")
+    return open(filepath, "r", encoding="utf-8", newline="")
+
+
+def open_csv_binary(filepath: str) -> BinaryIO:
+    """Opens a csv file as bytes, decompressing it when gzipped"""
+    if filepath.endswith(GZIP_SUFFIX):
+        return gzip.open(filepath, "rb")
+    return open(filepath, "rb")
+
+
+def read_header(
+    lines: Iterator[str], csv_format: CSVFormat = CSVFormat()
+) -> Optional[List[str]]:
+    """
+    Reads the header of a csv file, checking it holds the names column.
+    Returns None for an empty file
+    """
+    header = next(csv.reader(lines, **csv_format.reader_options), None)
+    if header is None:
+        return None
+
+    header = [field.strip().lstrip("\ufeff") for field in header]
+    if csv_format.column is not None and csv_format.column not in header:
+        raise ValueError(f"Column {csv_format.column} not found in the header")
+    return header
+
+
+def _read_single_column(
+    lines: Iterator[str], csv_format: CSVFormat
+) -> Iterator[str]:
+    # lines without quotes or delimiters are taken as they are, handing
+    # only the remaining ones, and the lines of multiline values, to the
+    # csv module, which doubles the throughput of single column files
+    options = csv_format.reader_options
+    delimiter = csv_format.delimiter
+    quotechar = csv_format.quotechar or delimiter
+    # the header being the first line of the file
+    line_num = 1
+    for line in lines:
+        line_num += 1
+        if delimiter in line or quotechar in line:
+            reader = csv.reader(chain([line], lines), **options)
+            record = next(reader, None) or [""]
+            if len(record) > 1:
+                raise ValueError(
+                    f"Line {line_num} has {len(record)} columns, expected 1"
+                )
+            line_num += reader.line_num - 1
+            line = record[0]
+        name = line.strip()
+        if name:
+            yield name
+
+
+def _read_columns(
+    lines: Iterator[str], index: int, csv_format: CSVFormat
+) -> Iterator[str]:
+    reader = csv.reader(lines, **csv_format.reader_options)
+    for record in reader:
+        if not record:
+            continue
+        try:
+            name = record[index].strip()
+        except IndexError:
+            # the header being the first line of the file
+            line_num = reader.line_num + 1
+            raise ValueError(
+                f"Line {line_num} has no column {index + 1}"
+            ) from None
+        if name:
+            yield name
+
+
+def read_column(
+    lines: Iterator[str],
+    header: List[str],
+    csv_format: CSVFormat = CSVFormat(),
+) -> Iterator[str]:
+    """
+    Reads the names of the column, skipping blank ones, from the csv
+    lines following the given header
+    """
+    if len(header) == 1:
+        return _read_single_column(lines, csv_format)
+
+    index = 0 if csv_format.column is None else header.index(csv_format.column)
+    return _read_columns(lines, index, csv_format)
+
+
+def read_names(
+    lines: Iterable[str], csv_format: CSVFormat = CSVFormat()
+) -> Iterator[str]:
+    """Reads the names of the column from csv lines, header included"""
+    lines = iter(lines)
+    header = read_header(lines, csv_format)
+    if header is None:
+        return iter(())
+    return read_column(lines, header, csv_format)
+
+
+def iter_text(
+    stream: BinaryIO, chunk_size: int = DEFAULT_TEXT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Decodes a binary UTF-8 stream, like a request body, in chunks"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Splits text chunks into lines, keeping their line breaks"""
+    pending = ""
+    for chunk in chunks:
+        *lines, pending = f"{pending}{chunk}".split("\n")
+        for line in lines:
+            yield f"{line}\n"
+    if pending:
+        yield pending
+
+
+def _json_name(value) -> str:
+    if isinstance(value, dict):
+        value = value.get("name")
+    if not isinstance(value, str):
+        raise ValueError(
+            "JSON array elements must be names or objects with a name"
+        )
+    return value.strip()
+
+
+class JSONArrayReader:
+    """
+    Iterator over the elements of a JSON array split in text chunks,
+    decoding one element at a time so the whole array is never held in
+    memory
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+
+    def _read_more(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        self._buffer = f"{self._buffer[self._position :]}{chunk}"
+        self._position = 0
+        return True
+
+    def _skip_whitespace(self) -> bool:
+        """Skips whitespace, telling whether there is anything after it"""
+        while True:
+            match = JSON_WHITESPACE.match(self._buffer, self._position)
+            self._position = match.end()
+            if self._position < len(self._buffer):
+                return True
+            if not self._read_more():
+                return False
+
+    def _next_char(self) -> str:
+        if not self._skip_whitespace():
+            raise ValueError("Unterminated JSON array")
+        return self._buffer[self._position]
+
+    def _decode(self):
+        self._next_char()
+        while True:
+            try:
+                value, self._position = self._decoder.raw_decode(
+                    self._buffer, self._position
+                )
+                return value
+            except json.JSONDecodeError:
+                size = len(self._buffer) - self._position
+                if size > MAX_JSON_ELEMENT_SIZE or not self._read_more():
+                    raise
+
+    def __iter__(self) -> Iterator:
+        if not self._skip_whitespace() or self._next_char() != "[":
+            raise ValueError("Expected a JSON array")
+        self._position += 1
+
+        if self._next_char() == "]":
+            self._position += 1
+        else:
+            while True:
+                yield self._decode()
+                char = self._next_char()
+                self._position += 1
+                if char == "]":
+                    break
+                if char != ",":
+                    raise ValueError("Expected ',' or ']' in the JSON array")
+
+        if self._skip_whitespace():
+            raise ValueError("Unexpected data after the JSON array")
+
+
+def read_json_names(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Reads the names of a JSON array, of strings or of objects with a
+    'name', from text chunks, skipping blank ones
+    """
+    for value in JSONArrayReader(chunks):
+        name = _json_name(value)
+        if name:
+            yield name
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authors.autocomplete import invalidate_names_index
+from authors.cache import bump_authors_version
+from authors.models import Author
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_authors_cache(sender, created=False, **kwargs):
+    bump_authors_version()
+    if not created:
+        invalidate_names_index()
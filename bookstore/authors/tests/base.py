@@ -1,20 +1,36 @@
 import os
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 
 APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 FIXTURES_DIR = os.path.join(APP_DIR, "tests/fixtures")
 EXPECTED_NAMES = set()
 
 
+def load_expected_names():
+    filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+    with open(filepath, "r", encoding="utf-8") as csv_file:
+        next(csv_file, None)
+        for line in csv_file:
+            EXPECTED_NAMES.add(line.rstrip())
+
+
 class TestAuthorsBase(TestCase):
     """Common base class for testing authors related cases"""
 
     @classmethod
     def setUpClass(cls):
-        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
-        with open(filepath, "r", encoding="utf-8") as csv_file:
-            next(csv_file, None)
-            for line in csv_file:
-                EXPECTED_NAMES.add(line.rstrip())
+        load_expected_names()
+        super().setUpClass()
+
+
+class TransactionTestAuthorsBase(TransactionTestCase):
+    """
+    Common base class for testing authors related cases that commit data
+    from other threads or connections
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        load_expected_names()
         super().setUpClass()
@@ -1,14 +1,28 @@
+import csv
+import json
+from io import StringIO
 from unittest.mock import patch
+from urllib.parse import urlencode
 
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
 from django.urls import reverse
+from django.utils.module_loading import import_string
 
+import authors.cache
+from authors.api import pagination
+from authors.models import Author
 from authors.tests.base import EXPECTED_NAMES, TestAuthorsBase
 from authors.utils import import_authors
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.test import APITestCase
 
 TEST_SERVER = "http://testserver"
+API_KEY = "test-api-key"
 
 
 class AuthorsAPITests(TestAuthorsBase, APITestCase):
@@ -17,6 +31,9 @@ class AuthorsAPITests(TestAuthorsBase, APITestCase):
         super().setUpClass()
         import_authors(EXPECTED_NAMES)
 
+    def setUp(self):
+        cache.clear()
+
     def test_authors_list(self):
         """
         It retrieves all authors listing them in alphabetical order
@@ -202,3 +219,589 @@ class AuthorsAPITests(TestAuthorsBase, APITestCase):
         self.assertEqual(response_data["previous"], None)
         self.assertIn("results", response_data)
         self.assertEqual(response_data["results"], [])
+
+    def test_authors_full_text_search(self):
+        """
+        It returns authors whose names contain all the searched words
+        """
+        url = reverse("authors-list")
+        response = self.client.get(url, {"search": "carter sarah"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+
+        self.assertEqual(response_data["count"], 1)
+        self.assertEqual(response_data["results"][0]["name"], "Sarah Carter")
+
+    def test_cursor_paginated_authors_list(self):
+        """
+        It retrieves all authors listing them in alphabetical order
+        on a keyset paginated response without counting them
+        """
+        url = reverse("authors-list")
+        authors = []
+        next_url = f"{url}?pagination=cursor"
+        while next_url:
+            with patch.object(CursorPagination, "page_size", new=10):
+                response = self.client.get(next_url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response_data = response.json()
+
+            self.assertNotIn("count", response_data)
+            self.assertIn("previous", response_data)
+            self.assertLessEqual(len(response_data["results"]), 10)
+            authors.extend(
+                author["name"] for author in response_data["results"]
+            )
+            next_url = response_data["next"]
+
+        self.assertEqual(authors, sorted(EXPECTED_NAMES))
+
+    def test_cursor_paginated_partial_match(self):
+        """
+        It returns keyset paginated authors when the search is a partial
+        match of their names
+        """
+        url = reverse("authors-list")
+        with patch.object(CursorPagination, "page_size", new=1):
+            response = self.client.get(
+                url, {"name": "sarah", "pagination": "cursor"}
+            )
+            response_data = response.json()
+            self.assertEqual(
+                [author["name"] for author in response_data["results"]],
+                ["Sarah Carter"],
+            )
+
+            response = self.client.get(response_data["next"])
+
+        response_data = response.json()
+        self.assertEqual(
+            [author["name"] for author in response_data["results"]],
+            ["Sarah Morgan"],
+        )
+        self.assertIsNone(response_data["next"])
+
+    @override_settings(AUTHORS_PAGINATION="cursor")
+    def test_cursor_pagination_setting(self):
+        """It uses keyset pagination by default when configured to"""
+        response = self.client.get(reverse("authors-list"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+        self.assertNotIn("count", response_data)
+
+        response = self.client.get(
+            reverse("authors-list"), {"pagination": "page"}
+        )
+        self.assertEqual(response.json()["count"], len(EXPECTED_NAMES))
+
+    def test_invalid_pagination(self):
+        """It returns a bad request for an unknown pagination mode"""
+        response = self.client.get(
+            reverse("authors-list"), {"pagination": "offset"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("pagination", response.json())
+
+        response = self.client.get(
+            reverse("authors-list"),
+            {"pagination": "offset"},
+            HTTP_ACCEPT="text/html",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertContains(
+            response, "Must be one of", status_code=400, html=False
+        )
+
+    def test_authors_list_without_count(self):
+        """
+        It retrieves paginated authors without counting them when the count
+        is disabled by the query parameter
+        """
+        url = reverse("authors-list")
+        with patch.object(PageNumberPagination, "page_size", new=20):
+            with self.assertNumQueries(1):
+                response = self.client.get(url, {"count": "false"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+
+        self.assertIsNone(response_data["count"])
+        self.assertEqual(
+            response_data["next"], f"{TEST_SERVER}{url}?count=false&page=2"
+        )
+        self.assertIsNone(response_data["previous"])
+        authors = [author["name"] for author in response_data["results"]]
+        self.assertEqual(authors, sorted(EXPECTED_NAMES)[:20])
+
+        with patch.object(PageNumberPagination, "page_size", new=20):
+            response = self.client.get(response_data["next"])
+
+        response_data = response.json()
+        self.assertIsNone(response_data["next"])
+        self.assertEqual(
+            response_data["previous"], f"{TEST_SERVER}{url}?count=false"
+        )
+        authors = [author["name"] for author in response_data["results"]]
+        self.assertEqual(authors, sorted(EXPECTED_NAMES)[20:])
+
+        with patch.object(PageNumberPagination, "page_size", new=20):
+            response = self.client.get(url, {"count": "false", "page": 3})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url, {"count": "false", "page": "last"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filtered_count_cached(self):
+        """
+        It counts a filtered search once, sharing the cached count between
+        searches differing only by letter case
+        """
+        url = reverse("authors-list")
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"name": "sarah"})
+        self.assertEqual(response.json()["count"], 2)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"name": "SARAH", "page": 1})
+        self.assertEqual(response.json()["count"], 2)
+
+    def test_unfiltered_count_estimated(self):
+        """
+        It serves the estimated count of authors from postgres statistics
+        when the table is big enough
+        """
+        url = reverse("authors-list")
+        with patch.object(pagination, "estimate_count", return_value=5000):
+            with override_settings(AUTHORS_COUNT_ESTIMATE_THRESHOLD=1000):
+                response = self.client.get(url)
+
+        self.assertEqual(response.json()["count"], 5000)
+
+    def test_estimated_count_page_bounds(self):
+        """
+        It bounds pages by the authors found rather than by the estimated
+        count, which is only reported
+        """
+        url = reverse("authors-list")
+        for estimate in (1, 5000):
+            cache.clear()
+            with self.subTest(estimate=estimate), patch.object(
+                pagination, "estimate_count", return_value=estimate
+            ), patch.object(
+                PageNumberPagination, "page_size", new=20
+            ), override_settings(
+                AUTHORS_COUNT_ESTIMATE_THRESHOLD=1
+            ):
+                response_data = self.client.get(url).json()
+                self.assertEqual(response_data["count"], estimate)
+                authors = [a["name"] for a in response_data["results"]]
+                self.assertEqual(
+                    response_data["next"], f"{TEST_SERVER}{url}?page=2"
+                )
+
+                response_data = self.client.get(response_data["next"]).json()
+                self.assertIsNone(response_data["next"])
+                authors += [a["name"] for a in response_data["results"]]
+                self.assertEqual(authors, sorted(EXPECTED_NAMES))
+
+                response = self.client.get(url, {"page": 3})
+                self.assertEqual(
+                    response.status_code, status.HTTP_404_NOT_FOUND
+                )
+
+                response_data = self.client.get(url, {"page": "last"}).json()
+                self.assertEqual(
+                    response_data["previous"], f"{TEST_SERVER}{url}"
+                )
+                self.assertIsNone(response_data["next"])
+
+    def test_estimate_count(self):
+        """It reads the number of authors from postgres statistics"""
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE authors_author")
+
+        self.assertEqual(
+            pagination.estimate_count(Author.objects.all()),
+            len(EXPECTED_NAMES),
+        )
+
+    def test_authors_list_cached(self):
+        """
+        It serves repeated requests from the cache without querying the
+        database until authors are written
+        """
+        url = reverse("authors-list")
+        response = self.client.get(url, {"name": "sarah"})
+        self.assertEqual(response.json()["count"], 2)
+
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(url, {"name": "sarah"})
+        self.assertEqual(cached_response.json(), response.json())
+
+        import_authors({"Sarah Connor"})
+
+        response = self.client.get(url, {"name": "sarah"})
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_authors_list_cache_per_page_size(self):
+        """It does not serve pages cached with a different page size"""
+        url = reverse("authors-list")
+        response = self.client.get(url)
+        self.assertEqual(len(response.json()["results"]), len(EXPECTED_NAMES))
+
+        with patch.object(PageNumberPagination, "page_size", new=20):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()["results"]), 20)
+
+    @override_settings(AUTHORS_LIST_CACHE_TIMEOUT=0)
+    def test_authors_list_cache_disabled(self):
+        """It always queries the database when the cache is disabled"""
+        url = reverse("authors-list")
+        self.client.get(url, {"name": "sarah"})
+
+        with self.assertNumQueries(1):
+            self.client.get(url, {"name": "sarah"})
+
+    def test_authors_list_etag(self):
+        """
+        It answers a revalidation with an up to date ETag with a
+        'not modified' response without querying the database
+        """
+        url = reverse("authors-list")
+        response = self.client.get(url, {"name": "sarah"})
+        etag = response["ETag"]
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url, {"name": "sarah"}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+        response = self.client.get(
+            url, {"name": "morgan"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_authors_list_etag_changed(self):
+        """It returns the updated list when authors were written since"""
+        url = reverse("authors-list")
+        etag = self.client.get(url, {"name": "sarah"})["ETag"]
+
+        import_authors({"Sarah Connor"})
+
+        response = self.client.get(
+            url, {"name": "sarah"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_authors_list_etag_changed_by_other_process(self):
+        """
+        It returns the updated list when authors were written by another
+        process, like the import command, through its own cache client
+        """
+        url = reverse("authors-list")
+        etag = self.client.get(url, {"name": "sarah"})["ETag"]
+
+        options = settings.CACHES["default"]
+        other_cache = import_string(options["BACKEND"])(
+            options.get("LOCATION", ""), options
+        )
+        with patch.object(authors.cache, "cache", other_cache):
+            import_authors({"Sarah Connor"})
+
+        response = self.client.get(
+            url, {"name": "sarah"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_authors_list_last_modified(self):
+        """
+        It answers a revalidation with an up to date modification date
+        with a 'not modified' response without querying the database
+        """
+        url = reverse("authors-list")
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["Last-Modified"], last_modified)
+
+    def test_fast_authors_list_same_content(self):
+        """
+        It lists authors without the model serializer producing the same
+        content as the serializer does
+        """
+        import_authors({'Jos\u00e9 "Z\u00e9" Saramago', "Sep\u2028arator"})
+        url = reverse("authors-list")
+        for params in ({}, {"name": "sarah"}, {"pagination": "cursor"}):
+            with override_settings(AUTHORS_FAST_LIST=False):
+                expected = self.client.get(url, params).content
+            cache.clear()
+            with override_settings(AUTHORS_FAST_LIST=True):
+                content = self.client.get(url, params).content
+            cache.clear()
+            self.assertEqual(content, expected)
+
+    def test_authors_export_ndjson(self):
+        """It streams every author as one JSON object per line"""
+        url = reverse("authors-export")
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        content = b"".join(response.streaming_content).decode()
+        authors = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(
+            [author["name"] for author in authors], sorted(EXPECTED_NAMES)
+        )
+        self.assertEqual(
+            authors[0],
+            {
+                "id": Author.objects.get(name=authors[0]["name"]).id,
+                "name": authors[0]["name"],
+            },
+        )
+
+    def test_authors_export_csv(self):
+        """
+        It streams the authors matching the filters as CSV when asked for
+        """
+        url = reverse("authors-export")
+        response = self.client.get(url, {"name": "sarah", "format": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("authors.csv", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+
+        self.assertEqual(rows[0], ["id", "name"])
+        self.assertEqual(
+            [row[1] for row in rows[1:]], ["Sarah Carter", "Sarah Morgan"]
+        )
+
+    def test_authors_export_accept_header(self):
+        """It picks the export format from the 'Accept' header"""
+        url = reverse("authors-export")
+        with override_settings(AUTHORS_EXPORT_CHUNK_SIZE=5):
+            response = self.client.get(url, HTTP_ACCEPT="text/csv")
+            content = b"".join(response.streaming_content).decode()
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.reader(StringIO(content)))
+        self.assertEqual(len(rows), len(EXPECTED_NAMES) + 1)
+
+    def test_authors_export_not_acceptable(self):
+        """It refuses to export authors in an unsupported format"""
+        url = reverse("authors-export")
+        response = self.client.get(url, HTTP_ACCEPT="application/xml")
+
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+
+    def test_authors_lookup(self):
+        """
+        It resolves ids and exact names of authors with a single query,
+        mapping the unknown ones to null
+        """
+        author = Author.objects.get(name="Sarah Carter")
+        url = reverse("authors-lookup")
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                url,
+                {
+                    "ids": [author.id, 0x7FFFFFFF],
+                    "names": ["Sarah Morgan", "sarah carter"],
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "ids": {str(author.id): "Sarah Carter", "2147483647": None},
+                "names": {
+                    "Sarah Morgan": Author.objects.get(name="Sarah Morgan").id,
+                    "sarah carter": None,
+                },
+            },
+        )
+
+    def test_authors_lookup_empty(self):
+        """It resolves nothing without querying when given nothing"""
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                reverse("authors-lookup"), {}, format="json"
+            )
+        self.assertEqual(response.json(), {"ids": {}, "names": {}})
+
+    @override_settings(AUTHORS_LOOKUP_MAX_ITEMS=2)
+    def test_authors_lookup_too_many(self):
+        """It refuses to resolve more than AUTHORS_LOOKUP_MAX_ITEMS items"""
+        response = self.client.post(
+            reverse("authors-lookup"),
+            {"ids": [1, 2], "names": ["Sarah Carter"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            reverse("authors-lookup"), {"ids": ["one"]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(AUTHORS_API_KEYS=["first-key", API_KEY])
+class AuthorsBulkAPITests(TestAuthorsBase, APITestCase):
+    def setUp(self):
+        cache.clear()
+        import_authors({"Sarah Carter"})
+
+    def post(self, body, content_type: str, api_key=API_KEY, **params):
+        url = reverse("authors-bulk")
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        headers = {}
+        if api_key is not None:
+            headers["HTTP_AUTHORIZATION"] = f"Api-Key {api_key}"
+        return self.client.generic(
+            "POST", url, body, content_type=content_type, **headers
+        )
+
+    def test_bulk_unauthenticated(self):
+        """It refuses callers without a valid API key nor session"""
+        body = json.dumps(["John Doe"])
+        for api_key in (None, "wrong-key", ""):
+            with self.subTest(api_key=api_key):
+                response = self.post(body, "application/json", api_key)
+                self.assertEqual(
+                    response.status_code, status.HTTP_401_UNAUTHORIZED
+                )
+                self.assertEqual(response["WWW-Authenticate"], "Api-Key")
+        self.assertFalse(Author.objects.filter(name="John Doe").exists())
+
+    def test_bulk_user_permission(self):
+        """
+        It lets users create authors only with the permission to add them
+        """
+        user = User.objects.create_user("librarian")
+        self.client.force_login(user)
+        body = json.dumps(["John Doe"])
+        response = self.post(body, "application/json", api_key=None)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Author.objects.filter(name="John Doe").exists())
+
+        user.user_permissions.add(
+            Permission.objects.get(codename="add_author")
+        )
+        response = self.post(body, "application/json", api_key=None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Author.objects.filter(name="John Doe").exists())
+
+    @override_settings(AUTHORS_BULK_MAX_NAMES=2)
+    def test_bulk_too_many_names(self):
+        """It creates nothing from bodies naming too many authors"""
+        for content_type, body in (
+            ("application/json", json.dumps(["A B", "C D", "E F"])),
+            ("text/csv", "name\nA B\nC D\nE F\n"),
+        ):
+            with self.subTest(content_type=content_type):
+                response = self.post(body, content_type)
+                self.assertEqual(
+                    response.status_code,
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+        self.assertEqual(Author.objects.count(), 1)
+
+        response = self.post(json.dumps(["A B", "C D"]), "application/json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_json(self):
+        """
+        It creates the authors of a JSON array of names or objects with a
+        name, counting the already existing ones
+        """
+        body = json.dumps(
+            ["Sarah Carter", {"name": "Émile Zola"}, "Émile Zola", " ", "X"]
+        )
+        response = self.post(body, "application/json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {"received": 4, "distinct": 3, "inserted": 2, "existing": 1},
+        )
+        self.assertEqual(
+            Author.objects.get(name="Émile Zola").name_key, "emile zola"
+        )
+        self.assertEqual(Author.objects.count(), 3)
+
+    def test_bulk_csv(self):
+        """It creates the authors of the given column of a CSV body"""
+        body = 'id,name\n1,"Tolkien, J. R. R."\r\n2,Sarah Carter\n'
+        response = self.post(body, "text/csv; charset=utf-8", column="name")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["inserted"], 1)
+        self.assertTrue(
+            Author.objects.filter(name="Tolkien, J. R. R.").exists()
+        )
+
+    def test_bulk_streamed(self):
+        """It reads the body in chunks, splitting elements and lines"""
+        names = [f"Author {index}" for index in range(1000)]
+        with patch("authors.api.views.iter_text") as iter_text:
+            for content_type, body in (
+                ("application/json", json.dumps(names)),
+                ("text/csv", "\n".join(["name", *names])),
+            ):
+                with self.subTest(content_type=content_type):
+                    iter_text.return_value = (
+                        body[start : start + 7]
+                        for start in range(0, len(body), 7)
+                    )
+                    response = self.post(body, content_type)
+                    self.assertEqual(response.json()["received"], 1000)
+
+        self.assertEqual(Author.objects.count(), 1001)
+
+    def test_bulk_invalid(self):
+        """It creates nothing from malformed bodies"""
+        cases = [
+            ('["John Doe", 1]', "application/json"),
+            ('["John Doe"', "application/json"),
+            ('{"name": "John Doe"}', "application/json"),
+            ('["John Doe"] []', "application/json"),
+            (json.dumps(["John Doe", "J" * 201]), "application/json"),
+            ("name\nJohn Doe\n", "application/xml"),
+        ]
+        for body, content_type in cases:
+            with self.subTest(body=body[:20], content_type=content_type):
+                response = self.post(body, content_type)
+                self.assertIn(
+                    response.status_code,
+                    (
+                        status.HTTP_400_BAD_REQUEST,
+                        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    ),
+                )
+                self.assertFalse(
+                    Author.objects.filter(name="John Doe").exists()
+                )
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import sync_to_async
+
+from django.core.cache import cache, caches
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from authors.api.asgi import AsyncAuthorsList, AsyncConnectionPool
+from authors.api.authentication import APIKeyAuthentication
+from authors.api.views import AuthorViewSet
+from authors.tests.base import EXPECTED_NAMES, TransactionTestAuthorsBase
+from authors.tests.test_middleware import parse_server_timing
+from authors.utils import import_authors
+from bookstore.asgi import application
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import AnonRateThrottle
+
+
+class AsyncAuthorsListTests(TransactionTestAuthorsBase):
+    def setUp(self):
+        import_authors(EXPECTED_NAMES)
+        cache.clear()
+        self.fallback_scopes = []
+        self.application = AsyncAuthorsList(self.fallback)
+        self.url = reverse("authors-list")
+
+    def tearDown(self):
+        self.application.close()
+
+    async def fallback(self, scope, receive, send):
+        self.fallback_scopes.append(scope)
+        await send(
+            {"type": "http.response.start", "status": 418, "headers": []}
+        )
+        await send({"type": "http.response.body", "body": b""})
+
+    def request(self, query_string="", headers=()):
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": self.url,
+            "query_string": query_string.encode(),
+            "headers": [
+                (b"host", b"testserver"),
+                *[(name.encode(), value.encode()) for name, value in headers],
+            ],
+            "server": ("testserver", 80),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.application(scope, receive, send))
+        start, body = messages
+        return start["status"], dict(start["headers"]), body["body"]
+
+    def test_same_response_as_django(self):
+        """
+        It serves pages with the same body and ETag as the Django view
+        """
+        client = Client()
+        for query_string in ["", "page=2", "page=last", "name=a&page=2"]:
+            with self.subTest(query_string=query_string):
+                with patch.object(PageNumberPagination, "page_size", new=20):
+                    status_code, headers, body = self.request(query_string)
+                    response = client.get(f"{self.url}?{query_string}")
+
+                self.assertEqual(status_code, status.HTTP_200_OK)
+                self.assertEqual(body, response.content)
+                self.assertEqual(
+                    headers,
+                    {
+                        name.encode(): value.encode()
+                        for name, value in response.items()
+                    },
+                )
+        self.assertEqual(self.fallback_scopes, [])
+
+    def test_estimated_count_page_bounds(self):
+        """
+        It bounds pages by the authors found rather than by the count,
+        which may be a low or high estimate
+        """
+        for count in (1, 5000):
+            cache.clear()
+            with self.subTest(count=count), patch.object(
+                AsyncAuthorsList, "count", AsyncMock(return_value=count)
+            ), patch.object(PageNumberPagination, "page_size", new=20):
+                _, _, body = self.request()
+                data = json.loads(body)
+                self.assertEqual(data["count"], count)
+                self.assertEqual(
+                    data["next"], f"http://testserver{self.url}?page=2"
+                )
+                authors = [author["name"] for author in data["results"]]
+
+                _, _, body = self.request("page=2")
+                data = json.loads(body)
+                self.assertIsNone(data["next"])
+                authors += [author["name"] for author in data["results"]]
+                self.assertEqual(authors, sorted(EXPECTED_NAMES))
+
+                status_code, _, _ = self.request("page=3")
+                self.assertEqual(status_code, 418)
+
+    def test_not_modified(self):
+        """
+        It answers '304 Not Modified' to requests holding a current ETag
+        """
+        status_code, headers, _ = self.request()
+        etag = headers[b"ETag"].decode()
+
+        status_code, _, body = self.request(headers=[("if-none-match", etag)])
+        self.assertEqual(status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(body, b"")
+
+    def test_cached_page(self):
+        """It serves pages from the cache without querying the database"""
+        _, _, body = self.request()
+        with patch.object(AsyncConnectionPool, "fetch") as fetch:
+            _, _, cached_body = self.request()
+
+        fetch.assert_not_called()
+        self.assertEqual(json.loads(cached_body), json.loads(body))
+
+    def test_blocking_calls_in_threads(self):
+        """It never reads or writes the cache from the event loop"""
+        cache_class = type(caches["default"])
+        threads = set()
+
+        def record_thread(method):
+            def wrapper(*args, **kwargs):
+                threads.add(threading.current_thread())
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        with patch.object(
+            cache_class, "get", record_thread(cache_class.get)
+        ), patch.object(cache_class, "set", record_thread(cache_class.set)):
+            status_code, _, _ = self.request()
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+    def test_server_timing(self):
+        """
+        It goes through the middleware, which time the queries run on the
+        event loop
+        """
+        with self.assertLogs("bookstore.timing"):
+            _, headers, _ = self.request("name=a")
+
+        metrics = parse_server_timing(headers[b"Server-Timing"].decode())
+        self.assertEqual(set(metrics), {"db", "count", "render", "total"})
+        self.assertEqual(metrics["db"]["desc"], '"2 queries"')
+
+    def test_fallback(self):
+        """
+        It hands unsupported requests over to the wrapped application
+        """
+        cases = [
+            ("pagination=cursor", ()),
+            ("format=api", ()),
+            ("page=1000", ()),
+            ("unknown=1", ()),
+            ("", [("accept", "text/html")]),
+        ]
+        for query_string, headers in cases:
+            with self.subTest(query_string=query_string, headers=headers):
+                status_code, _, _ = self.request(query_string, headers)
+                self.assertEqual(status_code, 418)
+        self.assertEqual(len(self.fallback_scopes), len(cases))
+
+    def test_view_access_checks(self):
+        """
+        It hands requests over when the view authenticates, authorizes or
+        throttles them, or when they carry credentials
+        """
+        cases = [
+            ("authentication_classes", [APIKeyAuthentication]),
+            ("permission_classes", [IsAuthenticated]),
+            ("throttle_classes", [AnonRateThrottle]),
+        ]
+        for name, classes in cases:
+            with self.subTest(name), patch.object(
+                AuthorViewSet, name, classes
+            ):
+                status_code, _, _ = self.request()
+                self.assertEqual(status_code, 418)
+
+        status_code, _, _ = self.request(
+            headers=[("authorization", "Basic Zm9vOmJhcg==")]
+        )
+        self.assertEqual(status_code, 418)
+
+    def test_request_signals(self):
+        """
+        It sends the request signals, in the thread running the middleware
+        """
+        threads = []
+
+        def receiver(signal):
+            def record_thread(**kwargs):
+                threads.append((signal, threading.current_thread()))
+
+            return record_thread
+
+        started, finished = receiver("started"), receiver("finished")
+        request_started.connect(started)
+        request_finished.connect(finished)
+        try:
+            status_code, _, _ = self.request()
+        finally:
+            request_started.disconnect(started)
+            request_finished.disconnect(finished)
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [signal for signal, _ in threads], ["started", "finished"]
+        )
+        self.assertEqual(threads[0][1], threads[1][1])
+
+    def test_cookies(self):
+        """It sends the cookies of the response"""
+        response = HttpResponse()
+        response.set_cookie("name", "value")
+        with patch.object(
+            AsyncAuthorsList,
+            "prepare_response",
+            AsyncMock(return_value=response),
+        ):
+            _, headers, _ = self.request()
+
+        self.assertIn(b"name=value", headers[b"Set-Cookie"])
+
+    @override_settings(AUTHORS_ASYNC_LIST=False)
+    def test_disabled(self):
+        """It hands every request over when AUTHORS_ASYNC_LIST is off"""
+        status_code, _, _ = self.request()
+        self.assertEqual(status_code, 418)
+
+
+class ASGIApplicationTests(TransactionTestAuthorsBase):
+    def setUp(self):
+        import_authors(EXPECTED_NAMES)
+        cache.clear()
+
+    def tearDown(self):
+        # persistent connections of the thread running the views
+        close_all = sync_to_async(connections.close_all, thread_sensitive=True)
+        asyncio.run(close_all())
+
+    def request(self, path, query_string=""):
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query_string.encode(),
+            "headers": [(b"host", b"testserver")],
+            "server": ("testserver", 80),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(application(scope, receive, send))
+        start, *body = messages
+        self.assertFalse(body[-1].get("more_body"))
+        return (
+            start["status"],
+            b"".join(message.get("body", b"") for message in body),
+        )
+
+    def test_export(self):
+        """
+        It streams the authors export, whose server side cursor cannot be
+        read from the event loop
+        """
+        url = reverse("authors-export")
+        with override_settings(AUTHORS_EXPORT_CHUNK_SIZE=5):
+            status_code, body = self.request(url, "format=csv")
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        rows = body.decode().splitlines()
+        self.assertEqual(rows[0], "id,name")
+        self.assertEqual(len(rows), len(EXPECTED_NAMES) + 1)
@@ -0,0 +1,125 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authors.autocomplete import NamesIndex
+from authors.models import Author
+from authors.tests.base import EXPECTED_NAMES, TestAuthorsBase
+from authors.utils import import_authors
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+NAMES = ["Leo Tolstoy", "Jane Austen", "Tolkien", "Émile Zola", "Lev Tol"]
+
+
+class TestNamesIndex(TestCase):
+    def setUp(self):
+        cache.clear()
+        import_authors(NAMES)
+        self.index = NamesIndex()
+        self.index.refresh()
+
+    def search(self, query: str, limit: int = 10) -> list:
+        return [author["name"] for author in self.index.search(query, limit)]
+
+    def test_search(self):
+        """
+        It matches names starting with the query first and then names with
+        a word starting with it, case insensitively
+        """
+        self.assertEqual(
+            self.search("TOL"), ["Tolkien", "Lev Tol", "Leo Tolstoy"]
+        )
+        self.assertEqual(self.search("émile"), ["Émile Zola"])
+        self.assertEqual(self.search("tol", 2), ["Tolkien", "Lev Tol"])
+        self.assertEqual(self.search("  "), [])
+        self.assertEqual(self.search("austin"), [])
+
+    def test_refresh_inserted(self):
+        """It only fetches the authors inserted since the last refresh"""
+        import_authors(["Tolkien Jr"])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.index.refresh()
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(len(self.index), len(NAMES) + 1)
+        self.assertEqual(self.search("tolkien"), ["Tolkien", "Tolkien Jr"])
+
+    def test_refresh_updated(self):
+        """It rebuilds the index when authors are updated or deleted"""
+        author = Author.objects.get(name="Tolkien")
+        author.name = "J. R. R. Tolkien"
+        author.save()
+        self.index.refresh()
+        self.assertEqual(self.search("tolk"), ["J. R. R. Tolkien"])
+
+        author.delete()
+        self.index.refresh()
+        self.assertEqual(self.search("tolk"), [])
+
+    def test_refresh_in_progress(self):
+        """
+        It keeps serving the current snapshot, without waiting, while
+        another thread refreshes the index
+        """
+        import_authors(["Tolkien Jr"])
+
+        with self.index._lock, CaptureQueriesContext(connection) as queries:
+            self.index.refresh()
+            self.assertEqual(self.search("tolkien"), ["Tolkien"])
+        self.assertEqual(len(queries), 0)
+
+        self.index.refresh()
+        self.assertEqual(self.search("tolkien"), ["Tolkien", "Tolkien Jr"])
+
+    def test_refresh_unchanged(self):
+        """It queries nothing while the authors data is unchanged"""
+        with self.assertNumQueries(0):
+            self.index.refresh()
+
+
+class AutocompleteAPITests(TestAuthorsBase, APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import_authors(EXPECTED_NAMES)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_autocomplete(self):
+        """It lists the authors matching the query up to the limit"""
+        url = reverse("authors-autocomplete")
+        prefix = sorted(EXPECTED_NAMES)[0][:2]
+        expected = sorted(
+            (
+                name
+                for name in EXPECTED_NAMES
+                if name.casefold().startswith(prefix.casefold())
+            ),
+            key=str.casefold,
+        )
+
+        response = self.client.get(url, {"q": prefix, "limit": 100})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [author["name"] for author in response.json()]
+        self.assertEqual(names[: len(expected)], expected)
+        for name in names[len(expected) :]:
+            self.assertIn(f" {prefix.casefold()}", name.casefold())
+
+        response = self.client.get(url, {"q": prefix, "limit": 1})
+        (author,) = response.json()
+        self.assertEqual(author["id"], Author.objects.get(name=expected[0]).id)
+
+        with self.assertNumQueries(0):
+            self.client.get(url, {"q": prefix})
+
+    def test_autocomplete_invalid_limit(self):
+        """It rejects limits that are not integers"""
+        response = self.client.get(
+            reverse("authors-autocomplete"), {"q": "a", "limit": "all"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from authors.cache import (
+    VERSION_KEY,
+    bump_authors_version,
+    get_authors_version,
+)
+from authors.checks import check_shared_cache
+from authors.models import Author
+from authors.utils import import_authors
+from bookstore.runner import TEST_KEY_PREFIX
+
+LOCAL_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+class TestAuthorsCacheVersion(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_authors_version(self):
+        """It initializes the version once and keeps serving it"""
+        version = get_authors_version()
+        self.assertEqual(cache.get(VERSION_KEY), version)
+        self.assertEqual(get_authors_version(), version)
+
+    def test_bump_authors_version(self):
+        """It increases the version on every bump"""
+        version = get_authors_version()
+        bump_authors_version()
+        self.assertGreater(get_authors_version(), version)
+
+    def test_bump_lost_authors_version(self):
+        """It starts a new version when the current one was evicted"""
+        version = get_authors_version()
+        cache.delete(VERSION_KEY)
+        bump_authors_version()
+        self.assertGreaterEqual(get_authors_version(), version)
+
+    def test_author_writes_bump_version(self):
+        """Saving or deleting an author invalidates the cached data"""
+        version = get_authors_version()
+        author = Author.objects.create(name="John Doe")
+        saved_version = get_authors_version()
+        self.assertGreater(saved_version, version)
+
+        author.delete()
+        self.assertGreater(get_authors_version(), saved_version)
+
+    def test_import_bumps_version(self):
+        """Importing authors invalidates the cached data"""
+        version = get_authors_version()
+        import_authors({"John Doe", "Jane Doe"})
+        self.assertGreater(get_authors_version(), version)
+
+
+class TestSharedCacheCheck(SimpleTestCase):
+    def test_shared_cache(self):
+        """It accepts a cache shared between processes"""
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=LOCAL_CACHES)
+    def test_local_cache(self):
+        """It refuses a cache local to each process, unless allowed"""
+        errors = check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ["authors.E001"])
+
+        with self.settings(AUTHORS_LOCAL_CACHE_ALLOWED=True):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class TestTestCache(SimpleTestCase):
+    def test_own_cache(self):
+        """Tests use a cache of their own, which they are free to clear"""
+        options = settings.CACHES["default"]
+        self.assertEqual(options["KEY_PREFIX"], TEST_KEY_PREFIX)
+        self.assertIn("bookstore_test_cache", options["LOCATION"])
@@ -0,0 +1,138 @@
+from threading import Event, Thread
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.urls import reverse
+
+from authors.changes import get_changes, get_stable_change_seq
+from authors.models import Author
+from authors.tests.base import TestAuthorsBase, TransactionTestAuthorsBase
+from authors.utils import NamesReader, import_authors, import_authors_faster
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+def change_seqs(*names: str) -> list:
+    return [Author.objects.get(name=name).change_seq for name in names]
+
+
+class TestChangeSeq(TestAuthorsBase):
+    def test_writes(self):
+        """
+        Every import path and update gives the written authors a higher
+        change sequence number than the previous writes
+        """
+        import_authors({"Jane Austen"})
+        import_authors_faster(NamesReader(["Leo Tolstoy"], with_keys=True))
+        author = Author.objects.create(name="Émile Zola")
+        first, second, third = change_seqs(
+            "Jane Austen", "Leo Tolstoy", "Émile Zola"
+        )
+        self.assertTrue(0 < first < second < third)
+
+        author.name = "Emile Zola"
+        author.save()
+        self.assertGreater(change_seqs("Emile Zola")[0], third)
+
+        import_authors({"Jane Austen"})
+        self.assertEqual(change_seqs("Jane Austen")[0], first)
+
+
+class AuthorsChangesAPITests(TestAuthorsBase, APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        response = self.client.get(reverse("authors-changes"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_changes(self):
+        """It pages through the authors written after the given token"""
+        import_authors({"Jane Austen", "Leo Tolstoy", "Mark Twain"})
+        data = self.get(limit=2)
+        self.assertEqual(
+            [author["name"] for author in data["results"]],
+            ["Jane Austen", "Leo Tolstoy"],
+        )
+        self.assertTrue(data["more"])
+
+        data = self.get(since=data["next_since"], limit=2)
+        self.assertEqual(
+            [author["name"] for author in data["results"]], ["Mark Twain"]
+        )
+        self.assertFalse(data["more"])
+
+        since = data["next_since"]
+        self.assertEqual(self.get(since=since)["results"], [])
+
+        author = Author.objects.get(name="Leo Tolstoy")
+        author.name = "Lev Tolstoy"
+        author.save()
+        data = self.get(since=since)
+        self.assertEqual(
+            data["results"],
+            [
+                {
+                    "id": author.id,
+                    "name": "Lev Tolstoy",
+                    "change_seq": change_seqs("Lev Tolstoy")[0],
+                }
+            ],
+        )
+        self.assertEqual(data["next_since"], data["results"][0]["change_seq"])
+
+    def test_invalid_params(self):
+        """It rejects tokens and limits that are not non negative integers"""
+        for params in ({"since": "x"}, {"since": -1}, {"limit": "x"}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse("authors-changes"), params)
+                self.assertEqual(
+                    response.status_code, status.HTTP_400_BAD_REQUEST
+                )
+
+
+class ChangesInFlightTests(TransactionTestAuthorsBase):
+    def setUp(self):
+        cache.clear()
+
+    def test_uncommitted_writes(self):
+        """
+        It does not move past the change sequence numbers drawn by writes
+        still in progress, which could commit after later ones
+        """
+        import_authors({"Jane Austen"})
+        stable = get_stable_change_seq()
+
+        written = Event()
+        release = Event()
+
+        def write():
+            try:
+                with transaction.atomic():
+                    Author.objects.create(name="Leo Tolstoy")
+                    written.set()
+                    release.wait(10)
+            finally:
+                connections.close_all()
+
+        thread = Thread(target=write)
+        thread.start()
+        try:
+            written.wait(10)
+            Author.objects.create(name="Mark Twain")
+            page = get_changes(0, 10)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(page.next_since, stable)
+        self.assertEqual(
+            [author["name"] for author in page.results], ["Jane Austen"]
+        )
+
+        page = get_changes(page.next_since, 10)
+        self.assertEqual(
+            [author["name"] for author in page.results],
+            ["Leo Tolstoy", "Mark Twain"],
+        )
@@ -1,12 +1,22 @@
+import csv
+import gzip
+import json
 import os
+import tempfile
 from io import StringIO
 from unittest.mock import patch
 
 from django.core.management import call_command
 
 from authors.management.commands.import_authors import Command, MessageType
-from authors.models import Author
-from authors.tests.base import EXPECTED_NAMES, FIXTURES_DIR, TestAuthorsBase
+from authors.models import Author, ImportCheckpoint
+from authors.utils import NamesReader, import_authors
+from authors.tests.base import (
+    EXPECTED_NAMES,
+    FIXTURES_DIR,
+    TestAuthorsBase,
+    TransactionTestAuthorsBase,
+)
 
 
 class TestImportAuthorsCommand(TestAuthorsBase):
@@ -59,6 +69,55 @@ class TestImportAuthorsCommand(TestAuthorsBase):
 
         self.assertIn(expected_message, output.getvalue())
 
+    def test_successful_stream_data(self):
+        """It is able to stream the input file data in bounded chunks"""
+        command = Command()
+        chunks = list(
+            command._stream_data(
+                os.path.join(FIXTURES_DIR, "test_authors.csv"), chunk_size=10
+            )
+        )
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+        self.assertEqual(set().union(*chunks), EXPECTED_NAMES)
+
+    def test_successful_stream_data_faster(self):
+        """
+        It is able to stream the input file data through a file-like reader
+        with faster parameter
+        """
+        command = Command()
+        data = command._stream_data(
+            os.path.join(FIXTURES_DIR, "test_authors.csv"), faster=True
+        )
+        self.assertIsInstance(data, NamesReader)
+        self.assertEqual(
+            set(data.read().splitlines()),
+            {f"{name}\t{name.lower()}" for name in EXPECTED_NAMES},
+        )
+
+    def test_stream_data_empty_file(self):
+        """It returns nothing when streaming a file without names"""
+        command = Command()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as csv_file:
+            csv_file.write("name\n")
+            csv_file.flush()
+            self.assertIsNone(command._stream_data(csv_file.name))
+
+    def test_failing_stream_data(self):
+        """It properly writes to stdout when failing to stream file data"""
+        output = StringIO()
+        command = Command()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+        error_message = "Simulated error message"
+        expected_message = (
+            f"Error trying to read {filepath}. Got {error_message}"
+        )
+        with patch.object(command, "stdout", new=output):
+            with patch("builtins.open", side_effect=IOError(error_message)):
+                self.assertIsNone(command._stream_data(filepath))
+
+        self.assertIn(expected_message, output.getvalue())
+
     def test_successful_perform_insertion(self):
         """It properly inserts provided authors data into the database"""
         output = StringIO()
@@ -201,6 +260,209 @@ class TestImportAuthorsCommand(TestAuthorsBase):
             f"Successfully imported authors from {filepath}", output.getvalue()
         )
 
+    def test_successful_command_csv_format(self):
+        """
+        It inserts the names of the given column of gzipped files with
+        other delimiters, stream or not and faster or not
+        """
+        names = {"Austen; Jane", "Tolstoy, Leo", "Multi\nLine", "Back\\slash"}
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "authors.csv.gz")
+            with gzip.open(filepath, "wt", encoding="utf-8") as csv_file:
+                writer = csv.writer(csv_file, delimiter=";")
+                writer.writerow(["id", "name"])
+                writer.writerows(enumerate(sorted(names)))
+
+            for options in ([], ["--faster"], ["--stream", "--faster"]):
+                with self.subTest(options=options):
+                    Author.objects.all().delete()
+                    call_command(
+                        "import_authors",
+                        filepath,
+                        "--column",
+                        "name",
+                        "--delimiter",
+                        ";",
+                        *options,
+                        stdout=StringIO(),
+                    )
+                    self.assertEqual(
+                        set(Author.objects.values_list("name", flat=True)),
+                        names,
+                    )
+
+    def test_successful_command_stream(self):
+        """
+        It successfully inserts the authors when running the command with
+        stream parameter
+        """
+        output = StringIO()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+        self.assertEqual(Author.objects.count(), 0)
+
+        call_command(
+            "import_authors",
+            filepath,
+            "--stream",
+            "--chunk-size",
+            "5",
+            stdout=output,
+        )
+
+        self.assertEqual(Author.objects.count(), len(EXPECTED_NAMES))
+        self.assertIn(
+            f"Successfully imported authors from {filepath}", output.getvalue()
+        )
+
+    def test_successful_command_stream_faster(self):
+        """
+        It successfully inserts the authors when running the command with
+        stream and faster parameters
+        """
+        output = StringIO()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+        self.assertEqual(Author.objects.count(), 0)
+
+        call_command(
+            "import_authors", filepath, "--stream", "--faster", stdout=output
+        )
+
+        self.assertEqual(Author.objects.count(), len(EXPECTED_NAMES))
+        self.assertIn(
+            f"Successfully imported authors from {filepath}", output.getvalue()
+        )
+
+    def test_successful_command_faster_duplicated(self):
+        """
+        It properly skips already existing authors when running the command
+        with faster parameter again
+        """
+        output = StringIO()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+
+        call_command("import_authors", filepath, "--faster", stdout=output)
+        call_command("import_authors", filepath, "--faster", stdout=output)
+
+        self.assertEqual(Author.objects.count(), len(EXPECTED_NAMES))
+        self.assertNotIn("Error", output.getvalue())
+
+    def test_command_summary(self):
+        """
+        It writes the rows read, distinct, inserted and skipped along with
+        the time spent in each phase as a JSON summary
+        """
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+        for options in ([], ["--faster"], ["--stream", "--chunk-size", "5"]):
+            with self.subTest(options=options):
+                Author.objects.all().delete()
+                with tempfile.NamedTemporaryFile(suffix=".json") as summary:
+                    call_command(
+                        "import_authors",
+                        filepath,
+                        *options,
+                        "--summary",
+                        summary.name,
+                        stdout=StringIO(),
+                    )
+                    call_command(
+                        "import_authors",
+                        filepath,
+                        *options,
+                        "--summary",
+                        summary.name,
+                        stdout=StringIO(),
+                    )
+                    summary.seek(0)
+                    content = json.load(summary)
+
+                rows = len(EXPECTED_NAMES)
+                self.assertTrue(content["success"])
+                self.assertEqual(content["rows_read"], rows)
+                self.assertEqual(content["distinct"], rows)
+                self.assertEqual(content["inserted"], 0)
+                self.assertEqual(content["skipped"], rows)
+                self.assertEqual(
+                    set(content["phases_seconds"]), {"read", "dedup", "insert"}
+                )
+
+    def test_command_dedup(self):
+        """
+        It reports the near-duplicates of the file names, among them and
+        the existing authors, importing them or not depending on the mode
+        """
+        Author.objects.create(name="J.R.R. Tolkien")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as csv_file:
+            csv_file.write(
+                "name\nJ. R. R. Tolkien\nMark Twain\nMark Twian\n"
+                "Jane Austen\n"
+            )
+            csv_file.flush()
+
+            for mode, options, imported in (
+                ("report", [], 5),
+                ("skip", ["--stream"], 3),
+                ("skip", ["--faster", "--stream"], 3),
+            ):
+                with self.subTest(mode=mode, options=options):
+                    Author.objects.exclude(name="J.R.R. Tolkien").delete()
+                    with tempfile.NamedTemporaryFile(
+                        "r", suffix=".csv"
+                    ) as report:
+                        call_command(
+                            "import_authors",
+                            csv_file.name,
+                            *options,
+                            "--dedup",
+                            mode,
+                            "--dedup-report",
+                            report.name,
+                            stdout=StringIO(),
+                        )
+                        rows = list(csv.reader(report))
+
+                    self.assertEqual(Author.objects.count(), imported)
+                    self.assertEqual(
+                        rows,
+                        [
+                            ["name", "match", "similarity", "existing"],
+                            [
+                                "J. R. R. Tolkien",
+                                "J.R.R. Tolkien",
+                                "1.00",
+                                "True",
+                            ],
+                            ["Mark Twian", "Mark Twain", "0.89", "False"],
+                        ],
+                    )
+
+    def test_command_progress(self):
+        """It reports the import progress and the final counts"""
+        output = StringIO()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+
+        call_command(
+            "import_authors",
+            filepath,
+            "--stream",
+            "--chunk-size",
+            "5",
+            "--progress-interval",
+            "0",
+            stdout=output,
+        )
+
+        rows = len(EXPECTED_NAMES)
+        reports = [
+            line
+            for line in output.getvalue().splitlines()
+            if line.startswith("Read ")
+        ]
+        self.assertGreater(len(reports), 1)
+        self.assertIn(
+            f"Read {rows} rows, {rows} distinct, {rows} inserted, 0 skipped",
+            reports[-1],
+        )
+
     def test_failing_command_data(self):
         """
         It properly writes to stdout when failing to collect the data
@@ -240,3 +502,177 @@ class TestImportAuthorsCommand(TestAuthorsBase):
             f"Provided filepath {filepath} does not exist or is not a file",
             output.getvalue(),
         )
+
+
+class TestImportAuthorsCommandResume(TestAuthorsBase):
+    def setUp(self):
+        self.csv_file = tempfile.NamedTemporaryFile("w+", suffix=".csv")
+        self.names = sorted(EXPECTED_NAMES)
+        self.csv_file.write("\n".join(["name", *self.names]) + "\n")
+        self.csv_file.flush()
+
+    def tearDown(self):
+        self.csv_file.close()
+
+    def import_authors(self, *options) -> dict:
+        with tempfile.NamedTemporaryFile(suffix=".json") as summary:
+            call_command(
+                "import_authors",
+                self.csv_file.name,
+                "--resume",
+                "--chunk-size",
+                "10",
+                "--summary",
+                summary.name,
+                *options,
+                stdout=StringIO(),
+            )
+            summary.seek(0)
+            return json.load(summary)
+
+    def import_authors_failing(self) -> dict:
+        """Imports the file failing after the first chunk is committed"""
+        calls = []
+
+        def failing_import_authors(names, *args):
+            calls.append(names)
+            if len(calls) > 1:
+                raise IOError("Simulated error message")
+            return import_authors(names, *args)
+
+        with patch(
+            "authors.checkpoints.import_authors",
+            side_effect=failing_import_authors,
+        ):
+            return self.import_authors()
+
+    def test_resume(self):
+        """
+        It resumes a failed import after the last committed chunk, without
+        reading or inserting it again
+        """
+        summary = self.import_authors_failing()
+
+        self.assertFalse(summary["success"])
+        self.assertEqual(Author.objects.count(), 10)
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertEqual(checkpoint.rows, 10)
+        self.assertFalse(checkpoint.completed)
+
+        summary = self.import_authors()
+
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["rows_read"], len(self.names) - 10)
+        self.assertEqual(summary["inserted"], len(self.names) - 10)
+        self.assertEqual(
+            set(Author.objects.values_list("name", flat=True)), EXPECTED_NAMES,
+        )
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.rows, len(self.names))
+        self.assertTrue(checkpoint.completed)
+
+    def test_resume_completed(self):
+        """It reads nothing again from a completely imported file"""
+        self.import_authors()
+        summary = self.import_authors()
+
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["rows_read"], 0)
+        self.assertEqual(Author.objects.count(), len(self.names))
+
+    def test_resume_changed_file(self):
+        """
+        It imports the whole file again when the last committed chunk does
+        not match anymore
+        """
+        self.import_authors_failing()
+        self.csv_file.seek(0)
+        self.csv_file.write("name\nChanged")
+        self.csv_file.flush()
+
+        summary = self.import_authors()
+
+        self.assertEqual(summary["rows_read"], len(self.names))
+        self.assertTrue(
+            Author.objects.filter(name__startswith="Changed").exists()
+        )
+
+    def test_resume_quoted_names(self):
+        """It resumes files with names spanning several lines"""
+        self.csv_file.seek(0)
+        self.csv_file.truncate()
+        self.names = [f"{name}\nline" for name in self.names]
+        writer = csv.writer(self.csv_file)
+        writer.writerow(["name"])
+        writer.writerows([name] for name in self.names)
+        self.csv_file.flush()
+
+        self.import_authors_failing()
+        summary = self.import_authors()
+
+        self.assertEqual(summary["rows_read"], len(self.names) - 10)
+        self.assertEqual(
+            set(Author.objects.values_list("name", flat=True)),
+            set(self.names),
+        )
+
+    def test_restart(self):
+        """It imports the whole file again when asked to restart"""
+        self.import_authors()
+        summary = self.import_authors("--restart")
+
+        self.assertEqual(summary["rows_read"], len(self.names))
+        self.assertEqual(summary["inserted"], 0)
+
+
+class TestImportAuthorsCommandParallel(TransactionTestAuthorsBase):
+    def test_successful_command_workers(self):
+        """
+        It successfully inserts the authors when running the command with
+        several workers
+        """
+        output = StringIO()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+        self.assertEqual(Author.objects.count(), 0)
+
+        call_command(
+            "import_authors",
+            filepath,
+            "--workers",
+            "3",
+            "--batch-size",
+            "4",
+            stdout=output,
+        )
+
+        self.assertEqual(Author.objects.count(), len(EXPECTED_NAMES))
+        self.assertIn(
+            f"Successfully imported authors from {filepath}", output.getvalue()
+        )
+
+    def test_successful_command_stream_workers(self):
+        """
+        It successfully inserts the authors when running the command with
+        stream parameter and several workers
+        """
+        output = StringIO()
+        filepath = os.path.join(FIXTURES_DIR, "test_authors.csv")
+        self.assertEqual(Author.objects.count(), 0)
+
+        call_command(
+            "import_authors",
+            filepath,
+            "--stream",
+            "--chunk-size",
+            "10",
+            "--workers",
+            "2",
+            "--batch-size",
+            "3",
+            stdout=output,
+        )
+
+        self.assertEqual(Author.objects.count(), len(EXPECTED_NAMES))
+        self.assertIn(
+            f"Successfully imported authors from {filepath}", output.getvalue()
+        )
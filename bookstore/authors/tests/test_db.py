@@ -0,0 +1,92 @@
+from django.db import Error, connection
+from django.test import TransactionTestCase
+
+from bookstore.db.base import DatabaseWrapper
+from bookstore.db.pool import close_pools
+
+
+class DatabaseWrapperTests(TransactionTestCase):
+    def setUp(self):
+        self.wrappers = []
+
+    def tearDown(self):
+        for wrapper in self.wrappers:
+            wrapper.close()
+        close_pools(connection.settings_dict["NAME"])
+
+    def get_wrapper(self, **settings) -> DatabaseWrapper:
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, **settings}, connection.alias
+        )
+        self.wrappers.append(wrapper)
+        return wrapper
+
+    @staticmethod
+    def backend_pid(wrapper: DatabaseWrapper) -> int:
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def terminate(self, pid: int) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+    def test_health_check(self):
+        """
+        It replaces a persistent connection that stopped working before
+        it is used by a new request
+        """
+        wrapper = self.get_wrapper(CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True)
+        pid = self.backend_pid(wrapper)
+
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertEqual(self.backend_pid(wrapper), pid)
+
+        self.terminate(pid)
+        wrapper.close_if_unusable_or_obsolete()
+        self.assertNotEqual(self.backend_pid(wrapper), pid)
+
+    def test_pool_reuses_connections(self):
+        """
+        It hands connections closed by one wrapper over to the next one
+        """
+        first = self.get_wrapper(POOL_SIZE=1)
+        pid = self.backend_pid(first)
+        first.close()
+
+        second = self.get_wrapper(POOL_SIZE=1)
+        self.assertEqual(self.backend_pid(second), pid)
+
+    def test_pool_returns_connections_after_request(self):
+        """
+        It returns pooled connections at the end of a request even when
+        CONN_MAX_AGE would keep them open
+        """
+        first = self.get_wrapper(POOL_SIZE=1, CONN_MAX_AGE=60)
+        pid = self.backend_pid(first)
+        first.close_if_unusable_or_obsolete()
+
+        second = self.get_wrapper(POOL_SIZE=1, CONN_MAX_AGE=60)
+        self.assertEqual(self.backend_pid(second), pid)
+        second.close_if_unusable_or_obsolete()
+
+        self.assertEqual(self.backend_pid(first), pid)
+
+    def test_pool_replaces_broken_connections(self):
+        """It discards pooled connections that stopped working"""
+        first = self.get_wrapper(POOL_SIZE=1, CONN_HEALTH_CHECKS=True)
+        pid = self.backend_pid(first)
+        first.close()
+        self.terminate(pid)
+
+        second = self.get_wrapper(POOL_SIZE=1, CONN_HEALTH_CHECKS=True)
+        self.assertNotEqual(self.backend_pid(second), pid)
+
+    def test_pool_exhausted(self):
+        """
+        It fails after waiting POOL_TIMEOUT seconds for a free connection
+        """
+        self.backend_pid(self.get_wrapper(POOL_SIZE=1, POOL_TIMEOUT=0.1))
+
+        with self.assertRaises(Error):
+            self.backend_pid(self.get_wrapper(POOL_SIZE=1, POOL_TIMEOUT=0.1))
@@ -0,0 +1,122 @@
+from array import array
+
+from django.test import SimpleTestCase, TestCase
+
+from authors.dedup import (
+    BUCKET_SIZE,
+    HASH_BITS,
+    NearDuplicate,
+    NearDuplicateIndex,
+    NearDuplicatesFilter,
+    VariantTable,
+    build_dedup_index,
+    dedup_key,
+    variant_hashes,
+)
+from authors.models import Author
+
+
+class TestNearDuplicateIndex(SimpleTestCase):
+    def test_dedup_key(self):
+        """
+        It ignores spacing, punctuation, case, accents and word order
+        """
+        for name in ("J. R. R. Tolkien", "J.R.R. Tolkien", "Tolkien, JRR"):
+            with self.subTest(name=name):
+                self.assertEqual(dedup_key(name), "jrrtolkien")
+        self.assertEqual(dedup_key("Zola, Émile"), dedup_key("Emile ZOLA"))
+        self.assertEqual(dedup_key(" - "), "")
+
+    def test_variant_hashes(self):
+        """Keys one edit apart share a variant"""
+        for typo in ("marktwian", "marktwan", "marktwaiin", "marktwein"):
+            with self.subTest(typo=typo):
+                self.assertTrue(
+                    variant_hashes("marktwain") & variant_hashes(typo)
+                )
+        self.assertFalse(
+            variant_hashes("marktwain") & variant_hashes("mrktwian")
+        )
+        self.assertEqual(len(variant_hashes("a" * 40)), 1)
+
+    def test_variant_table(self):
+        """
+        It keeps the first BUCKET_SIZE positions of each variant hash,
+        including hashes sharing a partition
+        """
+        table = VariantTable()
+        # hashes of the same partition, the first one sorted after
+        hashes = [(1 << HASH_BITS) - 1, (1 << HASH_BITS) - 2]
+        for position in range(BUCKET_SIZE + 2):
+            positions, slots = table.find(hashes)
+            self.assertEqual(positions, set(range(min(position, BUCKET_SIZE))))
+            table.insert(slots, position)
+
+        self.assertEqual(table.find(hashes[:1])[0], set(range(BUCKET_SIZE)))
+        self.assertEqual(table.find(hashes[1:])[0], set(range(BUCKET_SIZE)))
+        self.assertEqual(table.find([0]), (set(), [(0, 0, array("Q"))]))
+
+    def test_add(self):
+        """
+        It finds near-duplicates among the existing authors and the names
+        added before, but not among repeated names
+        """
+        index = NearDuplicateIndex(threshold=0.85)
+        index.add_existing(["J.R.R. Tolkien", "Leo Tolstoy"])
+        self.assertEqual(len(index), 2)
+
+        self.assertEqual(
+            index.add("Tolkien, J. R. R."),
+            NearDuplicate("Tolkien, J. R. R.", "J.R.R. Tolkien", 1.0, True),
+        )
+        self.assertEqual(index.add("Leo Tolstoi").match, "Leo Tolstoy")
+        self.assertIsNone(index.add("Leo Tolstoy"))
+        self.assertIsNone(index.add("Mark Twain"))
+        self.assertIsNone(index.add("Mark Twain"))
+        self.assertIsNone(index.add("Jane Austen"))
+
+        duplicate = index.add("Mark Twian")
+        self.assertEqual(duplicate.match, "Mark Twain")
+        self.assertFalse(duplicate.existing)
+        self.assertGreaterEqual(duplicate.similarity, 0.85)
+        self.assertEqual(len(index), 4)
+
+    def test_threshold(self):
+        """It only reports names at least as similar as the threshold"""
+        index = NearDuplicateIndex(threshold=0.95)
+        index.add_existing(["Mark Twain"])
+        self.assertIsNone(index.add("Mark Twian"))
+        self.assertIsNotNone(index.add("Twain, Mark"))
+
+    def test_filter(self):
+        """
+        It reports every near-duplicate once, dropping them when skipping
+        """
+        names = ["Mark Twain", "Mark Twian", "Mark Twian", "Jane Austen"]
+        for skip, expected in (
+            (False, names),
+            (True, ["Mark Twain", "Jane Austen"]),
+        ):
+            with self.subTest(skip=skip):
+                found = []
+                near_duplicates = NearDuplicatesFilter(
+                    NearDuplicateIndex(), skip, found.append
+                )
+                self.assertEqual(list(near_duplicates.filter(names)), expected)
+                self.assertEqual(near_duplicates.found, 1)
+                self.assertEqual(
+                    found,
+                    [NearDuplicate("Mark Twian", "Mark Twain", 8 / 9, False)],
+                )
+
+
+class TestBuildDedupIndex(TestCase):
+    def test_build_dedup_index(self):
+        """It indexes the names of the existing authors"""
+        Author.objects.create(name="J.R.R. Tolkien")
+        Author.objects.create(name="Leo Tolstoy")
+
+        index = build_dedup_index(chunk_size=1)
+
+        self.assertEqual(index.existing, 2)
+        self.assertTrue(index.add("J. R. R. Tolkien").existing)
@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test import TestCase
+
+from authors.api.filters import AuthorFilter
+from authors.models import Author
+from authors.utils import import_authors
+
+AUTHORS_NAMES = {"John Doe", "Jane Doe", "Sarah Carter", "Émile Zola"}
+
+
+class TestAuthorFilter(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        import_authors(AUTHORS_NAMES)
+
+    def setUp(self):
+        # the test table is too small for the planner to pick an index
+        # over a sequential scan or the ordering by the unique name index
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def filter(self, **params):
+        return AuthorFilter(params, queryset=Author.objects.all()).qs
+
+    def test_name_filter_uses_trigram_index(self):
+        """Substring search by name is served by the trigram index"""
+        queryset = self.filter(name="doe")
+        self.assertEqual(
+            set(queryset.values_list("name", flat=True)),
+            {"John Doe", "Jane Doe"},
+        )
+        self.assertIn(
+            "authors_author_name_upper_trgm", queryset.order_by().explain()
+        )
+
+    def test_search_filter_uses_full_text_index(self):
+        """Full text search by name is served by the tsvector index"""
+        queryset = self.filter(search="SARAH")
+        self.assertEqual(
+            list(queryset.values_list("name", flat=True)), ["Sarah Carter"]
+        )
+        self.assertIn(
+            "authors_author_name_tsvector", queryset.order_by().explain()
+        )
+
+    def test_search_filter_whole_words(self):
+        """Full text search only matches whole words of the names"""
+        self.assertEqual(self.filter(search="Sar").count(), 0)
+        self.assertEqual(self.filter(search="doe jane").count(), 1)
+
+    def test_name_key_filters(self):
+        """
+        Exact, prefix and contains lookups ignore accents and case, and
+        are served by the name key indexes
+        """
+        cases = [
+            ("name_exact", "EMILE zola", "authors_author_name_key_pattern"),
+            ("name_prefix", "émi", "authors_author_name_key_pattern"),
+            ("name_contains", "ZOL", "authors_author_name_key_trgm"),
+        ]
+        for param, value, index in cases:
+            with self.subTest(param=param):
+                queryset = self.filter(**{param: value})
+                self.assertEqual(
+                    list(queryset.values_list("name", flat=True)),
+                    ["Émile Zola"],
+                )
+                self.assertIn(index, queryset.order_by().explain())
+
+        self.assertEqual(self.filter(name_prefix="zola").count(), 0)
+        self.assertEqual(self.filter(name_contains="%").count(), 0)
@@ -0,0 +1,73 @@
+import json
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from authors.tests.base import EXPECTED_NAMES, TestAuthorsBase
+from authors.utils import import_authors
+from rest_framework.test import APITestCase
+
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+class ServerTimingMiddlewareTests(TestAuthorsBase, APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import_authors(EXPECTED_NAMES)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing(self):
+        """
+        It sends the queries and time spent in every phase of the request
+        in the 'Server-Timing' header
+        """
+        for fast_list in (True, False):
+            with self.subTest(fast_list=fast_list), override_settings(
+                AUTHORS_FAST_LIST=fast_list
+            ):
+                cache.clear()
+                with self.assertLogs("bookstore.timing"):
+                    response = self.client.get(
+                        reverse("authors-list"), {"name": "a"}
+                    )
+
+                metrics = parse_server_timing(response["Server-Timing"])
+                self.assertEqual(
+                    set(metrics),
+                    {"db", "count", "serialize", "render", "total"},
+                )
+                self.assertEqual(metrics["db"]["desc"], '"2 queries"')
+                self.assertGreater(
+                    float(metrics["total"]["dur"]),
+                    float(metrics["db"]["dur"]),
+                )
+
+    def test_log_line(self):
+        """It logs the timings of the request as JSON"""
+        with self.assertLogs("bookstore.timing") as logs:
+            response = self.client.get(reverse("authors-list"))
+
+        (line,) = logs.records
+        record = json.loads(line.getMessage())
+        self.assertEqual(record["method"], "GET")
+        self.assertEqual(record["path"], reverse("authors-list"))
+        self.assertEqual(record["status"], response.status_code)
+        self.assertGreaterEqual(record["queries"], 1)
+        self.assertGreater(record["total_ms"], record["db_ms"])
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        """It records nothing for requests left out of the sample"""
+        response = self.client.get(reverse("authors-list"))
+        self.assertNotIn("Server-Timing", response)
@@ -1,7 +1,7 @@
 from django.db import IntegrityError, transaction
 from django.test import TestCase
 
-from authors.models import Author
+from authors.models import Author, normalize_name
 
 
 class TestAuthor(TestCase):
@@ -66,3 +66,20 @@ class TestAuthor(TestCase):
                 author.save()
         self.assertEqual(str(raised.exception), expected_message)
         self.assertEqual(Author.objects.count(), 1)
+
+    def test_name_key(self):
+        """It keeps the normalized name key up to date on save"""
+        author = Author.objects.create(name="Émile ZOLA")
+        self.assertEqual(author.name_key, "emile zola")
+
+        author.name = "Gabriel García Márquez"
+        author.save(update_fields=["name"])
+        author.refresh_from_db()
+        self.assertEqual(author.name_key, "gabriel garcia marquez")
+
+    def test_normalize_name(self):
+        """It removes accents and case differences from names"""
+        self.assertEqual(normalize_name("John Doe"), "john doe")
+        self.assertEqual(normalize_name("Ångström"), "angstrom")
+        self.assertEqual(normalize_name("STRAẞE"), "strasse")
+        self.assertEqual(normalize_name("Лев Толстой"), "лев толстои")
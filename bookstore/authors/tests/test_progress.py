@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from authors import progress
+from authors.progress import ImportProgress
+from authors.utils import ImportCounts
+
+
+class TestImportProgress(SimpleTestCase):
+    def test_counts(self):
+        """It counts the rows read and the imported batches"""
+        import_progress = ImportProgress()
+        names = list(import_progress.read(["John Doe", "John Doe", "Jane"]))
+        import_progress.add(ImportCounts(2, 1))
+
+        self.assertEqual(names, ["John Doe", "John Doe", "Jane"])
+        self.assertEqual(import_progress.rows_read, 3)
+        self.assertEqual(import_progress.distinct, 2)
+        self.assertEqual(import_progress.inserted, 1)
+        self.assertEqual(import_progress.skipped, 2)
+
+    def test_exclusive_phases(self):
+        """
+        It does not account the time of nested phases to the outer ones
+        """
+        clock = iter(range(10))
+        import_progress = ImportProgress()
+        with patch.object(progress.time, "perf_counter", lambda: next(clock)):
+            with import_progress.phase("insert"):
+                with import_progress.phase("dedup"):
+                    with import_progress.phase("read"):
+                        pass
+
+        self.assertEqual(
+            import_progress.durations, {"read": 1, "dedup": 2, "insert": 2}
+        )
+
+    def test_periodic_report(self):
+        """It reports at most once per interval"""
+        reports = []
+        import_progress = ImportProgress(reports.append, interval=3600)
+        import_progress.maybe_report()
+        self.assertEqual(reports, [])
+
+        import_progress.interval = 0
+        import_progress._next_report = 0
+        import_progress.maybe_report()
+        self.assertEqual(len(reports), 1)
+        self.assertTrue(reports[0].startswith("Read 0 rows"))
@@ -0,0 +1,142 @@
+import gzip
+import os
+import tempfile
+from io import BytesIO, StringIO
+
+from django.test import SimpleTestCase
+
+from authors.readers import (
+    CSVFormat,
+    is_csv_path,
+    iter_lines,
+    iter_text,
+    open_csv,
+    read_json_names,
+    read_names,
+)
+
+
+class TestReadNames(SimpleTestCase):
+    def read(self, content: str, **csv_format) -> list:
+        return list(read_names(StringIO(content), CSVFormat(**csv_format)))
+
+    def test_single_column(self):
+        """It reads the names of single column files, skipping blank ones"""
+        self.assertEqual(
+            self.read("name\nJane Austen\n\n  Leo Tolstoy \r\n"),
+            ["Jane Austen", "Leo Tolstoy"],
+        )
+
+    def test_quoted_names(self):
+        """It reads quoted names holding delimiters, quotes or line breaks"""
+        content = 'name\n"Tolkien, J. R. R."\n"The ""Bard"""\n"Two\nLines"\n'
+        self.assertEqual(
+            self.read(content),
+            ["Tolkien, J. R. R.", 'The "Bard"', "Two\nLines"],
+        )
+
+    def test_column(self):
+        """It reads the column with the given header, the first by default"""
+        content = '\ufeffid,name\n1,"Austen, Jane"\n\n2,Leo Tolstoy\n'
+        self.assertEqual(
+            self.read(content, column="name"), ["Austen, Jane", "Leo Tolstoy"],
+        )
+        self.assertEqual(self.read(content), ["1", "2"])
+        self.assertEqual(self.read(content, column="id"), ["1", "2"])
+
+    def test_delimiter_and_quotechar(self):
+        """It reads files with other delimiters and quote characters"""
+        content = "id;name\n1;'Austen; Jane'\n"
+        self.assertEqual(
+            self.read(content, column="name", delimiter=";", quotechar="'"),
+            ["Austen; Jane"],
+        )
+        self.assertEqual(self.read('name\n"Jane"\n', quotechar=""), ['"Jane"'])
+
+    def test_missing_column(self):
+        """It fails for unknown columns and rows missing the column"""
+        with self.assertRaisesRegex(ValueError, "Column title not found"):
+            self.read("id,name\n1,Jane\n", column="title")
+        with self.assertRaisesRegex(ValueError, "Line 3 has no column 2"):
+            self.read("id,name\n1,Jane\n2\n", column="name")
+
+    def test_single_column_extra_fields(self):
+        """It fails for unquoted delimiters in single column files"""
+        content = 'name\n"Two\nLines"\nJane Austen\nTolkien, J. R. R.\n'
+        with self.assertRaisesRegex(ValueError, "Line 5 has 2 columns"):
+            self.read(content)
+
+    def test_empty(self):
+        """It reads no names from empty files"""
+        self.assertEqual(self.read(""), [])
+        self.assertEqual(self.read("name\n"), [])
+
+
+class TestOpenCSV(SimpleTestCase):
+    def test_is_csv_path(self):
+        self.assertTrue(is_csv_path("authors.csv"))
+        self.assertTrue(is_csv_path("authors.csv.gz"))
+        self.assertFalse(is_csv_path("authors.gz"))
+
+    def test_gzip(self):
+        """It decompresses gzipped files on the fly"""
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "authors.csv.gz")
+            with gzip.open(filepath, "wt", encoding="utf-8") as csv_file:
+                csv_file.write('name\n"Austen, Jane"\n')
+
+            with open_csv(filepath) as csv_file:
+                self.assertEqual(list(read_names(csv_file)), ["Austen, Jane"])
+
+
+class TestReadJSONNames(SimpleTestCase):
+    def read(self, content: str, chunk_size: int = 3) -> list:
+        chunks = (
+            content[start : start + chunk_size]
+            for start in range(0, len(content), chunk_size)
+        )
+        return list(read_json_names(chunks))
+
+    def test_names(self):
+        """
+        It reads arrays of names or objects with a name split anywhere
+        across chunks, skipping blank names
+        """
+        content = ' [ "Jane Austen", {"name": " Leo Tolstoy", "id": 1},\n"" ] '
+        for chunk_size in (1, 2, 5, len(content)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    self.read(content, chunk_size),
+                    ["Jane Austen", "Leo Tolstoy"],
+                )
+        self.assertEqual(self.read("[]"), [])
+
+    def test_invalid(self):
+        """It raises a ValueError on anything else than an array of names"""
+        for content in (
+            "",
+            '{"name": "Jane Austen"}',
+            '["Jane Austen"',
+            '["Jane Austen",]',
+            '["Jane Austen" "Leo Tolstoy"]',
+            '["Jane Austen", 1]',
+            '[{"id": 1}]',
+            '["Jane Austen"] x',
+        ):
+            with self.subTest(content=content):
+                with self.assertRaises(ValueError):
+                    self.read(content)
+
+
+class TestIterText(SimpleTestCase):
+    def test_iter_text(self):
+        """It decodes utf-8 streams in chunks, dropping any BOM"""
+        content = "\ufeffname\nÉmile Zola\nLeo Tolstoy"
+        stream = BytesIO(content.encode())
+        chunks = list(iter_text(stream, chunk_size=4))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            list(iter_lines(chunks)),
+            ["name\n", "Émile Zola\n", "Leo Tolstoy"],
+        )
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from authors.api import renderers
+from authors.api.renderers import (
+    CSVRenderer,
+    FastJSONRenderer,
+    NDJSONRenderer,
+)
+from rest_framework.renderers import JSONRenderer
+
+DATA = OrderedDict(
+    [
+        ("count", 3),
+        ("next", None),
+        (
+            "results",
+            [
+                {"id": 1, "name": 'José "Zé" Saramago'},
+                {"id": 2, "name": "Line Paragraph Separators"},
+                {"id": 3, "name": "Control\t\x01\\Characters \U0001f4da"},
+            ],
+        ),
+    ]
+)
+
+
+class TestFastJSONRenderer(SimpleTestCase):
+    def test_render_same_bytes(self):
+        """It renders the same bytes as the default JSON renderer"""
+        self.assertEqual(
+            FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+        )
+
+    def test_render_without_orjson(self):
+        """It falls back to the default encoder when orjson is missing"""
+        with patch.object(renderers, "orjson", new=None):
+            self.assertEqual(
+                FastJSONRenderer().render(DATA), JSONRenderer().render(DATA)
+            )
+
+    def test_render_indented(self):
+        """It falls back to the default encoder for indented output"""
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            FastJSONRenderer().render(DATA, media_type),
+            JSONRenderer().render(DATA, media_type),
+        )
+
+    def test_render_empty(self):
+        """It renders no content for no data"""
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+
+class TestStreamRenderers(SimpleTestCase):
+    rows = [(1, "John Doe"), (2, 'Jane "JD" Doe, Jr.'), (3, "Mary Doe")]
+
+    def test_ndjson_stream(self):
+        """It streams one JSON object per line in batches of rows"""
+        pieces = list(NDJSONRenderer().stream(("id", "name"), self.rows, 2))
+        self.assertEqual(len(pieces), 2)
+        self.assertEqual(
+            b"".join(pieces),
+            b'{"id":1,"name":"John Doe"}\n'
+            b'{"id":2,"name":"Jane \\"JD\\" Doe, Jr."}\n'
+            b'{"id":3,"name":"Mary Doe"}\n',
+        )
+
+    def test_csv_stream(self):
+        """It streams a header and one quoted line per row in batches"""
+        pieces = list(CSVRenderer().stream(("id", "name"), self.rows, 2))
+        self.assertEqual(len(pieces), 2)
+        self.assertEqual(
+            b"".join(pieces),
+            b"id,name\r\n1,John Doe\r\n"
+            b'2,"Jane ""JD"" Doe, Jr."\r\n3,Mary Doe\r\n',
+        )
+
+    def test_render_data(self):
+        """It renders regular response data like errors"""
+        data = {"detail": "Not found."}
+        self.assertEqual(
+            NDJSONRenderer().render(data), b'{"detail":"Not found."}\n'
+        )
+        self.assertEqual(
+            CSVRenderer().render(data), b"detail\r\nNot found.\r\n"
+        )
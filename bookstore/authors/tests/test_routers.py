@@ -0,0 +1,112 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authors.cache import LAST_MODIFIED_KEY
+from authors.models import Author
+from authors.tests.base import EXPECTED_NAMES, TransactionTestAuthorsBase
+from authors.utils import import_authors
+from bookstore.routers import PrimaryReplicaRouter
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+REPLICA = "replica"
+
+
+def set_last_write(seconds_ago: float) -> None:
+    cache.set(LAST_MODIFIED_KEY, time.time() - seconds_ago, timeout=None)
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica1", "replica2"], DATABASE_REPLICA_LAG=5
+)
+class TestPrimaryReplicaRouter(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads(self):
+        """
+        It balances the reads of authors across the replicas once they had
+        time to catch up with the last write
+        """
+        set_last_write(60)
+        databases = {self.router.db_for_read(Author) for _ in range(100)}
+        self.assertEqual(databases, {"replica1", "replica2"})
+        self.assertEqual(self.router.db_for_read(User), DEFAULT_DB_ALIAS)
+
+        set_last_write(1)
+        self.assertEqual(self.router.db_for_read(Author), DEFAULT_DB_ALIAS)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_reads_without_replicas(self):
+        """It reads everything from the primary without replicas"""
+        set_last_write(60)
+        self.assertEqual(self.router.db_for_read(Author), DEFAULT_DB_ALIAS)
+
+    def test_writes(self):
+        """It writes and migrates the primary only"""
+        self.assertEqual(self.router.db_for_write(Author), DEFAULT_DB_ALIAS)
+        self.assertTrue(self.router.allow_migrate(DEFAULT_DB_ALIAS, "authors"))
+        self.assertFalse(self.router.allow_migrate("replica1", "authors"))
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], DATABASE_REPLICA_LAG=5)
+class ReplicaRoutingTests(TransactionTestAuthorsBase, APITransactionTestCase):
+    """
+    Routing through a stand-in replica connected to the test database as
+    a second alias, so its queries are told apart from the primary ones
+    """
+
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.databases[REPLICA] = {
+            **connections.databases[DEFAULT_DB_ALIAS],
+            "TEST": {"MIRROR": DEFAULT_DB_ALIAS},
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        delattr(connections._connections, REPLICA)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_api_reads_from_replica(self):
+        """It lists authors from the replica and imports into the primary"""
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            import_authors(EXPECTED_NAMES)
+        self.assertEqual(len(replica_queries), 0)
+
+        set_last_write(60)
+        with CaptureQueriesContext(
+            connections[REPLICA]
+        ) as replica_queries, CaptureQueriesContext(
+            connections[DEFAULT_DB_ALIAS]
+        ) as primary_queries:
+            response = self.client.get(reverse("authors-list"), {"name": "a"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(response.json()["count"], 0)
+        self.assertEqual(len(primary_queries), 0)
+        self.assertGreaterEqual(len(replica_queries), 2)
+
+    def test_api_reads_from_primary_after_write(self):
+        """It lists authors from the primary right after a write"""
+        import_authors(EXPECTED_NAMES)
+
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            response = self.client.get(reverse("authors-list"))
+
+        self.assertEqual(response.json()["count"], len(EXPECTED_NAMES))
+        self.assertEqual(len(replica_queries), 0)
@@ -1,9 +1,19 @@
 from io import StringIO
 
-from django.test import TestCase
+from unittest.mock import Mock, patch
+
+from django.test import TestCase, TransactionTestCase
 
 from authors.models import Author
-from authors.utils import import_authors, import_authors_faster
+from psycopg2 import DataError
+from authors.utils import (
+    ImportCounts,
+    NamesReader,
+    import_authors,
+    import_authors_faster,
+    import_authors_parallel,
+    iter_chunks,
+)
 
 AUTHORS_NAMES = {"John Doe", "Jane Doe"}
 
@@ -17,6 +27,24 @@ class TestImportAuthorUtils(TestCase):
         for author in Author.objects.all():
             self.assertIn(author.name, AUTHORS_NAMES)
 
+    def test_import_authors_counts(self):
+        """It returns the numbers of distinct and inserted authors"""
+        counts = import_authors(AUTHORS_NAMES)
+        self.assertEqual(counts, ImportCounts(len(AUTHORS_NAMES), 2))
+
+        counts = import_authors(AUTHORS_NAMES | {"Mary Doe"}, batch_size=1)
+        self.assertEqual(counts, ImportCounts(len(AUTHORS_NAMES) + 1, 1))
+
+    def test_import_authors_faster_counts(self):
+        """
+        It returns the numbers of distinct and inserted authors when
+        importing using postgres 'copy_from' utility function
+        """
+        import_authors(AUTHORS_NAMES)
+        data = StringIO("\n".join(list(AUTHORS_NAMES) * 2 + ["Mary Doe"]))
+        counts = import_authors_faster(data)
+        self.assertEqual(counts, ImportCounts(len(AUTHORS_NAMES) + 1, 1))
+
     def test_import_authors_faster(self):
         """
         It is able to import the given authors into the database using
@@ -28,3 +56,155 @@ class TestImportAuthorUtils(TestCase):
         self.assertEqual(Author.objects.count(), len(AUTHORS_NAMES))
         for author in Author.objects.all():
             self.assertIn(author.name, AUTHORS_NAMES)
+
+    def test_import_authors_name_keys(self):
+        """Both import helpers store the normalized name keys"""
+        names = ["Émile Zola", "Back\\slash\tTÁB"]
+        imports = {
+            "import_authors": lambda: import_authors(set(names)),
+            "import_authors_faster": lambda: import_authors_faster(
+                NamesReader(names)
+            ),
+            "import_authors_faster_with_keys": lambda: import_authors_faster(
+                NamesReader(names, with_keys=True)
+            ),
+        }
+        for helper, import_names in imports.items():
+            with self.subTest(helper=helper):
+                Author.objects.all().delete()
+                import_names()
+                self.assertEqual(
+                    dict(Author.objects.values_list("name", "name_key")),
+                    {
+                        "Émile Zola": "emile zola",
+                        "Back\\slash\tTÁB": "back\\slash\ttab",
+                    },
+                )
+
+    def test_import_authors_faster_streamed(self):
+        """
+        It is able to import the given authors into the database using
+        postgres 'copy_from' utility function fed by a names stream
+        """
+        self.assertEqual(Author.objects.count(), 0)
+        import_authors_faster(NamesReader(iter(AUTHORS_NAMES)))
+        self.assertEqual(Author.objects.count(), len(AUTHORS_NAMES))
+        for author in Author.objects.all():
+            self.assertIn(author.name, AUTHORS_NAMES)
+
+    def test_import_authors_faster_duplicated(self):
+        """
+        It properly skips already existing and repeated authors when
+        importing using postgres 'copy_from' utility function
+        """
+        import_authors(AUTHORS_NAMES)
+        data = StringIO("\n".join(list(AUTHORS_NAMES) * 2 + ["Mary Doe"]))
+        import_authors_faster(data)
+        self.assertEqual(Author.objects.count(), len(AUTHORS_NAMES) + 1)
+        self.assertTrue(Author.objects.filter(name="Mary Doe").exists())
+
+    def test_import_authors_faster_rollback(self):
+        """It does not import any author when the copy fails midway"""
+        data = StringIO("\n".join(["John Doe", "J" * 201]))
+        with self.assertRaises(DataError):
+            import_authors_faster(data)
+        self.assertEqual(Author.objects.count(), 0)
+
+        import_authors_faster(StringIO("John Doe"))
+        self.assertEqual(Author.objects.count(), 1)
+
+
+class TestParallelImportUtils(TransactionTestCase):
+    def test_import_authors_parallel(self):
+        """
+        It is able to import the given authors into the database using
+        several workers inserting batches concurrently
+        """
+        names = [f"Author {number}" for number in range(50)]
+        self.assertEqual(Author.objects.count(), 0)
+        import_authors_parallel(names, batch_size=7, workers=3)
+        self.assertEqual(Author.objects.count(), len(names))
+        self.assertEqual(
+            set(Author.objects.values_list("name", flat=True)), set(names)
+        )
+
+    def test_import_authors_parallel_duplicated(self):
+        """It properly skips inserts of already existing authors"""
+        import_authors(AUTHORS_NAMES)
+        batches = []
+        counts = import_authors_parallel(
+            list(AUTHORS_NAMES) + ["Mary Doe"],
+            batch_size=1,
+            workers=2,
+            on_batch=batches.append,
+        )
+        self.assertEqual(Author.objects.count(), len(AUTHORS_NAMES) + 1)
+        self.assertEqual(counts, ImportCounts(len(AUTHORS_NAMES) + 1, 1))
+        self.assertEqual(len(batches), len(AUTHORS_NAMES) + 1)
+
+    def test_import_authors_parallel_error(self):
+        """It raises the error of a failing worker after stopping them"""
+        error_message = "Simulated error message"
+        with patch(
+            "authors.utils.import_authors", side_effect=IOError(error_message)
+        ):
+            with self.assertRaisesMessage(IOError, error_message):
+                import_authors_parallel(AUTHORS_NAMES, batch_size=1, workers=2)
+        self.assertEqual(Author.objects.count(), 0)
+
+    def test_import_authors_parallel_callback_error(self):
+        """It raises the error of a failing callback after stopping them"""
+        names = [f"Author {number}" for number in range(50)]
+        on_batch = Mock(side_effect=ValueError("Simulated callback error"))
+        with self.assertRaisesMessage(ValueError, "Simulated callback error"):
+            import_authors_parallel(
+                names, batch_size=1, workers=2, on_batch=on_batch
+            )
+        self.assertLess(on_batch.call_count, len(names))
+
+
+class TestStreamingUtils(TestCase):
+    def test_iter_chunks(self):
+        """It groups names into deduplicated chunks of bounded size"""
+        names = ["a", "a", "b", "c", "d", "e"]
+        chunks = list(iter_chunks(names, chunk_size=2))
+        self.assertEqual(chunks, [{"a", "b"}, {"c", "d"}, {"e"}])
+
+    def test_iter_chunks_empty(self):
+        """It yields no chunks for an empty stream"""
+        self.assertEqual(list(iter_chunks([], chunk_size=2)), [])
+
+    def test_names_reader_read(self):
+        """It renders names one per line, in pieces of the requested size"""
+        reader = NamesReader(iter(["John Doe", "Jane Doe"]))
+        self.assertEqual(reader.read(4), "John")
+        self.assertEqual(reader.read(6), " Doe\nJ")
+        self.assertEqual(reader.read(), "ane Doe\n")
+        self.assertEqual(reader.read(), "")
+
+    def test_names_reader_readline(self):
+        """It returns one name per line and an empty string at the end"""
+        reader = NamesReader(iter(["John Doe", "Jane Doe"]))
+        self.assertEqual(reader.readline(), "John Doe\n")
+        self.assertEqual(reader.readline(), "Jane Doe\n")
+        self.assertEqual(reader.readline(), "")
+
+    def test_names_reader_escapes(self):
+        """It escapes characters that are special to the copy text format"""
+        reader = NamesReader(iter(["Back\\slash\tTab"]))
+        self.assertEqual(reader.read(), "Back\\\\slash\\tTab\n")
+
+    def test_names_reader_with_keys(self):
+        """It adds the escaped name key of every name as a second column"""
+        reader = NamesReader(iter(["Émile", "Back\\slash\tTÁB"]), True)
+        self.assertEqual(
+            reader.read(),
+            "Émile\temile\nBack\\\\slash\\tTÁB\tback\\\\slash\\ttab\n",
+        )
+
+    def test_names_reader_is_lazy(self):
+        """It does not consume more names than needed to serve a read"""
+        names = iter(["John Doe", "Jane Doe", "Mary Doe"])
+        reader = NamesReader(names)
+        reader.read(3)
+        self.assertEqual(list(names), ["Jane Doe", "Mary Doe"])
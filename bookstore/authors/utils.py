@@ -1,22 +1,269 @@
+import re
 from contextlib import closing
-from typing import IO, Set
+from io import TextIOBase
+from queue import Queue
+from threading import Thread
+from typing import (
+    IO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
 
-from django.db import connection
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 
-from authors.models import Author
+from authors.cache import bump_authors_version
+from authors.models import Author, normalize_name
 
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_WORKERS = 1
 
-def import_authors(names_set: Set) -> None:
-    """Helper function for importing authors into database"""
-    authors = [Author(name=name) for name in names_set]
+AUTHORS_TABLE = "authors_author"
+STAGING_TABLE = "authors_author_staging"
+# imports write to, and read the existing authors from, the primary even
+# when reads are routed to replicas
+PRIMARY_DB = DEFAULT_DB_ALIAS
 
-    Author.objects.bulk_create(authors, ignore_conflicts=True)
+COPY_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+COPY_UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+COPY_ESCAPE_SEQUENCE = re.compile(r"\\(.)")
 
 
-def import_authors_faster(data: IO) -> None:
+def copy_escape(value: str) -> str:
+    """Value written as a field in the postgres 'copy_from' text format"""
+    # checking first is several times faster than translating every value
+    if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+        return value.translate(COPY_ESCAPES)
+    return value
+
+
+def copy_unescape(value: str) -> str:
+    """Value of a field in the postgres 'copy_from' text format"""
+    if "\\" not in value:
+        return value
+    return COPY_ESCAPE_SEQUENCE.sub(
+        lambda match: COPY_UNESCAPES.get(match.group(1), match.group(1)),
+        value,
+    )
+
+
+class NamesReader(TextIOBase):
+    """
+    Read-only file-like adapter over an iterable of names, producing the
+    text format expected by postgres 'copy_from' without materializing
+    the whole content in memory. With 'with_keys', every name is followed
+    by its normalized search key, as copied by import_authors_faster
+    """
+
+    def __init__(self, names: Iterable[str], with_keys: bool = False):
+        self._names = iter(names)
+        self._buffer = ""
+        self.with_keys = with_keys
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self, size: int) -> None:
+        lines = [self._buffer]
+        length = len(self._buffer)
+        with_keys = self.with_keys
+        for name in self._names:
+            if with_keys:
+                key = copy_escape(normalize_name(name))
+                line = f"{copy_escape(name)}\t{key}\n"
+            else:
+                line = f"{copy_escape(name)}\n"
+            lines.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        self._buffer = "".join(lines)
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0 or len(self._buffer) < size:
+            self._fill(-1 if size is None else size)
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        if "\n" not in self._buffer:
+            self._fill(len(self._buffer) + 1)
+        line, newline, self._buffer = self._buffer.partition("\n")
+        return f"{line}{newline}"
+
+
+def iter_chunks(
+    names: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Set]:
+    """
+    Helper function for grouping a stream of names into deduplicated
+    chunks holding at most 'chunk_size' names each
+    """
+    chunk = set()
+    for name in names:
+        chunk.add(name)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = set()
+    if chunk:
+        yield chunk
+
+
+class ImportCounts(NamedTuple):
+    """Numbers of distinct names imported and of authors actually inserted"""
+
+    distinct: int
+    inserted: int
+
+
+def import_authors(
+    names_set: Set, batch_size: Optional[int] = None
+) -> ImportCounts:
+    """
+    Helper function for importing authors into database, skipping the
+    already existing ones. These are counted right before inserting, so
+    authors inserted meanwhile by someone else are counted as inserted
+    """
+    # inserting in a consistent order keeps concurrent imports of
+    # overlapping names from deadlocking on the unique index
+    names = sorted(names_set)
+    step = batch_size or DEFAULT_BATCH_SIZE
+    authors = [
+        Author(name=name, name_key=normalize_name(name)) for name in names
+    ]
+
+    authors_manager = Author.objects.db_manager(PRIMARY_DB)
+
+    with transaction.atomic(using=PRIMARY_DB):
+        existing = sum(
+            authors_manager.filter(
+                name__in=names[start : start + step]
+            ).count()
+            for start in range(0, len(names), step)
+        )
+        authors_manager.bulk_create(
+            authors, batch_size=batch_size, ignore_conflicts=True
+        )
+    bump_authors_version()
+    return ImportCounts(len(names), len(names) - existing)
+
+
+def _import_authors_worker(
+    batches: Queue,
+    errors: List[Exception],
+    results: List[ImportCounts],
+    on_batch: Optional[Callable[[ImportCounts], None]],
+) -> None:
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                break
+            if not errors:
+                # a failing callback stops the import like a failing batch,
+                # the worker going on draining the queue
+                try:
+                    counts = import_authors(batch)
+                    results.append(counts)
+                    if on_batch is not None:
+                        on_batch(counts)
+                except Exception as exc:
+                    errors.append(exc)
+    finally:
+        connections[PRIMARY_DB].close()
+
+
+def import_authors_parallel(
+    names: Iterable[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    on_batch: Optional[Callable[[ImportCounts], None]] = None,
+) -> ImportCounts:
+    """
+    Helper function for importing authors into database splitting the
+    names into batches that are inserted concurrently by a pool of worker
+    threads, each one using its own database connection. The counts of
+    every batch are given to 'on_batch', from the worker threads
+    """
+    errors = []
+    results = []
+    batches = Queue(maxsize=workers * 2)
+    threads = [
+        Thread(
+            target=_import_authors_worker,
+            args=(batches, errors, results, on_batch),
+        )
+        for _ in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for batch in iter_chunks(names, batch_size):
+            if errors:
+                break
+            batches.put(batch)
+    finally:
+        for _ in threads:
+            batches.put(None)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return ImportCounts(
+        sum(counts.distinct for counts in results),
+        sum(counts.inserted for counts in results),
+    )
+
+
+def import_authors_faster(data: IO) -> ImportCounts:
     """
     Helper function for importing authors into database using postgres
-    'copy_from' utility function for a faster performance
+    'copy_from' utility function for a faster performance.
+    Names are copied into a temporary staging table and then merged into
+    the authors table skipping the already existing ones, so a single
+    duplicated name does not abort the whole import.
+    'data' holds one name per line in the 'copy_from' text format, whose
+    name keys are added on the fly unless it is a NamesReader providing
+    them already
     """
-    with closing(connection.cursor()) as cursor:
-        cursor.copy_from(file=data, table="authors_author", columns=("name",))
+    connection = connections[PRIMARY_DB]
+    with transaction.atomic(using=PRIMARY_DB), closing(
+        connection.cursor()
+    ) as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {STAGING_TABLE} "
+            f"(name varchar(200), name_key text)"
+        )
+        if not (isinstance(data, NamesReader) and data.with_keys):
+            names = (copy_unescape(line.rstrip("\n")) for line in data)
+            data = NamesReader(names, with_keys=True)
+        cursor.copy_from(
+            file=data, table=STAGING_TABLE, columns=("name", "name_key"),
+        )
+        cursor.execute(
+            f"WITH names AS ("
+            f"SELECT DISTINCT name, name_key FROM {STAGING_TABLE}"
+            f"), "
+            f"inserted AS ("
+            f"INSERT INTO {AUTHORS_TABLE} (name, name_key) "
+            f"SELECT name, name_key FROM names "
+            f"ON CONFLICT (name) DO NOTHING RETURNING 1"
+            f") "
+            f"SELECT (SELECT COUNT(*) FROM names), "
+            f"(SELECT COUNT(*) FROM inserted)"
+        )
+        counts = ImportCounts(*cursor.fetchone())
+        cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+    bump_authors_version()
+    return counts
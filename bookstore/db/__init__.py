@@ -0,0 +1,14 @@
+"""
+PostgreSQL database backend adding connection health checks and an
+optional in-process connection pool to the builtin psycopg2 one.
+
+It is selected with "ENGINE": "bookstore.db" and configured by these extra
+keys of the database settings:
+
+    CONN_HEALTH_CHECKS: checks that persistent connections still work
+        before their first use of each request
+    POOL_SIZE: maximum number of pooled connections, 0 disables the pool
+    POOL_MIN_SIZE: number of idle connections kept open by the pool, all
+        of them when not set
+    POOL_TIMEOUT: seconds to wait for a free connection of the pool
+"""
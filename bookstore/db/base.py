@@ -0,0 +1,88 @@
+from django.db.backends.postgresql import base
+
+from bookstore.db.creation import DatabaseCreation
+from bookstore.db.pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self.health_check_done = False
+
+    @property
+    def health_check_enabled(self) -> bool:
+        return self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+
+    def get_new_connection(self, conn_params):
+        if not self.settings_dict.get("POOL_SIZE"):
+            return super().get_new_connection(conn_params)
+
+        pool = get_pool(conn_params, self.settings_dict)
+        connection = pool.getconn()
+        while self.health_check_enabled and not self._ping(connection):
+            pool.putconn(connection, close=True)
+            connection = pool.getconn()
+        self.pool = pool
+
+        options = self.settings_dict["OPTIONS"]
+        self.isolation_level = options.get(
+            "isolation_level", connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def connect(self):
+        # a brand new connection needs no check, and checking it while
+        # it is being set up would leave a transaction open
+        self.health_check_done = True
+        super().connect()
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+
+        pool, self.pool = self.pool, None
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+
+    @staticmethod
+    def _ping(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
+
+    def ensure_connection(self):
+        """
+        Closes a persistent connection found broken before its first use
+        since the last request, so a new one is opened transparently
+        """
+        if (
+            self.connection is not None
+            and self.health_check_enabled
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        """
+        Returns a pooled connection to the pool at the end of each request
+        regardless of CONN_MAX_AGE, so other threads can take it over
+        """
+        self.health_check_done = False
+        if self.pool is not None and not self.in_atomic_block:
+            self.close()
+            return
+        super().close_if_unusable_or_obsolete()
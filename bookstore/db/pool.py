@@ -0,0 +1,67 @@
+from threading import BoundedSemaphore, Lock
+from typing import Dict
+
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+_pools: Dict[str, "ConnectionPool"] = {}
+_pools_lock = Lock()
+
+
+class ConnectionPool(ThreadedConnectionPool):
+    """
+    Thread safe pool of connections that makes callers wait up to
+    'timeout' seconds for a free connection when all of them are in use,
+    instead of failing straight away
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, **kwargs):
+        super().__init__(minconn, maxconn, **kwargs)
+        self.timeout = timeout
+        self._slots = BoundedSemaphore(maxconn)
+
+    @property
+    def database(self) -> str:
+        return self._kwargs.get("database")
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolError("connection pool exhausted")
+        try:
+            return super().getconn(key)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+def get_pool(conn_params: Dict, settings_dict: Dict) -> ConnectionPool:
+    """Pool shared by every connection using the same parameters"""
+    key = repr(sorted(conn_params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            max_size = settings_dict["POOL_SIZE"]
+            pool = _pools[key] = ConnectionPool(
+                min(settings_dict.get("POOL_MIN_SIZE") or max_size, max_size),
+                max_size,
+                settings_dict.get("POOL_TIMEOUT", 10),
+                **conn_params,
+            )
+    return pool
+
+
+def close_pools(database: str = None) -> None:
+    """
+    Closes the connections of every pool, or only of the pools connecting
+    to the given database
+    """
+    with _pools_lock:
+        for key, pool in list(_pools.items()):
+            if database is None or pool.database == database:
+                pool.closeall()
+                del _pools[key]
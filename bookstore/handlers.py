@@ -0,0 +1,77 @@
+"""
+ASGI handler of the project, sending streaming responses without running
+their iterators on the event loop.
+"""
+from asgiref.sync import sync_to_async
+
+import django
+from django.core.handlers.asgi import ASGIHandler
+
+
+async def send_response(response, send) -> None:
+    """
+    Sends a response the way StreamingASGIHandler does, cookies included,
+    for the ASGI applications serving requests without it
+    """
+    headers = [
+        (name.encode("ascii"), value.encode("latin1"))
+        for name, value in response.items()
+    ]
+    for cookie in response.cookies.values():
+        headers.append(
+            (b"Set-Cookie", cookie.output(header="").encode("ascii"))
+        )
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": headers,
+        }
+    )
+
+    if response.streaming:
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in ASGIHandler.chunk_bytes(part):
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": True,
+                    }
+                )
+        await send({"type": "http.response.body"})
+    else:
+        for chunk, last in ASGIHandler.chunk_bytes(response.content):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": not last,
+                }
+            )
+    await sync_to_async(response.close, thread_sensitive=True)()
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """
+    ASGI handler producing each part of a streaming response in the
+    worker thread the view ran in, instead of the event loop Django 3.0
+    iterates it on, as parts may query the database, like the authors
+    export reading from a server side cursor of that thread connection.
+    Responses are closed in that thread too, so its database connection
+    is released at the end of the request
+    """
+
+    async def send_response(self, response, send):
+        await send_response(response, send)
+
+
+def get_asgi_application() -> StreamingASGIHandler:
+    """Same as django.core.asgi.get_asgi_application, with this handler"""
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
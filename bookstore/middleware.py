@@ -0,0 +1,72 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from bookstore.timing import (
+    RequestTimings,
+    get_current_timings,
+    record_timings,
+)
+
+logger = logging.getLogger("bookstore.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Records the timings of a sample of the requests, as a share given by
+    the REQUEST_TIMING_SAMPLE_RATE setting: number and total duration of
+    SQL queries, time spent in COUNT queries, serialization, rendering and
+    the whole request. They are sent back in the 'Server-Timing' header
+    and logged as JSON by the 'bookstore.timing' logger.
+
+    It should come first in MIDDLEWARE, so its timings cover every other
+    middleware and it is the last one preparing the response rendering
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            stack.enter_context(record_timings(timings))
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        timings.add("total", time.perf_counter() - start)
+
+        response["Server-Timing"] = timings.server_timing()
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    **timings.as_dict(),
+                }
+            )
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        timings = get_current_timings()
+        if timings is None:
+            return response
+
+        start = time.perf_counter()
+
+        def rendered(response):
+            timings.add("render", time.perf_counter() - start)
+
+        response.add_post_render_callback(rendered)
+        return response
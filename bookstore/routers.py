@@ -0,0 +1,47 @@
+"""
+Database router balancing the reads of the authors app across the read
+replicas configured in DATABASE_REPLICAS, keeping every write, and the
+reads of the other apps, on the primary database.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from authors.cache import get_authors_last_modified
+
+REPLICATED_APPS = {"authors"}
+
+
+class PrimaryReplicaRouter:
+    """
+    Routes each read of the authors app models to a random replica, unless
+    authors were written less than DATABASE_REPLICA_LAG seconds ago, as
+    replicas may not have caught up with the write yet. Only the primary
+    is migrated, replicas getting their schema through replication
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or model._meta.app_label not in REPLICATED_APPS:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        since_write = time.time() - get_authors_last_modified()
+        if since_write < settings.DATABASE_REPLICA_LAG:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # every database holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,39 @@
+"""
+Test runner of the project, keeping the cache of the tests apart from the
+one of the servers running on the same host.
+"""
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.utils.module_loading import import_string
+
+TEST_KEY_PREFIX = "test"
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runner giving the file based caches a temporary directory, removed at
+    the end of the run, and prefixing the keys of any other cache, since
+    tests clear the cache the authors version lives in
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix="bookstore_test_cache")
+        caches = {}
+        for alias, options in settings.CACHES.items():
+            options = {**options, "KEY_PREFIX": TEST_KEY_PREFIX}
+            if issubclass(import_string(options["BACKEND"]), FileBasedCache):
+                options["LOCATION"] = f"{self.cache_dir}/{alias}"
+            caches[alias] = options
+        self.cache_settings = override_settings(CACHES=caches)
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
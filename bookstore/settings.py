@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -37,12 +38,14 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "django_filters",
     "authors",
 ]
 
 MIDDLEWARE = [
+    "bookstore.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -75,18 +78,85 @@ WSGI_APPLICATION = "bookstore.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
+# Connections are kept open for DB_CONN_MAX_AGE seconds and checked before
+# being reused by a new request. Setting DB_POOL_SIZE shares up to that
+# many connections between the threads of each process instead: each one
+# goes back to the pool at the end of a request whatever DB_CONN_MAX_AGE
+# is, and DB_POOL_MIN_SIZE of them, or all when 0, stay open while idle
+# (see bookstore/db)
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "bookstore.db",
         "NAME": os.environ.get("DB_NAME", "bookstore_db"),
         "USER": os.environ.get("DB_USER", "bookstore_user"),
         "PASSWORD": os.environ.get("DB_PWD", "bookstoresecret"),
         "HOST": os.environ.get("DB_HOST", "127.0.0.1"),
         "PORT": os.environ.get("DB_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+        ),
+        "POOL_SIZE": int(os.environ.get("DB_POOL_SIZE", "0")),
+        "POOL_MIN_SIZE": int(os.environ.get("DB_POOL_MIN_SIZE", "0")),
+        "POOL_TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
     }
 }
 
+# Authors are read from the replicas listed in DB_REPLICAS, as comma
+# separated "host[:port][/name]" entries sharing the rest of the primary
+# settings, picking one at random per query. They are read from the
+# primary for DB_REPLICA_LAG seconds after being written, and imports
+# always use it (see bookstore/routers.py)
+
+DATABASE_REPLICAS = []
+for replica in filter(None, os.environ.get("DB_REPLICAS", "").split(",")):
+    address, _, replica_name = replica.strip().partition("/")
+    replica_host, _, replica_port = address.partition(":")
+    alias = f"replica{len(DATABASE_REPLICAS) + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "NAME": replica_name or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_REPLICA_LAG = float(os.environ.get("DB_REPLICA_LAG", "5"))
+DATABASE_ROUTERS = ["bookstore.routers.PrimaryReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+# The version of the authors data is held by the cache, so it must be
+# shared by every process writing or serving authors, which is checked
+# on startup. The default file based cache is shared by the processes of
+# a single host, memcached or redis ones by several hosts
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "bookstore_cache"),
+        ),
+    }
+}
+
+# Tests clear the cache, so they run with one of their own (see
+# bookstore/runner.py)
+TEST_RUNNER = "bookstore.runner.TestRunner"
+
+# A cache local to each process, like the locmem one, is refused unless
+# this is set, for deployments running a single process
+AUTHORS_LOCAL_CACHE_ALLOWED = (
+    os.environ.get("AUTHORS_LOCAL_CACHE_ALLOWED", "false").lower() == "true"
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -126,8 +196,106 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 
+
+# Logging
+# https://docs.djangoproject.com/en/3.0/topics/logging/
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {"message": {"format": "%(message)s"}},
+    "handlers": {
+        "timing": {"class": "logging.StreamHandler", "formatter": "message"}
+    },
+    "loggers": {
+        "bookstore.timing": {
+            "handlers": ["timing"],
+            "level": "INFO",
+            "propagate": False,
+        }
+    },
+}
+
+# Share of the requests, from 0 to 1, whose query count and timings are
+# recorded, sent in the Server-Timing header and logged as JSON lines
+REQUEST_TIMING_SAMPLE_RATE = float(
+    os.environ.get("REQUEST_TIMING_SAMPLE_RATE", "0")
+)
+
 SILENCED_SYSTEM_CHECKS = ["rest_framework.W001"]
 
 REST_FRAMEWORK = {
     "PAGE_SIZE": 1000,
 }
+
+# Default pagination of the authors list endpoint, either "page" for page
+# numbers or "cursor" for keyset pagination. It can be overridden per
+# request by the "pagination" query parameter
+AUTHORS_PAGINATION = os.environ.get("AUTHORS_PAGINATION", "page")
+
+# Unfiltered authors counts are estimated from postgres statistics once the
+# table holds at least this many rows, and exact counts are cached for
+# AUTHORS_COUNT_CACHE_TIMEOUT seconds
+AUTHORS_COUNT_ESTIMATE_THRESHOLD = int(
+    os.environ.get("AUTHORS_COUNT_ESTIMATE_THRESHOLD", "100000")
+)
+AUTHORS_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get("AUTHORS_COUNT_CACHE_TIMEOUT", "60")
+)
+
+# Serialized pages of the authors list endpoint are cached for this many
+# seconds, or until authors are written. Set it to 0 to disable the cache
+AUTHORS_LIST_CACHE_TIMEOUT = int(
+    os.environ.get("AUTHORS_LIST_CACHE_TIMEOUT", "300")
+)
+
+# Authors are listed straight from database values instead of going
+# through the model serializer, producing the same output faster
+AUTHORS_FAST_LIST = (
+    os.environ.get("AUTHORS_FAST_LIST", "true").lower() == "true"
+)
+
+# Number of authors fetched per round trip from the server side cursor of
+# the authors export endpoint
+AUTHORS_EXPORT_CHUNK_SIZE = int(
+    os.environ.get("AUTHORS_EXPORT_CHUNK_SIZE", "2000")
+)
+
+# When served over ASGI, the authors list endpoint runs on the event loop
+# using up to AUTHORS_ASYNC_POOL_SIZE asynchronous database connections
+# per process
+AUTHORS_ASYNC_LIST = (
+    os.environ.get("AUTHORS_ASYNC_LIST", "true").lower() == "true"
+)
+AUTHORS_ASYNC_POOL_SIZE = int(os.environ.get("AUTHORS_ASYNC_POOL_SIZE", "10"))
+
+# Number of authors returned by the autocomplete endpoint when no 'limit'
+# is given, served from an index of the names held by every process
+AUTHORS_AUTOCOMPLETE_LIMIT = int(
+    os.environ.get("AUTHORS_AUTOCOMPLETE_LIMIT", "10")
+)
+
+# Maximum number of ids and names resolved by a single request to the
+# authors batch lookup endpoint
+AUTHORS_LOOKUP_MAX_ITEMS = int(
+    os.environ.get("AUTHORS_LOOKUP_MAX_ITEMS", "5000")
+)
+
+# Number of changed authors returned by a request to the authors change
+# feed when no 'limit' is given
+AUTHORS_CHANGES_LIMIT = int(os.environ.get("AUTHORS_CHANGES_LIMIT", "1000"))
+
+# Comma separated API keys of the services allowed to create authors in
+# bulk, sent as 'Authorization: Api-Key <key>'. Users may do so as well
+# with the permission to add authors
+AUTHORS_API_KEYS = [
+    key.strip()
+    for key in os.environ.get("AUTHORS_API_KEYS", "").split(",")
+    if key.strip()
+]
+
+# Bulk creation requests naming more authors than this are refused, as a
+# whole, with a '413 Payload Too Large' response
+AUTHORS_BULK_MAX_NAMES = int(
+    os.environ.get("AUTHORS_BULK_MAX_NAMES", "100000")
+)
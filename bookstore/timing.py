@@ -0,0 +1,96 @@
+"""
+Per request timings of the phases of the API, recorded only for the
+requests sampled by ServerTimingMiddleware so measuring code paths cost
+nothing for the others.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class RequestTimings:
+    """
+    Durations in seconds of the named phases of a request, which also acts
+    as a database execute wrapper recording the number and duration of the
+    queries, with COUNT queries accounted for on their own as well
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.queries = 0
+
+    def add(self, name: str, duration: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+
+    def add_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.add("db", duration)
+        if sql.lstrip()[:13].upper() == "SELECT COUNT(":
+            self.add("count", duration)
+
+    def merge(self, other: "RequestTimings") -> None:
+        """Adds the queries and durations recorded by 'other'"""
+        self.queries += other.queries
+        for name, duration in other.durations.items():
+            self.add(name, duration)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add_query(sql, time.perf_counter() - start)
+
+    def server_timing(self) -> str:
+        """Value of the 'Server-Timing' header"""
+        metrics = []
+        for name, duration in self.durations.items():
+            metric = f"{name};dur={duration * 1000:.3f}"
+            if name == "db":
+                metric = f'{metric};desc="{self.queries} queries"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def as_dict(self) -> Dict:
+        return {
+            "queries": self.queries,
+            **{
+                f"{name}_ms": round(duration * 1000, 3)
+                for name, duration in self.durations.items()
+            },
+        }
+
+
+def get_current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being served, when it is sampled"""
+    return _current_timings.get()
+
+
+@contextmanager
+def record_timings(timings: RequestTimings) -> Iterator[RequestTimings]:
+    """Makes 'timings' the current ones while in the context"""
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def measure(name: str) -> Iterator[None]:
+    """Adds the time spent in the context to the current request timings"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)